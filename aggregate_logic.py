@@ -0,0 +1,167 @@
+"""Agregasi frekuensi kata dan statistik panjang teks secara bertahap (per chunk) selama pipeline berjalan.
+
+Dipakai tab visualisasi agar tidak perlu memindai ulang seluruh kolom. Untuk korpus dengan
+jutaan kata unik tersedia mode heavy-hitter (Space-Saving) dengan memori tetap.
+"""
+import heapq
+import re
+from collections import Counter
+
+import pandas as pd
+
+RAW_TOKEN_RE = re.compile(r'\b\w+\b')
+DEFAULT_HEAVY_HITTER_CAPACITY = 20_000
+
+
+class SpaceSaving:
+    """Top-k perkiraan dengan memori tetap (algoritma Space-Saving, Metwally dkk. 2005).
+
+    Menyimpan maksimal `capacity` kata; frekuensi kata yang tersimpan tidak pernah kurang dari
+    frekuensi sebenarnya dan lebihnya paling banyak `errors[kata]`.
+    """
+
+    def __init__(self, capacity=DEFAULT_HEAVY_HITTER_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def update(self, counter):
+        for token, count in counter.items():
+            if token in self.counts:
+                self.counts[token] += count
+            elif len(self.counts) < self.capacity:
+                self.counts[token] = count
+                self.errors[token] = 0
+            else:
+                # Ganti kata dengan frekuensi terkecil; kata baru mewarisi hitungannya sebagai error
+                min_token, min_count = self._pop_min()
+                del self.counts[min_token]
+                del self.errors[min_token]
+                self.counts[token] = min_count + count
+                self.errors[token] = min_count
+            heapq.heappush(self._heap, (self.counts[token], token))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, t) for t, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        # Entri heap bisa basi (hitungan sudah naik); lewati sampai cocok dengan hitungan terkini
+        while True:
+            count, token = heapq.heappop(self._heap)
+            if self.counts.get(token) == count:
+                return token, count
+
+    def min_count(self):
+        """Hitungan terkecil bila ringkasan penuh; 0 bila belum penuh (kata yang tidak ada memang belum muncul)."""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other):
+        """Menggabungkan ringkasan lain (Agarwal dkk. 2012, mergeable summaries).
+
+        Hitungan dan error dijumlahkan per kata; kata yang tidak ada di salah satu sisi mendapat
+        hitungan minimum sisi itu (batas atas frekuensinya di sana) sebagai hitungan sekaligus error.
+        Hasilnya dipotong ke `capacity` kata teratas, sehingga jaminan di docstring kelas tetap berlaku.
+        """
+        own_min, other_min = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+        for token in self.counts.keys() | other.counts.keys():
+            counts[token] = self.counts.get(token, own_min) + other.counts.get(token, other_min)
+            errors[token] = self.errors.get(token, own_min) + other.errors.get(token, other_min)
+        kept = heapq.nlargest(self.capacity, counts, key=lambda token: (counts[token], token))
+        self.counts = {token: counts[token] for token in kept}
+        self.errors = {token: errors[token] for token in kept}
+        self._heap = [(c, t) for t, c in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def most_common(self, n=None):
+        return Counter(self.counts).most_common(n)
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class CorpusAggregates:
+    """Frekuensi kata mentah & akhir serta jumlah kata per baris, diakumulasi per chunk."""
+
+    def __init__(self, heavy_hitter_capacity=None):
+        self.heavy_hitter_capacity = heavy_hitter_capacity
+        self.raw = self._new_counter()
+        self.final = self._new_counter()
+        self.rows = 0
+        self.raw_words = 0
+        self.final_words = 0
+
+    def _new_counter(self):
+        if self.heavy_hitter_capacity:
+            return SpaceSaving(self.heavy_hitter_capacity)
+        return Counter()
+
+    def update_raw(self, series, weights=None):
+        """Frekuensi mentah sama dengan regex `\\b\\w+\\b` atas teks lowercase (NaN diabaikan).
+
+        `weights` (opsional, sejajar dengan `series`) adalah jumlah kemunculan tiap teks, untuk
+        input yang sudah dideduplikasi.
+        """
+        chunk_counter = Counter()
+        if weights is None:
+            for text in series.dropna().astype(str):
+                chunk_counter.update(RAW_TOKEN_RE.findall(text.lower()))
+            self.raw_words += int(series.astype(str).str.split().str.len().sum())
+            self.rows += len(series)
+        else:
+            present = series.notna().to_numpy()
+            for text, weight in zip(series[present].astype(str), weights[present]):
+                for token in RAW_TOKEN_RE.findall(text.lower()):
+                    chunk_counter[token] += int(weight)
+            self.raw_words += int((series.astype(str).str.split().str.len().to_numpy() * weights).sum())
+            self.rows += int(weights.sum())
+        self.raw.update(chunk_counter)
+
+    def update_final(self, token_rows, weights=None):
+        chunk_counter = Counter()
+        if weights is None:
+            for tokens in token_rows:
+                chunk_counter.update(tokens)
+            self.final_words += sum(map(len, token_rows))
+        else:
+            for tokens, weight in zip(token_rows, weights):
+                for token in tokens:
+                    chunk_counter[token] += int(weight)
+            self.final_words += int(sum(len(tokens) * int(weight) for tokens, weight in zip(token_rows, weights)))
+        self.final.update(chunk_counter)
+
+    def update(self, raw_series, final_token_rows, weights=None):
+        self.update_raw(raw_series, weights)
+        self.update_final(final_token_rows, weights)
+
+    def merge(self, other):
+        if isinstance(self.raw, SpaceSaving):
+            self.raw.merge(other.raw)
+            self.final.merge(other.final)
+        else:
+            self.raw.update(other.raw)
+            self.final.update(other.final)
+        self.rows += other.rows
+        self.raw_words += other.raw_words
+        self.final_words += other.final_words
+        return self
+
+    def average_words(self):
+        """Rata-rata jumlah kata per baris (sebelum, sesudah) seperti calculate_basic_stats."""
+        if not self.rows:
+            return 0, 0
+        return self.raw_words / self.rows, self.final_words / self.rows
+
+    def compact(self, n=200):
+        """Hanya menyisakan `n` kata teratas (yang ditampilkan top_frame); dipakai untuk hasil job lama."""
+        self.raw = Counter(dict(self.raw.most_common(n)))
+        self.final = Counter(dict(self.final.most_common(n)))
+        self.heavy_hitter_capacity = None
+        return self
+
+    def top_frame(self, which='final', n=200):
+        """DataFrame (Kata, Frekuensi) terurut menurun, format sama dengan calculate_word_frequency."""
+        counter = self.raw if which == 'raw' else self.final
+        return pd.DataFrame(counter.most_common(n), columns=['Kata', 'Frekuensi'])
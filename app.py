@@ -1,7 +1,17 @@
+import os
+
 import pandas as pd
 import streamlit as st
 
+import dataset_store as ds
+import export_logic as el
+import io_logic
+import job_logic as jl
+import memory_logic as ml
+import parallel_engine as pe
 import preprocessing_logic as pl
+import sentiment_logic as sl
+import table_logic as tl
 import visualization_logic as vl
 
 # --- Konfigurasi Halaman ---
@@ -35,15 +45,223 @@ st.markdown("""
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
     st.session_state.data_processed = False
-    st.session_state.original_df = None
-    st.session_state.processed_df = None
+    # DataFrame disimpan di dataset store bersama; sesi hanya menyimpan kuncinya
+    st.session_state.original_key = None
+    st.session_state.processed_key = None
+    # Run mode chunk: hasil ada di Parquet (processed_path), bukan di dataset store
+    st.session_state.processed_path = None
     st.session_state.selected_language = "Bahasa Indonesia"
     st.session_state.selected_column = None
     st.session_state.active_dataset_name = ""
     st.session_state.datasets = {}
+    st.session_state.ingest_info = {}
+    st.session_state.stage_cache = pl.StageCache()
+    st.session_state.original_fp = None
+    st.session_state.processed_fp = None
+    st.session_state.token_store = None
+
+dataset_store = pl.get_dataset_store()
+job_manager = jl.get_job_manager()
+
+LANGUAGES = {"Bahasa Indonesia": 'id', "English": 'en'}
+
+
+def sync_job_params():
+    """ID job yang dipantau disimpan di URL agar tab yang reconnect bisa melanjutkan."""
+    if st.session_state.job_ids:
+        st.query_params['job'] = st.session_state.job_ids
+    elif 'job' in st.query_params:
+        del st.query_params['job']
+    if st.session_state.apply_job:
+        st.query_params['apply'] = st.session_state.apply_job
+    elif 'apply' in st.query_params:
+        del st.query_params['apply']
+
+
+def apply_job_result(job):
+    """Memasang hasil job yang selesai sebagai dataset aktif, sama seperti proses langsung."""
+    result = job.result
+    token_store = jl.load_token_store(result, dataset_store)
+    if result['processed_path'] is None and token_store is None:
+        st.warning("Hasil job sudah tidak tersedia di server. Silakan proses ulang.")
+        return
+    st.session_state.datasets[job.dataset_name] = job.dataset_key
+    st.session_state.original_key = job.dataset_key
+    st.session_state.original_fp = result['original_fp']
+    st.session_state.active_dataset_name = job.dataset_name
+    st.session_state.data_loaded = True
+    st.session_state.selected_column = job.column
+    st.session_state.lang_select = next(k for k, v in LANGUAGES.items() if v == job.language)
+
+    st.session_state.pipeline_stats = result['pipeline_stats']
+    st.session_state.aggregates = result['aggregates']
+    st.session_state.aggregates_column = job.column
+    st.session_state.processed_fp = result['processed_fp']
+    st.session_state.processed_key = result['processed_key']
+    st.session_state.processed_path = result['processed_path']
+    st.session_state.processed_rows = result['processed_rows']
+    st.session_state.processed_columns = result['processed_columns']
+    st.session_state.token_store = token_store
+    st.session_state.sentiment_summary = result['sentiment']
+    st.session_state.run_memory = dict(result['plan'], **result['memory'])
+    st.session_state.data_processed = True
+
+
+# Job latar belakang yang dipantau sesi ini (dipulihkan dari URL untuk sesi baru)
+if 'job_ids' not in st.session_state:
+    st.session_state.job_ids = [job.id for job in job_manager.jobs(st.query_params.get_all('job'))]
+    st.session_state.apply_job = st.query_params.get('apply')
+    for job in job_manager.jobs(st.session_state.job_ids):
+        if job.dataset_key in dataset_store:
+            st.session_state.datasets.setdefault(job.dataset_name, job.dataset_key)
+
+# Job yang dimulai dengan "Mulai Proses" langsung dipasang begitu selesai
+if st.session_state.apply_job:
+    job = job_manager.get(st.session_state.apply_job)
+    if job is None or job.finished:
+        st.session_state.apply_job = None
+        sync_job_params()
+        if job is not None and job.status == jl.DONE:
+            apply_job_result(job)
+
+# Dataset aktif diambil dari store setiap rerun (dibaca ulang dari disk bila sudah di-spill)
+original_df = None
+processed_df = None
+if st.session_state.data_loaded:
+    original_df = dataset_store.get(st.session_state.original_key)
+    if original_df is None:
+        st.warning("Dataset aktif sudah dihapus dari penyimpanan server. Silakan upload ulang.")
+        st.session_state.data_loaded = False
+        st.session_state.data_processed = False
+        st.session_state.datasets = {
+            name: key for name, key in st.session_state.datasets.items() if key in dataset_store
+        }
+if st.session_state.data_processed:
+    if st.session_state.processed_path is not None:
+        # Mode chunk: DataFrame hasil tidak pernah dimuat utuh; tabel & unduhan dibaca dari Parquet
+        if not os.path.exists(st.session_state.processed_path):
+            st.session_state.data_processed = False
+    else:
+        processed_df = dataset_store.get(st.session_state.processed_key)
+        if processed_df is None:
+            st.session_state.data_processed = False
+
+# File ekspor milik sesi ini; dihapus saat data berubah atau sesi berakhir
+if 'exports' not in st.session_state:
+    st.session_state.exports = el.ExportManager()
+    el.sweep_stale()
+
+
+def export_controls(label, table_key, df, store, columns, renames, base_name):
+    """Pilihan format + tombol siapkan; file ekspor baru ditulis setelah tombol ditekan.
+
+    Untuk hasil mode chunk `df` dan `store` None; file disalin dari Parquet hasil per row group.
+    """
+    fingerprint = st.session_state.processed_fp
+    exports = st.session_state.exports
+    exports.invalidate(fingerprint)
+
+    col_fmt, col_prepare, col_download, _ = st.columns([1, 1, 1, 2], vertical_alignment="bottom")
+    with col_fmt:
+        fmt = st.selectbox(
+            "Format:", list(el.FORMATS), format_func=lambda f: el.FORMATS[f][0], key=f"export_fmt_{table_key}"
+        )
+    key = (fingerprint, table_key, fmt)
+    with col_prepare:
+        if st.button("⚙️ Siapkan File", key=f"export_prepare_{table_key}", width='stretch'):
+            with st.spinner("Menulis file..."):
+                if st.session_state.processed_path is not None:
+                    exports.export_spilled(
+                        key, st.session_state.processed_path, columns, renames, fmt, pl.TOKEN_COLUMNS
+                    )
+                else:
+                    exports.export(key, df, store, columns, renames, fmt)
+
+    path = exports.path_for(key)
+    if path is not None:
+        with col_download, open(path, 'rb') as f:
+            st.download_button(
+                label=label,
+                data=f,
+                file_name=f"{base_name}.{fmt}",
+                mime=el.FORMATS[fmt][1],
+                key=f"export_download_{table_key}",
+                width='stretch'
+            )
+
+
+def check_nltk_resources(pipeline_steps, lang_code):
+    """Data NLTK dicek sekali per proses, hanya jika konfigurasi ini memerlukannya; langkah disesuaikan."""
+    missing = pl.missing_nltk_resources(pipeline_steps, lang_code)
+    if 'punkt' in missing or 'punkt_tab' in missing:
+        st.warning("Data tokenizer NLTK tidak tersedia; memakai tokenizer cepat.")
+        pipeline_steps['tokenizer'] = 'fast'
+    if 'wordnet' in missing:
+        st.warning("Data WordNet tidak tersedia; lemmatization dilewati.")
+        pipeline_steps['lemmatization'] = False
+    if 'stopwords' in missing:
+        st.warning("Daftar stopword NLTK tidak tersedia; stopword bahasa Inggris tidak dibuang.")
+
+
+def submit_job(job, apply=False):
+    job_manager.submit(job)
+    st.session_state.job_ids.append(job.id)
+    if apply:
+        st.session_state.apply_job = job.id
+    sync_job_params()
+
+
+def job_panel(polling):
+    """Progress job latar belakang; di-poll tiap detik selama masih ada job yang berjalan/menunggu."""
+    jobs = job_manager.jobs(st.session_state.job_ids)
+    active = [job for job in jobs if not job.finished]
+    apply_job = job_manager.get(st.session_state.apply_job) if st.session_state.apply_job else None
+    if polling and (not active or (apply_job is not None and apply_job.finished)):
+        # Job selesai: rerun penuh agar hasil dipasang dan polling berhenti
+        st.rerun()
+    if not jobs:
+        return
+
+    st.write("**Antrean Proses**")
+    for job in jobs:
+        c_name, c_status, c_action = st.columns([2, 4, 1], vertical_alignment="center")
+        c_name.markdown(f"**{job.dataset_name}** • `{job.column}`")
+        if job.status == jl.RUNNING:
+            c_status.progress(
+                job.fraction,
+                text=f"{job.done_rows:,}/{job.total_rows:,} baris • {job.rows_per_sec:,.0f} baris/detik"
+            )
+        elif job.status == jl.QUEUED:
+            c_status.caption(f"⏳ Menunggu (antrean ke-{job_manager.position(job)})")
+        elif job.status == jl.DONE:
+            peak = (job.memory or {}).get('peak_rss_bytes')
+            c_status.caption(
+                f"✅ Selesai dalam {job.finished_at - job.started_at:.1f} s"
+                + (f" • puncak RSS {peak / 1024 ** 2:,.0f} MB" if peak else "")
+                + (" • hasil di disk (chunk)" if job.plan is not None and job.plan.spill else "")
+            )
+        elif job.status == jl.FAILED:
+            c_status.error(f"Gagal: {job.error}")
+        else:
+            c_status.caption("⏹️ Dibatalkan")
+
+        if not job.finished:
+            if c_action.button("⏹️ Batal", key=f"job_cancel_{job.id}", width='stretch'):
+                job_manager.cancel(job.id)
+        elif job.status == jl.DONE:
+            if c_action.button("📂 Buka", key=f"job_open_{job.id}", width='stretch'):
+                st.session_state.apply_job = job.id
+                st.rerun()
+
+    if not active and st.button("🧹 Bersihkan Daftar", key="job_clear"):
+        st.session_state.job_ids = []
+        sync_job_params()
+        st.rerun()
 
-# Load NLTK resources
-pl.load_nltk_resources()
+
+def show_jobs():
+    polling = any(not job.finished for job in job_manager.jobs(st.session_state.job_ids))
+    st.fragment(run_every=1.0 if polling else None)(job_panel)(polling)
 
 # --- UI Aplikasi ---
 
@@ -72,19 +290,56 @@ with st.sidebar:
     if uploaded_files:
         for uploaded_file in uploaded_files:
             if uploaded_file.name not in st.session_state.datasets:
+                # Header dibaca dulu; hanya kolom teks (dan user) yang diparsing
                 try:
-                    # UBAH DI SINI: Logika pengecekan tipe file
-                    if uploaded_file.name.endswith('.xlsx'):
-                        # Baca sebagai Excel
-                        df_temp = pd.read_excel(uploaded_file)
-                    else:
-                        # Baca sebagai CSV (Default)
-                        df_temp = pd.read_csv(uploaded_file)
-
-                    st.session_state.datasets[uploaded_file.name] = df_temp
-                    st.toast(f"Dataset '{uploaded_file.name}' dimuat!", icon="✅")
+                    header = io_logic.sniff_columns(uploaded_file, uploaded_file.name)
                 except Exception as e:
-                    st.error(f"Gagal memuat {uploaded_file.name}: {e}")
+                    st.error(f"Gagal membaca header {uploaded_file.name}: {e}")
+                    continue
+
+                with st.expander(f"📄 {uploaded_file.name} ({len(header)} kolom)", expanded=True):
+                    text_col = st.selectbox(
+                        "Kolom teks:", header, index=io_logic.guess_text_column(header),
+                        key=f"ingest_text_{uploaded_file.name}"
+                    )
+                    user_options = ["(tidak ada)"] + header
+                    user_guess = io_logic.guess_user_column(header)
+                    user_col = st.selectbox(
+                        "Kolom nama user:", user_options, index=0 if user_guess is None else user_guess + 1,
+                        key=f"ingest_user_{uploaded_file.name}"
+                    )
+                    all_columns = st.checkbox("Muat semua kolom", False, key=f"ingest_all_{uploaded_file.name}")
+                    load_file = st.button("⬆️ Muat", key=f"ingest_load_{uploaded_file.name}", width='stretch')
+
+                if load_file:
+                    columns = None if all_columns else list(dict.fromkeys(
+                        [text_col] + ([] if user_col == "(tidak ada)" else [user_col])
+                    ))
+                    try:
+                        # File + proyeksi kolom yang sama (dari sesi mana pun) hanya diparsing sekali
+                        key = ds.content_key(uploaded_file.getvalue() + repr(columns).encode('utf-8'))
+                        info = {}
+
+                        def parse_upload():
+                            df, info['parse'] = io_logic.read_table(uploaded_file, uploaded_file.name, columns)
+                            return df
+
+                        with st.spinner(f"Memuat {uploaded_file.name}..."):
+                            dataset_store.get_or_load(key, parse_upload)
+                        st.session_state.datasets[uploaded_file.name] = key
+                        if 'parse' in info:
+                            st.session_state.ingest_info[uploaded_file.name] = info['parse']
+                        st.toast(f"Dataset '{uploaded_file.name}' dimuat!", icon="✅")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Gagal memuat {uploaded_file.name}: {e}")
+
+    for name, parse in st.session_state.ingest_info.items():
+        if name in st.session_state.datasets:
+            st.caption(
+                f"⏱️ {name}: {parse['rows']:,} baris dalam {parse['seconds']:.2f} s "
+                f"({parse['rows_per_sec']:,.0f} baris/detik, {parse['engine']})"
+            )
     # st.divider()
     # '''st.markdown("""
     # <hr style="margin-top: 0px; margin-bottom: 0px; border: none; height: 1px; background-color: #444;">
@@ -109,18 +364,34 @@ with st.sidebar:
 
         # Tombol load dataset
         if st.button("📂 Buka Dataset", type="primary", width='stretch'):
-            st.session_state.original_df = st.session_state.datasets[selected_dataset_name]
+            st.session_state.original_key = st.session_state.datasets[selected_dataset_name]
+            # Fingerprint dihitung sekali di sini; semua cache memakai ini sebagai kunci
+            st.session_state.original_fp = pl.dataset_fingerprint(dataset_store.get(st.session_state.original_key))
             st.session_state.active_dataset_name = selected_dataset_name
             st.session_state.data_loaded = True
 
             # Reset processing state saat ganti dataset
             st.session_state.data_processed = False
-            st.session_state.processed_df = None
+            st.session_state.processed_key = None
+            st.session_state.processed_path = None
+            st.session_state.processed_fp = None
+            st.session_state.token_store = None
+            st.session_state.exports.cleanup()
+            # Job yang masih berjalan tidak lagi menimpa dataset aktif; hasilnya dibuka manual
+            st.session_state.apply_job = None
+            sync_job_params()
             st.rerun()
 
         if st.session_state.data_loaded and st.session_state.active_dataset_name:
             st.success(f"Sedang Aktif: **{st.session_state.active_dataset_name}**", icon="🟢")
 
+    usage = dataset_store.usage()
+    st.caption(
+        f"💾 Dataset server: {usage['datasets']} ({usage['in_memory']} di memori, {usage['spilled']} di disk) • "
+        f"RAM {usage['memory_bytes'] / 1024 ** 2:,.0f} / {usage['max_memory_bytes'] / 1024 ** 2:,.0f} MB • "
+        f"Disk {usage['disk_bytes'] / 1024 ** 2:,.0f} MB"
+    )
+
 # --- Tabs ---
 tab1, tab2 = st.tabs(["Preprocessing Teks", "Visualisasi Hasil"])
 
@@ -137,6 +408,7 @@ with tab1:
 
     if not st.session_state.data_loaded:
         st.info("Silakan upload dan pilih dataset di sidebar.")
+        show_jobs()
     else:
         st.divider()
 
@@ -148,22 +420,20 @@ with tab1:
             st.markdown("**Bahasa Dokumen:**")
             lang_option = st.selectbox(
                 "Pilih bahasa (untuk Stopwords/Stemmer):",
-                ("Bahasa Indonesia", "English"),
+                tuple(LANGUAGES),
                 key="lang_select"
             )
             st.session_state.selected_language = lang_option
 
         with col_conf2:
             st.markdown("**Kolom Teks Target:**")
-            cols = st.session_state.original_df.columns.tolist()
+            cols = original_df.columns.tolist()
 
-            # Auto-detect kolom
-            def_idx = 0
-            for i, c in enumerate(cols):
-                if "komentar" in c.lower() or "text" in c.lower() or "content" in c.lower():
-                    if "jumlah" not in c.lower():
-                        def_idx = i
-                        break
+            # Kolom terakhir (mis. dari hasil job) dipertahankan; selain itu auto-detect
+            if st.session_state.selected_column in cols:
+                def_idx = cols.index(st.session_state.selected_column)
+            else:
+                def_idx = io_logic.guess_text_column(cols)
 
             st.session_state.selected_column = st.selectbox(
                 "Pilih kolom berisi teks:",
@@ -171,10 +441,10 @@ with tab1:
                 index=def_idx
             )
 
-        total_rows = len(st.session_state.original_df)
+        total_rows = len(original_df)
         with st.expander(f"🔍 Lihat Preview Data Mentah (Total: {total_rows:,} baris)"):
             st.caption("Menampilkan 10 baris pertama saja untuk preview.")
-            st.dataframe(st.session_state.original_df.head(10), width='stretch')
+            st.dataframe(original_df.head(10), width='stretch')
 
         st.divider()
 
@@ -188,17 +458,75 @@ with tab1:
             st.caption("Pembersihan Dasar")
             pipeline_steps['case_folding'] = st.checkbox("Case Folding (Lowercase)", True, disabled=True)
             pipeline_steps['tokenization'] = st.checkbox("Tokenisasi & Simbol Cleaning", True, disabled=True)
+            tokenizer_mode = st.radio(
+                "Mode Tokenizer:",
+                ("NLTK (word_tokenize)", "Cepat (regex)"),
+                horizontal=True,
+                help="Mode cepat hanya berbeda dari NLTK pada kontraksi Inggris (don't, it's) dan beberapa kasus tepi."
+            )
+            pipeline_steps['tokenizer'] = 'fast' if tokenizer_mode.startswith("Cepat") else 'nltk'
             pipeline_steps['stopword_removal'] = st.checkbox("Stopword Removal", True)
 
         with c_tech2:
             st.caption("Normalisasi Lanjutan")
             pipeline_steps['normalization'] = st.checkbox("Normalisasi Kata Baku (Kamus)", False)
+            if pipeline_steps['normalization']:
+                try:
+                    _, kamus_info = pl.load_kamus_with_info()
+                    st.caption(
+                        f"Kamus: {kamus_info['entries']:,} entri, dimuat dalam {kamus_info['load_ms']:.0f} ms"
+                        + (" (artefak dibangun ulang)" if kamus_info['rebuilt'] else "")
+                    )
+                except Exception as e:
+                    st.error(f"Kamus kata baku gagal dimuat: {e}")
+                    pipeline_steps['normalization'] = False
 
             if st.session_state.selected_language == "Bahasa Indonesia":
                 pipeline_steps['stemming'] = st.checkbox("Stemming (Sastrawi)", True)
             else:
                 pipeline_steps['lemmatization'] = st.checkbox("Lemmatization (NLTK)", True)
 
+            pipeline_steps['sentiment'] = st.checkbox(
+                "Skor Sentimen (Leksikon)",
+                False,
+                help="Skor = jumlah bobot kata leksikon di hasil akhir; kata negasi (tidak, bukan, ...) membalik kata berikutnya."
+            )
+
+        col_workers, col_empty = st.columns([1, 3])
+        with col_workers:
+            n_workers = st.number_input(
+                "Jumlah Worker (CPU):",
+                min_value=1,
+                max_value=os.cpu_count() or 1,
+                value=pe.default_workers(),
+                help="Data kecil tetap diproses serial karena start worker lebih mahal."
+            )
+        approx_freq = st.checkbox(
+            "Frekuensi kata perkiraan (hemat memori)",
+            False,
+            help="Top-N dihitung dengan algoritma Space-Saving; cocok untuk korpus dengan jutaan kata unik."
+        )
+
+        col_memory, col_plan = st.columns([1, 3], vertical_alignment="bottom")
+        with col_memory:
+            memory_mode = st.selectbox(
+                "Mode Memori:",
+                list(ml.MODES),
+                format_func=ml.MODES.get,
+                help="Otomatis: hasil ditulis per chunk ke disk (Parquet) bila perkiraan memori melebihi anggaran."
+            )
+        if st.session_state.selected_column in original_df.columns:
+            plan = ml.plan_run(
+                original_df[st.session_state.selected_column],
+                dataset_store.nbytes(st.session_state.original_key),
+                mode=memory_mode
+            )
+            col_plan.caption(
+                f"🧮 Perkiraan memori run: {plan.estimate_bytes / 1024 ** 2:,.0f} MB "
+                f"(anggaran {plan.budget_bytes / 1024 ** 2:,.0f} MB) → "
+                + ("chunk ke disk" if plan.spill else "di memori")
+            )
+
         st.write("")
 
         # Tombol Eksekusi
@@ -206,63 +534,170 @@ with tab1:
         with col_btn:
             start_process = st.button("🚀 Mulai Proses", type="primary", width='stretch')
 
-        if start_process:
-            if st.session_state.selected_column:
-                with st.spinner("Sedang memproses..."):
-                    df_proc = st.session_state.original_df.copy()
-                    lang_code = 'id' if st.session_state.selected_language == "Bahasa Indonesia" else 'en'
-
-                    # Apply Pipeline
-                    results = df_proc[st.session_state.selected_column].astype(str).apply(
-                        lambda x: pl.preprocess_pipeline(x, pipeline_steps, lang_code)
-                    )
-
-                    # Explode results to columns
-                    df_res = pd.DataFrame(results.tolist(), index=results.index)
-                    df_res.columns = ['Teks_Clean', 'Tokens_Awal', 'Tokens_Filtered', 'Tokens_Stemmed', 'Teks_Final_Joined']
-
-                    df_proc = df_proc.join(df_res)
-                    df_proc['Jumlah_Tokens_Akhir'] = df_res['Tokens_Stemmed'].apply(len)
-
-                    if 'No' not in df_proc.columns:
-                        df_proc.insert(0, 'No', range(1, len(df_proc) + 1))
+        # Dataset lain di library bisa diantrekan dengan konfigurasi yang sama
+        other_datasets = [name for name in st.session_state.datasets if name != st.session_state.active_dataset_name]
+        queue_names = []
+        if other_datasets:
+            col_queue, col_queue_btn, _ = st.columns([3, 1, 1], vertical_alignment="bottom")
+            with col_queue:
+                queue_names = st.multiselect("Antrekan dataset lain (konfigurasi sama):", other_datasets)
+            with col_queue_btn:
+                queue_process = st.button("➕ Tambah ke Antrean", disabled=not queue_names, width='stretch')
+        else:
+            queue_process = False
 
-                    st.session_state.processed_df = df_proc
-                    st.session_state.data_processed = True
-                    st.rerun()
+        if start_process or queue_process:
+            if st.session_state.selected_column:
+                lang_code = LANGUAGES[st.session_state.selected_language]
+                check_nltk_resources(pipeline_steps, lang_code)
+                # Stemmer/kamus/cache stem dimuat di thread skrip (spinner tampil di sini), job tinggal memakai
+                with st.spinner("Memuat resource..."):
+                    pl.load_pipeline_resources(pipeline_steps, lang_code)
+                    if pipeline_steps['sentiment']:
+                        try:
+                            sl.lexicon_for(pipeline_steps, lang_code)
+                        except sl.LexiconError as e:
+                            st.error(f"Leksikon sentimen gagal dimuat: {e}")
+                            pipeline_steps['sentiment'] = False
+                # Diproses di thread latar belakang; hasil antar tahap tetap di-cache per sesi
+                job_options = dict(
+                    language=lang_code,
+                    pipeline_steps=pipeline_steps,
+                    workers=int(n_workers),
+                    approx_freq=approx_freq,
+                    stage_cache=st.session_state.stage_cache,
+                    memory_mode=memory_mode
+                )
+                if start_process:
+                    submit_job(jl.Job(
+                        st.session_state.active_dataset_name, st.session_state.original_key,
+                        st.session_state.selected_column, original_fp=st.session_state.original_fp, **job_options
+                    ), apply=True)
+                for name in queue_names if queue_process else ():
+                    key = st.session_state.datasets[name]
+                    queued_df = dataset_store.get(key)
+                    if queued_df is None:
+                        st.warning(f"Dataset '{name}' sudah tidak ada di server; dilewati.")
+                        continue
+                    queued_cols = queued_df.columns.tolist()
+                    column = st.session_state.selected_column
+                    if column not in queued_cols:
+                        column = queued_cols[io_logic.guess_text_column(queued_cols)]
+                    submit_job(jl.Job(name, key, column, **job_options))
             else:
                 st.error("Pilih kolom teks dulu!")
 
+        show_jobs()
+
         # 4. Hasil
         if st.session_state.data_processed:
             st.divider()
             st.subheader("Hasil Preprocessing Lengkap")
 
             # Pesan Total Data
-            total_rows = len(st.session_state.processed_df)
+            total_rows = st.session_state.processed_rows
+            spilled = st.session_state.processed_path is not None
             st.info(f"✅ **Sukses!** Total data berhasil diproses: **{total_rows}** baris.")
+            if spilled:
+                st.caption(
+                    "💽 Mode chunk: hasil ditulis per chunk ke disk (Parquet) dan tidak dimuat utuh ke memori. "
+                    "Tabel dibaca per halaman dari file; pencarian teks tidak tersedia."
+                )
 
-            # Display Table
-            disp_df = st.session_state.processed_df.copy()
-            disp_df.rename(columns={st.session_state.selected_column: 'Teks Asli'}, inplace=True)
-
-            # Convert lists to string for display
-            for col in ['Tokens_Awal', 'Tokens_Filtered', 'Tokens_Stemmed']:
-                if col in disp_df.columns:
-                    disp_df[col] = disp_df[col].apply(lambda x: ', '.join(x) if isinstance(x, list) else str(x))
+            run_stats = st.session_state.get('pipeline_stats')
+            if run_stats is not None:
+                with st.expander("⏱️ Statistik Pipeline (waktu & counter per tahap)"):
+                    summary = run_stats.summary()
+                    m1, m2, m3, m4 = st.columns(4)
+                    m1.metric("Total Waktu Tahap", f"{summary['total_seconds']:.2f} s")
+                    m2.metric("Stopword Dibuang", f"{summary['stopword_drop_rate']:.1%}")
+                    m3.metric("Penggantian Kamus", f"{summary['kamus_replacements']:,}")
+                    m4.metric("Hit Rate Cache Stem", f"{summary['stem_cache_hit_rate']:.1%}")
+                    stage_cache = st.session_state.stage_cache
+                    st.caption(
+                        f"Teks duplikat: {summary['duplicate_rows']:,} baris ({summary['duplicate_ratio']:.1%}), "
+                        f"diproses sekali • perkiraan waktu hemat {summary['dedupe_seconds_saved']:.2f} s"
+                    )
+                    st.caption(
+                        f"Tahap dari cache: {summary['cached_stages']} • Cache tahap: {len(stage_cache)} entri, "
+                        f"{stage_cache.used_bytes / 1024 ** 2:,.0f} / {stage_cache.max_bytes / 1024 ** 2:,.0f} MB"
+                    )
+                    st.dataframe(pd.DataFrame(summary['stages']), width='stretch', hide_index=True)
+
+                    run_memory = st.session_state.get('run_memory')
+                    if run_memory is not None:
+                        r1, r2, r3, r4 = st.columns(4)
+                        r1.metric("Puncak RSS", f"{(run_memory['peak_rss_bytes'] or 0) / 1024 ** 2:,.0f} MB")
+                        if run_memory['peak_delta_bytes'] is not None:
+                            r2.metric("Kenaikan RSS Run", f"{run_memory['peak_delta_bytes'] / 1024 ** 2:,.0f} MB")
+                        r3.metric(
+                            "Perkiraan / Anggaran",
+                            f"{run_memory['estimate_bytes'] / 1024 ** 2:,.0f} / "
+                            f"{run_memory['budget_bytes'] / 1024 ** 2:,.0f} MB"
+                        )
+                        r4.metric("Mode", "Chunk ke disk" if run_memory['mode'] == ml.MODE_SPILL else "Di memori")
+
+                    d1, d2, _ = st.columns([1, 1, 3])
+                    d1.download_button(
+                        "📥 Statistik (JSON)", run_stats.to_json(),
+                        file_name="pipeline_stats.json", mime="application/json"
+                    )
+                    d2.download_button(
+                        "📥 Statistik (CSV)", run_stats.to_csv(),
+                        file_name="pipeline_stats.csv", mime="text/csv"
+                    )
 
-            cols_show = ['No', 'Teks Asli', 'Teks_Clean', 'Tokens_Filtered', 'Tokens_Stemmed']
-            cols_final = [c for c in cols_show if c in disp_df.columns]
+            # Display Table (per halaman; hanya baris yang terlihat yang diformat)
+            store = st.session_state.token_store
+            processed_fp = st.session_state.processed_fp
+            text_col = st.session_state.selected_column
+
+            cols_show = [
+                'No', text_col, 'Teks_Clean', 'Tokens_Filtered', 'Tokens_Stemmed', sl.SCORE_COLUMN, sl.LABEL_COLUMN
+            ]
+            cols_final = tuple(c for c in cols_show if c in st.session_state.processed_columns)
+            renames = ((text_col, 'Teks Asli'),)
+
+            col_search, col_size, col_page = st.columns([3, 1, 1], vertical_alignment="bottom")
+            with col_search:
+                query = st.text_input(
+                    "Cari teks:", key="results_query", placeholder="kata atau frasa...", disabled=spilled
+                ).strip()
+            with col_size:
+                page_size = st.selectbox("Baris per halaman:", tl.PAGE_SIZES, index=1, key="results_page_size")
+
+            search_columns = (text_col, 'Teks_Clean')
+            if spilled:
+                query = ""
+                n_matches = total_rows
+            else:
+                positions = tl.filter_positions(processed_df, processed_fp, search_columns, query)
+                filter_key = (search_columns, query)
+                n_matches = len(positions)
+            n_pages = tl.page_count(n_matches, page_size)
+            if st.session_state.get('results_page', 1) > n_pages:
+                # Filter/ukuran halaman berubah: halaman lama bisa di luar jangkauan
+                st.session_state.results_page = 1
+            with col_page:
+                page = st.number_input(f"Halaman (dari {n_pages:,}):", 1, n_pages, 1, key="results_page")
+
+            def results_page(columns, renames, token_store):
+                if spilled:
+                    return tl.read_spilled_page(
+                        st.session_state.processed_path, int(page), page_size, columns, renames, pl.TOKEN_COLUMNS
+                    )
+                return tl.format_page(
+                    processed_df, token_store, processed_fp, positions, filter_key, int(page), page_size,
+                    columns, renames
+                )
 
-            st.dataframe(disp_df[cols_final], width='stretch', hide_index=True)
+            st.dataframe(results_page(cols_final, renames, store), width='stretch', hide_index=True)
+            st.caption(f"{n_matches:,} baris cocok" + (f" dengan \"{query}\"" if query else ""))
 
-            # Download Pertama
-            csv = pl.convert_df_to_csv(disp_df[cols_final])
-            st.download_button(
-                label="📥 Unduh Hasil Ini",
-                data=csv,
-                file_name=f"clean_full_{st.session_state.active_dataset_name}",
-                mime="text/csv"
+            # Download Pertama (file ditulis per chunk ke disk hanya saat diminta)
+            export_controls(
+                "📥 Unduh Hasil Ini", "full", processed_df, store, cols_final, renames,
+                f"clean_full_{os.path.splitext(st.session_state.active_dataset_name)[0]}"
             )
 
             # --- INI BAGIAN TABEL RINGKAS ---
@@ -272,14 +707,10 @@ with tab1:
             st.write("Pilih kolom yang berisi **Nama User** untuk ditampilkan berdampingan dengan hasil akhir:")
 
             # 1. Dropdown untuk memilih kolom User (karena nama kolom bisa beda-beda)
-            all_columns = st.session_state.original_df.columns.tolist()
+            all_columns = original_df.columns.tolist()
 
             # Logic menebak kolom user secara otomatis
-            user_idx_pred = 0
-            for i, col in enumerate(all_columns):
-                if "user" in col.lower() or "nama" in col.lower() or "author" in col.lower():
-                    user_idx_pred = i
-                    break
+            user_idx_pred = io_logic.guess_user_column(all_columns) or 0
             col_user_input, col_spacer = st.columns([1, 3])
 
             with col_user_input:
@@ -290,24 +721,19 @@ with tab1:
                     key="select_user_col_final"
                 )
 
-            # 2. Membuat Dataframe Khusus (User + Teks Final)
-            if selected_user_col and 'Teks_Final_Joined' in st.session_state.processed_df.columns:
-                simple_df = pd.DataFrame()
-                # Ambil kolom user dari data asli (pastikan index aman)
-                simple_df['Nama User'] = st.session_state.processed_df[selected_user_col]
-                # Ambil hasil processing
-                simple_df['Komentar Hasil Akhir'] = st.session_state.processed_df['Teks_Final_Joined']
+            # 2. Tabel Khusus (User + Teks Final), memakai halaman & filter yang sama
+            if selected_user_col and 'Teks_Final_Joined' in st.session_state.processed_columns:
+                simple_cols = (selected_user_col, 'Teks_Final_Joined')
+                simple_renames = ((selected_user_col, 'Nama User'), ('Teks_Final_Joined', 'Komentar Hasil Akhir'))
 
                 # Tampilkan Tabel
-                st.dataframe(simple_df, width='stretch', hide_index=True)
+                st.dataframe(results_page(simple_cols, simple_renames, None), width='stretch', hide_index=True)
 
                 # 3. Tombol Download Khusus
-                csv_simple = pl.convert_df_to_csv(simple_df)
-                st.download_button(
-                    label="📥 Unduh (User + Komentar)",
-                    data=csv_simple,
-                    file_name=f"clean_simple_{st.session_state.active_dataset_name}",
-                    mime="text/csv"
+                export_controls(
+                    "📥 Unduh (User + Komentar)", f"simple:{selected_user_col}", processed_df, None,
+                    simple_cols, simple_renames,
+                    f"clean_simple_{os.path.splitext(st.session_state.active_dataset_name)[0]}"
                 )
             # --- AKHIR BAGIAN TABEL RINGKAS ---
 
@@ -320,24 +746,39 @@ with tab2:
     elif not st.session_state.selected_column:
         st.warning("Pilih kolom teks di Tab Preprocessing dulu.")
     else:
+        # Frekuensi (murah, dari agregat/cache) dihitung dulu, lalu kedua panel dirender paralel
+        raw_fp = f"{st.session_state.original_fp}:{st.session_state.selected_column}"
+        aggregates = st.session_state.get('aggregates') if st.session_state.data_processed else None
+        if aggregates is not None and st.session_state.get('aggregates_column') == st.session_state.selected_column:
+            # Sudah dihitung selama pipeline berjalan: tidak perlu memindai ulang kolom
+            df_freq_raw = aggregates.top_frame('raw')
+        else:
+            raw_series = original_df[st.session_state.selected_column]
+            df_freq_raw = vl.raw_word_frequency(raw_series, raw_fp)
+
+        panels = {}
+        if not df_freq_raw.empty:
+            panels['raw'] = df_freq_raw
+        if st.session_state.data_processed:
+            df_freq_clean = st.session_state.aggregates.top_frame('final')
+            if not df_freq_clean.empty:
+                panels['clean'] = df_freq_clean
+        with st.spinner("Generate visualisasi..."):
+            images = vl.render_panels(panels)
+
         # Visualisasi Data Mentah
         st.subheader("Data Mentah (Sebelum)")
-        with st.spinner("Generate visualisasi awal..."):
-            raw_series = st.session_state.original_df[st.session_state.selected_column]
-            df_freq_raw = vl.calculate_word_frequency(raw_series, is_tokenized=False)
-
-            if not df_freq_raw.empty:
-                c1, c2 = st.columns(2)
-                with c1:
-                    st.write("**Word Cloud**")
-                    wc_raw = vl.create_wordcloud(dict(zip(df_freq_raw['Kata'], df_freq_raw['Frekuensi'])))
-                    st.image(wc_raw.to_array(), width='stretch')
-                with c2:
-                    st.write("**20 Top Kata**")
-                    fig_raw = vl.plot_word_frequency_seaborn(df_freq_raw)
-                    st.pyplot(fig_raw)
-            else:
-                st.warning("Data mentah kosong/tidak terbaca.")
+        if 'raw' in images:
+            wc_raw, bar_raw = images['raw']
+            c1, c2 = st.columns(2)
+            with c1:
+                st.write("**Word Cloud**")
+                st.image(wc_raw, width='stretch')
+            with c2:
+                st.write("**20 Top Kata**")
+                st.image(bar_raw, width='stretch')
+        else:
+            st.warning("Data mentah kosong/tidak terbaca.")
 
         st.divider()
 
@@ -349,26 +790,35 @@ with tab2:
         else:
             # Statistik
             stats_col1, stats_col2 = st.columns(2)
-            avg_bef, avg_aft = vl.calculate_basic_stats(
-                st.session_state.processed_df[st.session_state.selected_column],
-                st.session_state.processed_df['Teks_Final_Joined']
-            )
+            aggregates = st.session_state.aggregates
+            avg_bef, avg_aft = aggregates.average_words()
 
             stats_col1.metric("Avg Kata (Sebelum)", f"{avg_bef:.1f}")
             stats_col2.metric("Avg Kata (Sesudah)", f"{avg_aft:.1f}", delta=f"{avg_aft - avg_bef:.1f}")
 
             # Plotting
-            with st.spinner("Generate visualisasi akhir..."):
-                clean_series = st.session_state.processed_df['Tokens_Stemmed']
-                df_freq_clean = vl.calculate_word_frequency(clean_series, is_tokenized=True)
-
-                if not df_freq_clean.empty:
-                    c3, c4 = st.columns(2)
-                    with c3:
-                        st.write("**Word Cloud**")
-                        wc_clean = vl.create_wordcloud(dict(zip(df_freq_clean['Kata'], df_freq_clean['Frekuensi'])))
-                        st.image(wc_clean.to_array(), width='stretch')
-                    with c4:
-                        st.write("**20 Top Kata**")
-                        fig_clean = vl.plot_word_frequency_seaborn(df_freq_clean)
-                        st.pyplot(fig_clean)
+            if 'clean' in images:
+                wc_clean, bar_clean = images['clean']
+                c3, c4 = st.columns(2)
+                with c3:
+                    st.write("**Word Cloud**")
+                    st.image(wc_clean, width='stretch')
+                with c4:
+                    st.write("**20 Top Kata**")
+                    st.image(bar_clean, width='stretch')
+
+            # Distribusi sentimen (hanya jika skor dihitung saat proses)
+            summary = st.session_state.get('sentiment_summary')
+            if summary is not None:
+                st.divider()
+                st.subheader("Distribusi Sentimen")
+                counts = summary.label_counts()
+                total = max(summary.rows, 1)
+                s1, s2, s3 = st.columns(3)
+                s1.metric("Positif", f"{counts['positif']:,}", f"{counts['positif'] / total:.1%}", delta_color='off')
+                s2.metric("Netral", f"{counts['netral']:,}", f"{counts['netral'] / total:.1%}", delta_color='off')
+                s3.metric("Negatif", f"{counts['negatif']:,}", f"{counts['negatif'] / total:.1%}", delta_color='off')
+                st.image(
+                    vl.render_sentiment_distribution(summary, st.session_state.processed_fp),
+                    width='stretch'
+                )
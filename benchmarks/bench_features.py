@@ -0,0 +1,140 @@
+"""Benchmark ekstraksi fitur sparse (feature_logic) vs sklearn pada string `Teks_Final_Joined`.
+
+Contoh:
+    uv run python benchmarks/bench_features.py --size 1m
+    uv run python benchmarks/bench_features.py --size 100k --ngram 1 2 --out bench_features.json
+
+Korpus sintetis diproses sekali dengan pipeline (tokenizer cepat) menjadi TokenStore. Lalu
+setiap mode (hash, tfidf) diukur dua kali: tanpa tracemalloc untuk waktu/throughput, dan dengan
+tracemalloc untuk puncak alokasi selama ekstraksi (array numpy ikut terhitung). Pembanding
+adalah alur downstream lama: sklearn HashingVectorizer/TfidfVectorizer atas string gabungan
+(`str.split` sebagai tokenizer), dengan matriks hasil yang sama tetapi tanpa menulis ke disk;
+feature_logic diukur termasuk penulisan .npz (terkompresi dan tanpa kompresi).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feature_logic as fl  # noqa: E402
+import preprocessing_logic as pl  # noqa: E402
+import token_store as ts  # noqa: E402
+from benchmarks.corpus import SIZES, generate_corpus  # noqa: E402
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure(func, memory):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_case(name, func, rows, memory):
+    result, seconds, _ = _measure(func, False)
+    peak = _measure(func, True)[2] if memory else None
+    r = {
+        'case': name,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else None,
+        'peak_alloc_mb': peak,
+        'nnz': int(result),
+    }
+    print(
+        f"{name:<52} {r['rows_per_sec'] or 0:>12,.0f} baris/dtk  {seconds:7.2f} s  "
+        f"puncak alokasi={peak or 0:8.1f} MB  nnz={r['nnz']:,}"
+    )
+    return r
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=list(SIZES), default='1m')
+    parser.add_argument('--ngram', nargs=2, type=int, default=[1, 2], metavar=('MIN', 'MAX'))
+    parser.add_argument('--chunk-size', type=int, default=fl.DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran tracemalloc (lebih cepat)")
+    parser.add_argument('--skip-sklearn', action='store_true', help="Lewati pembanding sklearn atas string gabungan")
+    parser.add_argument('--out', default='bench_features.json')
+    args = parser.parse_args(argv)
+
+    n_rows = SIZES[args.size]
+    ngram_range = tuple(args.ngram)
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast')
+    start = time.perf_counter()
+    df_res = pl.preprocess_series(generate_corpus(n_rows), steps, 'id', vocab_first=True, dedupe=True)
+    store = ts.TokenStore.from_frame(df_res[['Tokens_Stemmed']], ['Tokens_Stemmed'])
+    column = store.column('Tokens_Stemmed')
+    joined = df_res['Teks_Final_Joined'].tolist()
+    del df_res
+    print(f"Korpus {n_rows:,} baris disiapkan dalam {time.perf_counter() - start:.1f} s")
+
+    out_dir = tempfile.mkdtemp(prefix='bench_features_')
+    memory = not args.no_memory
+    results = []
+    try:
+        for mode in fl.MODES:
+            for compressed in (True, False):
+                def run(mode=mode, compressed=compressed):
+                    meta = fl.extract_features(
+                        column, out_dir, mode, ngram_range, chunk_size=args.chunk_size, compressed=compressed
+                    )
+                    return meta['nnz']
+
+                label = 'npz terkompresi' if compressed else 'npz tanpa kompresi'
+                r = bench_case(f"feature_logic {mode} {ngram_range}, {label}", run, n_rows, memory)
+                r['disk_mb'] = sum(
+                    os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir)
+                ) / 1024 ** 2
+                results.append(r)
+
+        if not args.skip_sklearn:
+            from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+            options = dict(tokenizer=str.split, token_pattern=None, lowercase=False, ngram_range=ngram_range)
+            cases = {
+                'hash': lambda: HashingVectorizer(n_features=fl.DEFAULT_N_FEATURES, **options).transform(joined).nnz,
+                'tfidf': lambda: TfidfVectorizer(**options).fit_transform(joined).nnz,
+            }
+            for mode, func in cases.items():
+                results.append(bench_case(f"sklearn {mode} (string gabungan)", func, n_rows, memory))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'rows': n_rows,
+            'ngram_range': list(ngram_range),
+            'peak_rss_mb': peak_rss_mb(),
+        },
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Peak RSS proses {peak_rss_mb():.0f} MB; hasil disimpan ke {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Load test `http_service`: request/detik, teks/detik dan latensi p50/p99 per ukuran batch.
+
+Contoh:
+    uv run python benchmarks/bench_http_service.py --batch-sizes 1 10 100 1000 --concurrency 4
+    uv run python benchmarks/bench_http_service.py --url http://127.0.0.1:8765 --duration 30
+
+Tanpa `--url`, service dijalankan sebagai subprocess lokal (mode offline) selama benchmark.
+Setiap klien memakai satu koneksi keep-alive dan mengirim batch JSON berturut-turut selama
+`--duration` detik per ukuran batch; respons NDJSON dibaca sampai habis. Request yang ditolak
+(503, antrean penuh) dihitung terpisah dan tidak masuk statistik latensi.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_service(port, extra_args):
+    env = dict(os.environ, SA_OFFLINE='1')
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'http_service', '--port', str(port), '--offline', *extra_args],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("Service gagal start")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/healthz')
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("Service tidak merespons")
+
+
+def _client(host, port, bodies, stop_at, results):
+    conn = http.client.HTTPConnection(host, port, timeout=300)
+    i = 0
+    while time.perf_counter() < stop_at:
+        body = bodies[i % len(bodies)]
+        i += 1
+        start = time.perf_counter()
+        conn.request('POST', '/preprocess', body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        data = response.read()
+        latency = time.perf_counter() - start
+        if response.status == 200:
+            results['latencies'].append(latency)
+            results['lines'] += data.count(b'\n')
+        elif response.status == 503:
+            results['rejected'] += 1
+            time.sleep(float(response.getheader('Retry-After', '1')) / 10)
+        else:
+            results['errors'] += 1
+    conn.close()
+
+
+def run_load(host, port, batch_size, concurrency, duration, language, pipeline_steps):
+    texts = generate_corpus(max(batch_size * 8, 1_000), language).tolist()
+    bodies = [
+        json.dumps({
+            'texts': texts[start:start + batch_size], 'language': language, 'pipeline_steps': pipeline_steps
+        }).encode('utf-8')
+        for start in range(0, len(texts) - batch_size + 1, batch_size)
+    ]
+    # Satu dict hasil per klien, digabung setelah semua thread selesai
+    per_client = [{'latencies': [], 'lines': 0, 'rejected': 0, 'errors': 0} for _ in range(concurrency)]
+    stop_at = time.perf_counter() + duration
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=_client, args=(host, port, bodies, stop_at, results)) for results in per_client
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    results = {key: sum(r[key] for r in per_client) for key in ('lines', 'rejected', 'errors')}
+    latencies = np.array([latency for r in per_client for latency in r['latencies']])
+    return {
+        'batch_size': batch_size,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'rejected': results['rejected'],
+        'errors': results['errors'],
+        'requests_per_sec': len(latencies) / elapsed,
+        'texts_per_sec': results['lines'] / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1e3) if len(latencies) else None,
+        'p99_ms': float(np.percentile(latencies, 99) * 1e3) if len(latencies) else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="Service yang sudah berjalan; tanpa ini service dijalankan lokal")
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 10, 100, 1000])
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0, help="Detik per ukuran batch")
+    parser.add_argument('--language', choices=['id', 'en'], default='id')
+    parser.add_argument('--service-args', default='', help="Argumen tambahan untuk http_service (mode lokal)")
+    parser.add_argument('--out', default='bench_http_service.json')
+    args = parser.parse_args(argv)
+
+    proc = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', _free_port()
+        proc = start_service(port, args.service_args.split())
+
+    pipeline_steps = {'tokenizer': 'fast'}
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [],
+    }
+    try:
+        for batch_size in args.batch_sizes:
+            r = run_load(host, port, batch_size, args.concurrency, args.duration, args.language, pipeline_steps)
+            report['results'].append(r)
+            print(
+                f"batch {batch_size:>6,}  {r['requests_per_sec']:8.1f} req/dtk  {r['texts_per_sec']:10,.0f} teks/dtk  "
+                f"p50={r['p50_ms'] or 0:8.1f}ms p99={r['p99_ms'] or 0:8.1f}ms  ditolak={r['rejected']} error={r['errors']}"
+            )
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request('GET', '/metrics?format=json')
+        report['server_metrics'] = json.loads(conn.getresponse().read())
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.out}")
+
+
+if __name__ == '__main__':
+    main()
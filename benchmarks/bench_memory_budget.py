@@ -0,0 +1,110 @@
+"""Benchmark anggaran memori: perkiraan memory_logic vs kenaikan RSS nyata run_job, mode memori vs chunk.
+
+Contoh:
+    uv run python benchmarks/bench_memory_budget.py --sizes 100k 1m
+    uv run python benchmarks/bench_memory_budget.py --sizes 1m --workers 4 --out bench_memory_budget.json
+
+Setiap kasus (ukuran x mode) dijalankan di proses Python baru agar RSS awal sama. Korpus sintetis
+dibuat dan disimpan di DatasetStore sebelum pengukuran; yang diukur hanya run_job (RssMonitor:
+puncak RSS proses + worker dikurangi RSS awal). Dengan --workers 1 semua tahap berjalan di proses
+yang sama sehingga kenaikan RSS bisa dibandingkan langsung dengan perkiraan; dengan lebih banyak
+worker, RSS worker (interpreter + resource pipeline) ikut terhitung.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import SIZES  # noqa: E402
+
+MODES = ('memory', 'spill')
+
+_CASE_SNIPPET = """
+import json
+import time
+
+import pandas as pd
+import job_logic as jl
+import preprocessing_logic as pl
+from benchmarks.corpus import generate_corpus
+
+def main():
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast', sentiment=True)
+    if pl.missing_nltk_resources(steps, {language!r}, offline=True):
+        steps['lemmatization'] = False
+    pl.load_pipeline_resources(steps, {language!r})
+    store = pl.get_dataset_store()
+    df = pd.DataFrame({{'komentar': generate_corpus({rows}, {language!r}).to_numpy()}})
+    store.put('bench', df)
+    del df
+    job = jl.Job('bench', 'bench', 'komentar', {language!r}, steps, workers={workers}, memory_mode={mode!r})
+    start = time.perf_counter()
+    result = jl.run_job(job, store)
+    seconds = time.perf_counter() - start
+    jl.remove_result_file(result['processed_path'])
+    print(json.dumps(dict(result['plan'], **result['memory'], seconds=seconds)))
+
+if __name__ == '__main__':
+    main()
+"""
+
+
+def run_case(rows, mode, language, workers, spill_dir):
+    env = dict(os.environ, SA_OFFLINE='1', SA_RESULT_SPILL_DIR=spill_dir)
+    out = subprocess.run(
+        [sys.executable, '-c', _CASE_SNIPPET.format(rows=rows, mode=mode, language=language, workers=workers)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['100k', '1m'])
+    parser.add_argument('--language', choices=['id', 'en'], default='id')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--out', default='bench_memory_budget.json')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for size in args.sizes:
+            for mode in MODES:
+                r = run_case(SIZES[size], mode, args.language, args.workers, spill_dir)
+                r.update(case=f"{size} {mode}")
+                delta_mb = r['peak_delta_bytes'] / 1024 ** 2
+                estimate_mb = r['estimate_bytes'] / 1024 ** 2
+                # Perkiraan hanya berlaku untuk mode memori; mode chunk dibandingkan dengannya
+                r['estimate_ratio'] = r['estimate_bytes'] / r['peak_delta_bytes'] if r['peak_delta_bytes'] else None
+                results.append(r)
+                print(
+                    f"{r['case']:<14} {r['seconds']:7.1f} s  kenaikan RSS={delta_mb:8.0f} MB  "
+                    f"puncak={r['peak_rss_bytes'] / 1024 ** 2:8.0f} MB  perkiraan={estimate_mb:8.0f} MB  "
+                    f"perkiraan/nyata={r['estimate_ratio'] or 0:5.2f}"
+                )
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'language': args.language,
+            'workers': args.workers,
+        },
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.out}")
+
+
+if __name__ == '__main__':
+    main()
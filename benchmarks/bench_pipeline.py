@@ -0,0 +1,196 @@
+"""Benchmark tiap tahap pipeline preprocessing dan helper visualisasi (tanpa Streamlit/browser).
+
+Contoh:
+    uv run python benchmarks/bench_pipeline.py --sizes 1k 100k --out bench.json
+    uv run python benchmarks/bench_pipeline.py --sizes 1k --baseline bench.json
+
+Tahap per-baris diukur pada sampel maksimal `--stage-sample` baris (latensi p50/p99 per baris);
+`preprocess_series`, `calculate_word_frequency` dan render visualisasi dijalankan pada seluruh korpus.
+Stemming/lemmatization diukur tanpa cache stem persisten agar yang terukur adalah Sastrawi/NLTK.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import preprocessing_logic as pl  # noqa: E402
+import visualization_logic as vl  # noqa: E402
+from benchmarks.corpus import SIZES, generate_corpus  # noqa: E402
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _uncached(func):
+    # Lewati st.cache_data agar yang terukur adalah fungsi aslinya
+    return getattr(func, '__wrapped__', func)
+
+
+def time_per_row(func, items):
+    latencies = np.empty(len(items))
+    outputs = []
+    for i, item in enumerate(items):
+        start = time.perf_counter()
+        outputs.append(func(item))
+        latencies[i] = time.perf_counter() - start
+    return latencies, outputs
+
+
+def per_row_result(stage, latencies):
+    total = latencies.sum()
+    return {
+        'stage': stage,
+        'rows_measured': len(latencies),
+        'seconds': total,
+        'rows_per_sec': len(latencies) / total if total > 0 else None,
+        'p50_us': float(np.percentile(latencies, 50) * 1e6) if len(latencies) else None,
+        'p99_us': float(np.percentile(latencies, 99) * 1e6) if len(latencies) else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def batch_result(stage, rows, seconds):
+    return {
+        'stage': stage,
+        'rows_measured': rows,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else None,
+        'p50_us': None,
+        'p99_us': None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def bench_corpus(series, language, stage_sample):
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS)
+    steps['normalization'] = language == 'id'
+    resources = pl.load_pipeline_resources(steps, language)
+    resources['stem_cache'] = None
+    sample = series.iloc[:stage_sample].tolist()
+    results = []
+
+    lat, folded = time_per_row(pl.case_fold, sample)
+    results.append(per_row_result('case_fold', lat))
+
+    lat, tokens = time_per_row(lambda t: pl.clean_tokens(pl.tokenize(t)), folded)
+    results.append(per_row_result('tokenize+clean_tokens', lat))
+
+    lat, _ = time_per_row(pl.fast_tokenize, folded)
+    results.append(per_row_result('fast_tokenize', lat))
+
+    lat, normalized = time_per_row(lambda t: pl.normalize_kata_baku(t, resources['kamus']), tokens)
+    results.append(per_row_result('normalize_kata_baku', lat))
+
+    lat, filtered = time_per_row(lambda t: pl.remove_stopwords(t, resources['stopwords']), normalized)
+    results.append(per_row_result('remove_stopwords', lat))
+
+    if language == 'id':
+        lat, stemmed = time_per_row(lambda t: pl.stem_text(t, resources['stemmer']), filtered)
+        results.append(per_row_result('stem_text', lat))
+    else:
+        lat, stemmed = time_per_row(lambda t: pl.lemmatize_text(t, resources['lemmatizer']), filtered)
+        results.append(per_row_result('lemmatize_text', lat))
+
+    lat, _ = time_per_row(lambda t: pl.preprocess_pipeline(t, steps, language, resources), sample)
+    results.append(per_row_result('preprocess_pipeline', lat))
+
+    start = time.perf_counter()
+    df_res = pl.preprocess_series(series, steps, language, vocab_first=True, resources=resources)
+    results.append(batch_result('preprocess_series(vocab_first)', len(series), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    pl.preprocess_series(series, steps, language, vocab_first=True, resources=resources, dedupe=True)
+    results.append(batch_result('preprocess_series(dedupe)', len(series), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    _uncached(vl.calculate_word_frequency)(series, False, 'bench-raw')
+    results.append(batch_result('calculate_word_frequency(raw)', len(series), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    df_freq = _uncached(vl.calculate_word_frequency)(df_res['Tokens_Stemmed'], True, 'bench-tokens')
+    results.append(batch_result('calculate_word_frequency(tokens)', len(series), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    _uncached(vl.render_wordcloud)(df_freq, 'bench')
+    results.append(batch_result('render_wordcloud', 1, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    _uncached(vl.render_word_frequency)(df_freq, 'bench')
+    results.append(batch_result('render_word_frequency', 1, time.perf_counter() - start))
+
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Mencetak rasio rows/sec terhadap baseline; mengembalikan jumlah regresi."""
+    key = lambda r: (r['language'], r['rows'], r['stage'])  # noqa: E731
+    base = {key(r): r for r in baseline['results']}
+    regressions = 0
+    for r in current['results']:
+        b = base.get(key(r))
+        if not b or not b['rows_per_sec'] or not r['rows_per_sec']:
+            continue
+        ratio = r['rows_per_sec'] / b['rows_per_sec']
+        flag = ''
+        if ratio < 1 - tolerance:
+            flag = '  <-- REGRESI'
+            regressions += 1
+        print(f"{r['language']:>2} {r['rows']:>9,} {r['stage']:<34} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['1k', '100k'])
+    parser.add_argument('--languages', nargs='+', choices=['id', 'en'], default=['id', 'en'])
+    parser.add_argument('--stage-sample', type=int, default=20_000)
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--baseline', help="File JSON hasil run sebelumnya untuk dibandingkan")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Penurunan rows/sec yang masih diterima")
+    args = parser.parse_args(argv)
+
+    pl.load_nltk_resources()
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [],
+    }
+    for language in args.languages:
+        for size in args.sizes:
+            series = generate_corpus(SIZES[size], language)
+            for r in bench_corpus(series, language, args.stage_sample):
+                r.update(language=language, rows=len(series))
+                report['results'].append(r)
+                print(
+                    f"{language:>2} {len(series):>9,} {r['stage']:<34} "
+                    f"{(r['rows_per_sec'] or 0):>12,.0f} baris/dtk  "
+                    f"p50={r['p50_us'] or 0:8.1f}us p99={r['p99_us'] or 0:8.1f}us  rss={r['peak_rss_mb']:.0f}MB"
+                )
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Benchmark skor sentimen leksikon (sentiment_logic) vs loop Python per baris.
+
+Contoh:
+    uv run python benchmarks/bench_sentiment.py --size 1m
+    uv run python benchmarks/bench_sentiment.py --size 100k --language en --out bench_sentiment.json
+
+Korpus sintetis diproses sekali dengan pipeline (tokenizer cepat) menjadi TokenStore. Yang diukur
+hanya tahap skor: `score_column` (CSR tanda negasi @ bobot kosakata, per chunk) dan
+`add_sentiment_columns` (skor + label kategorikal), dibandingkan dengan loop Python per baris
+atas list token yang menerapkan aturan negasi yang sama. Hasil kedua cara dicek identik.
+Puncak alokasi diukur terpisah dengan tracemalloc.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import preprocessing_logic as pl  # noqa: E402
+import sentiment_logic as sl  # noqa: E402
+import token_store as ts  # noqa: E402
+from benchmarks.bench_features import peak_rss_mb  # noqa: E402
+from benchmarks.corpus import SIZES, generate_corpus  # noqa: E402
+
+
+def score_rows_loop(token_rows, lexicon):
+    """Pembanding: aturan negasi yang sama, satu baris dan satu token per iterasi Python."""
+    scores = np.empty(len(token_rows), dtype=np.float32)
+    for i, tokens in enumerate(token_rows):
+        score, negation_at = 0.0, None
+        for position, token in enumerate(tokens):
+            if token in lexicon.negations:
+                negation_at = position
+                continue
+            weight = lexicon.weights.get(token, 0.0)
+            if not weight:
+                continue
+            if negation_at is not None and position - negation_at <= lexicon.window:
+                weight = -weight
+            # Hanya kata berbobot pertama sesudah negasi yang dibalik
+            negation_at = None
+            score += weight
+        scores[i] = score
+    return scores
+
+
+def _measure(func, memory):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_case(name, func, rows, memory):
+    result, seconds, _ = _measure(func, False)
+    peak = _measure(func, True)[2] if memory else None
+    r = {
+        'case': name,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else None,
+        'peak_alloc_mb': peak,
+    }
+    print(f"{name:<44} {r['rows_per_sec'] or 0:>14,.0f} baris/dtk  {seconds:7.3f} s  puncak alokasi={peak or 0:8.1f} MB")
+    return r, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=list(SIZES), default='1m')
+    parser.add_argument('--language', choices=['id', 'en'], default='id')
+    parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran tracemalloc (lebih cepat)")
+    parser.add_argument('--skip-loop', action='store_true', help="Lewati pembanding loop Python per baris")
+    parser.add_argument('--out', default='bench_sentiment.json')
+    args = parser.parse_args(argv)
+
+    n_rows = SIZES[args.size]
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast', sentiment=True)
+    if pl.missing_nltk_resources(steps, args.language, offline=True):
+        steps['lemmatization'] = False
+    start = time.perf_counter()
+    df_res = pl.preprocess_series(generate_corpus(n_rows, args.language), steps, args.language, vocab_first=True, dedupe=True)
+    store = ts.TokenStore.from_frame(df_res[['Tokens_Stemmed']], ['Tokens_Stemmed'])
+    column = store.column('Tokens_Stemmed')
+    token_rows = df_res['Tokens_Stemmed'].tolist()
+    del df_res
+    lexicon = sl.lexicon_for(steps, args.language)
+    print(
+        f"Korpus {n_rows:,} baris ({len(column.ids):,} token) disiapkan dalam {time.perf_counter() - start:.1f} s; "
+        f"leksikon {len(lexicon.weights):,} kata"
+    )
+
+    # Pemanasan: import scipy terjadi sekali di pemanggilan pertama, bukan bagian dari skor per baris
+    sl.score_column(column, lexicon, chunk_size=1_000)
+
+    memory = not args.no_memory
+    results = []
+    r, scores = bench_case("sentiment_logic.score_column", lambda: sl.score_column(column, lexicon), n_rows, memory)
+    results.append(r)
+    r, _ = bench_case(
+        "sentiment_logic.add_sentiment_columns",
+        lambda: sl.add_sentiment_columns(pd.DataFrame(index=store.index), column, lexicon),
+        n_rows, memory
+    )
+    results.append(r)
+    if not args.skip_loop:
+        r, loop_scores = bench_case("loop Python per baris", lambda: score_rows_loop(token_rows, lexicon), n_rows, memory)
+        r['identical'] = bool(np.array_equal(scores, loop_scores))
+        results.append(r)
+        print(f"Hasil identik dengan loop per baris: {r['identical']}")
+    counts = sl.SentimentSummary().update(scores).label_counts()
+    print("Distribusi label: " + ", ".join(f"{label} {count / n_rows:.1%}" for label, count in counts.items()))
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'rows': n_rows,
+            'tokens': int(len(column.ids)),
+            'language': args.language,
+            'lexicon_words': len(lexicon.weights),
+            'label_counts': {label: int(count) for label, count in counts.items()},
+            'peak_rss_mb': peak_rss_mb(),
+        },
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Peak RSS proses {peak_rss_mb():.0f} MB; hasil disimpan ke {args.out}")
+
+
+if __name__ == '__main__':
+    main()
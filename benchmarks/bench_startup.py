@@ -0,0 +1,112 @@
+"""Benchmark cold start aplikasi: waktu impor per modul dan waktu render pertama `app.py`.
+
+Contoh:
+    uv run python benchmarks/bench_startup.py --out startup.json
+    uv run python benchmarks/bench_startup.py --baseline startup.json
+
+Setiap pengukuran dijalankan di proses Python baru (cold import) sebanyak `--repeat` kali dan
+diambil mediannya. Render pertama diukur dengan streamlit.testing (AppTest) dalam mode offline,
+dari awal proses sampai skrip selesai dieksekusi sekali.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'pandas', 'streamlit', 'aggregate_logic', 'io_logic', 'token_store', 'preprocessing_logic',
+    'parallel_engine', 'visualization_logic', 'nltk', 'Sastrawi', 'matplotlib.pyplot', 'seaborn', 'wordcloud',
+]
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=300)
+at.run()
+if at.exception:
+    raise SystemExit(str(at.exception))
+print(time.perf_counter() - start)
+"""
+
+
+def _measure(snippet, repeat):
+    env = dict(os.environ, SA_OFFLINE='1')
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', snippet], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def compare(current, baseline, tolerance):
+    """Mencetak rasio waktu terhadap baseline; mengembalikan jumlah regresi."""
+    base = {r['name']: r for r in baseline['results']}
+    regressions = 0
+    for r in current['results']:
+        b = base.get(r['name'])
+        if not b or not b['seconds']:
+            continue
+        ratio = r['seconds'] / b['seconds']
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  <-- REGRESI'
+            regressions += 1
+        print(f"{r['name']:<32} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--out', default='bench_startup.json')
+    parser.add_argument('--baseline', help="File JSON hasil run sebelumnya untuk dibandingkan")
+    parser.add_argument('--tolerance', type=float, default=0.20, help="Kenaikan waktu yang masih diterima")
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [],
+    }
+    for module in args.modules:
+        seconds = _measure(_IMPORT_SNIPPET.format(module=module), args.repeat)
+        report['results'].append({'name': f'import {module}', 'seconds': seconds})
+        print(f"import {module:<25} {seconds * 1000:8.0f} ms")
+
+    seconds = _measure(_RENDER_SNIPPET.format(app=os.path.join(ROOT, 'app.py')), args.repeat)
+    report['results'].append({'name': 'first render app.py', 'seconds': seconds})
+    print(f"{'render pertama app.py':<32} {seconds * 1000:8.0f} ms")
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Membandingkan memori kolom token berbentuk list Python dengan token_store.TokenStore.
+
+Contoh:
+    uv run python benchmarks/bench_token_store.py --size 1m
+
+Memori list dihitung mendalam: array pointer kolom object, objek list per baris, dan setiap
+objek string unik (berdasarkan id) yang dirujuk. Tokenizer cepat dipakai agar benchmark tidak
+membutuhkan data NLTK.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import preprocessing_logic as pl  # noqa: E402
+import token_store as ts  # noqa: E402
+from benchmarks.corpus import SIZES, generate_corpus  # noqa: E402
+
+
+def list_columns_bytes(df, columns):
+    seen = set()
+    total = 0
+    for name in columns:
+        total += df[name].memory_usage(index=False, deep=False)
+        for tokens in df[name]:
+            total += sys.getsizeof(tokens)
+            for token in tokens:
+                if id(token) not in seen:
+                    seen.add(id(token))
+                    total += sys.getsizeof(token)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=list(SIZES), default='1m')
+    parser.add_argument('--language', choices=['id', 'en'], default='id')
+    args = parser.parse_args(argv)
+
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast', normalization=False)
+    series = generate_corpus(SIZES[args.size], args.language)
+
+    start = time.perf_counter()
+    df_res = pl.preprocess_series(series, steps, args.language, vocab_first=True)
+    print(f"Pipeline: {len(series):,} baris dalam {time.perf_counter() - start:.1f} s")
+
+    list_bytes = list_columns_bytes(df_res, pl.TOKEN_COLUMNS)
+
+    start = time.perf_counter()
+    store = ts.TokenStore.from_frame(df_res, pl.TOKEN_COLUMNS)
+    encode_seconds = time.perf_counter() - start
+    store_bytes = store.nbytes()
+
+    print(f"Kolom list Python : {list_bytes / 1024 ** 2:10,.1f} MB")
+    print(f"TokenStore        : {store_bytes / 1024 ** 2:10,.1f} MB (encode {encode_seconds:.1f} s)")
+    print(f"Pengurangan       : {1 - store_bytes / list_bytes:10.1%} ({list_bytes / store_bytes:.1f}x lebih kecil)")
+
+
+if __name__ == '__main__':
+    main()
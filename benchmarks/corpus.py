@@ -0,0 +1,53 @@
+"""Generator korpus komentar sintetis (Indonesia/Inggris) yang deterministik untuk benchmark."""
+import numpy as np
+import pandas as pd
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+_ID_ROOTS = [
+    'produk', 'bagus', 'jelek', 'harga', 'murah', 'mahal', 'kirim', 'cepat', 'lambat', 'kualitas',
+    'layanan', 'puas', 'kecewa', 'beli', 'pakai', 'coba', 'rekomendasi', 'mantap', 'keren', 'senang',
+    'suka', 'rusak', 'baru', 'warna', 'ukuran', 'sesuai', 'pesan', 'barang', 'toko', 'penjual',
+    'ramah', 'respon', 'sabar', 'video', 'konten', 'lucu', 'semangat', 'sukses', 'terima', 'kasih',
+    'makan', 'minum', 'jalan', 'kerja', 'ajar', 'main', 'tonton', 'dengar', 'baca', 'tulis',
+]
+_ID_AFFIXES = [('', ''), ('me', ''), ('di', ''), ('', 'kan'), ('', 'nya'), ('ber', ''), ('pe', 'an'), ('ter', '')]
+_ID_FUNCTION = [
+    'yang', 'dan', 'di', 'ini', 'itu', 'dengan', 'untuk', 'tidak', 'ga', 'gak', 'banget', 'bgt', 'yg',
+    'aja', 'sih', 'dong', 'kak', 'min', 'bang', 'udah', 'sudah', 'lagi', 'juga', 'sangat', 'kurang', 'belum',
+]
+_EN_WORDS = [
+    'product', 'good', 'bad', 'price', 'cheap', 'expensive', 'shipping', 'fast', 'slow', 'quality',
+    'service', 'happy', 'disappointed', 'bought', 'using', 'tried', 'recommend', 'great', 'awesome', 'love',
+    'like', 'broken', 'new', 'color', 'size', 'fits', 'ordered', 'items', 'stores', 'sellers',
+    'friendly', 'response', 'videos', 'contents', 'funny', 'thanks', 'running', 'eating', 'watching', 'reading',
+]
+_EN_FUNCTION = [
+    'the', 'a', 'and', 'is', 'it', 'to', 'of', 'for', 'not', "don't", "it's", 'very', 'really', 'so', 'this', 'that',
+]
+_NOISE = ['😍', '🔥', '👍', '😂', '!!!', '...', '?', '#promo', '@admin_toko', 'https://t.co/xyz', '10rb', '2024']
+
+
+def _vocabulary(language):
+    if language == 'id':
+        content = [pre + root + suf for root in _ID_ROOTS for pre, suf in _ID_AFFIXES]
+        return _ID_FUNCTION + content
+    return _EN_FUNCTION + _EN_WORDS
+
+
+def generate_corpus(n_rows, language='id', seed=42):
+    """Series berisi `n_rows` komentar sintetis dengan distribusi kata Zipf dan noise media sosial."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array(_vocabulary(language) + _NOISE, dtype=object)
+    ranks = np.arange(1, len(vocab) + 1)
+    weights = 1.0 / ranks ** 1.1
+    weights /= weights.sum()
+
+    lengths = np.clip(rng.lognormal(mean=2.2, sigma=0.6, size=n_rows).astype(int), 1, 80)
+    words = rng.choice(vocab, size=int(lengths.sum()), p=weights)
+    capitalize = rng.random(len(words)) < 0.1
+    words[capitalize] = [w.capitalize() for w in words[capitalize]]
+
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    texts = [' '.join(words[offsets[i]:offsets[i + 1]]) for i in range(n_rows)]
+    return pd.Series(texts, name='komentar')
@@ -0,0 +1,236 @@
+"""Penyimpanan DataFrame bersama untuk semua sesi Streamlit dalam satu proses server.
+
+Dataset dikunci dengan hash isinya, sehingga file yang sama yang diunggah banyak analis hanya
+disimpan sekali; sesi cukup menyimpan kuncinya. Dataset yang sering dipakai tetap di memori,
+sisanya di-spill ke file Arrow IPC (feather, tanpa kompresi) di disk lokal dan dibaca kembali
+menjadi DataFrame (salinan penuh di memori) saat dibutuhkan. Batas memori global ditegakkan
+dengan eviksi LRU.
+
+Setiap proses menulis ke subfolder miliknya sendiri (process_spill_dir) sehingga beberapa proses
+server yang berbagi folder cache tidak saling menghapus file spill; subfolder proses lain hanya
+dibersihkan bila sudah tidak disentuh lebih dari STALE_SECONDS.
+"""
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPILL_DIR = os.environ.get('SA_DATASET_SPILL_DIR', os.path.join(BASE_DIR, '.cache', 'datasets'))
+DEFAULT_MEMORY_MB = int(os.environ.get('SA_DATASET_MEMORY_MB', 1024))
+DEFAULT_DISK_MB = int(os.environ.get('SA_DATASET_DISK_MB', 10 * 1024))
+# Subfolder proses lain yang lebih tua dari ini dianggap yatim (proses sudah mati)
+STALE_SECONDS = 24 * 3600
+
+
+def content_key(data):
+    """Kunci dataset dari isi mentah file (bytes) yang diunggah."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def process_spill_dir(base_dir):
+    """Subfolder baru khusus proses ini di `base_dir`; folder proses lain yang yatim dibersihkan dulu."""
+    sweep_stale(base_dir)
+    path = os.path.join(base_dir, f"proc-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def sweep_stale(base_dir, max_age=STALE_SECONDS):
+    """Menghapus file/subfolder di `base_dir` yang tidak diubah lebih dari `max_age` detik."""
+    try:
+        entries = list(os.scandir(base_dir))
+    except OSError:
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime >= cutoff:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class _Entry:
+    __slots__ = ('df', 'nbytes', 'path', 'disk_bytes')
+
+    def __init__(self, df, nbytes):
+        self.df = df
+        self.nbytes = nbytes
+        self.path = None
+        self.disk_bytes = 0
+
+
+class DatasetStore:
+    """LRU DataFrame dengan batas memori global dan spill ke disk; aman dipakai banyak thread."""
+
+    def __init__(self, spill_dir=DEFAULT_SPILL_DIR, memory_mb=DEFAULT_MEMORY_MB, disk_mb=DEFAULT_DISK_MB):
+        self.spill_dir = process_spill_dir(spill_dir)
+        self.max_memory = memory_mb * 1024 * 1024
+        self.max_disk = disk_mb * 1024 * 1024
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.reloads = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def put(self, key, df):
+        """Menyimpan `df` di bawah `key`; jika kunci sudah ada, salinan yang lama dipakai."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return key
+            entry = _Entry(df, frame_nbytes(df))
+            self._entries[key] = entry
+            self.memory_bytes += entry.nbytes
+            self._enforce_budget(keep=key)
+            return key
+
+    def get_or_load(self, key, loader):
+        """Mengambil dataset `key`, atau memanggil `loader()` (mis. parsing file upload) bila belum ada."""
+        df = self.get(key)
+        if df is None:
+            df = loader()
+            self.put(key, df)
+        return df
+
+    def get(self, key):
+        """DataFrame untuk `key` (dibaca ulang dari disk bila sudah di-spill); None jika tidak ada.
+
+        File spill yang hilang (mis. dihapus dari luar) membuat dataset dilupakan: None, sesi harus upload ulang.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            if entry.df is not None:
+                self.hits += 1
+                return entry.df
+            try:
+                entry.df = self._read_spill(entry.path)
+            except OSError:
+                self._remove_file(entry)
+                del self._entries[key]
+                return None
+            self.reloads += 1
+            self.memory_bytes += entry.nbytes
+            self._enforce_budget(keep=key)
+            return entry.df
+
+    def nbytes(self, key):
+        """Ukuran DataFrame `key` di memori (byte) tanpa membacanya dari disk; 0 jika tidak ada."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.nbytes if entry is not None else 0
+
+    # --- Spill & Eviksi ---
+
+    def _enforce_budget(self, keep):
+        for key in list(self._entries):
+            if self.memory_bytes <= self.max_memory:
+                break
+            entry = self._entries[key]
+            if key == keep or entry.df is None:
+                continue
+            self._spill(key, entry)
+
+        for key in list(self._entries):
+            if self.disk_bytes <= self.max_disk:
+                break
+            entry = self._entries[key]
+            if key != keep and entry.df is None:
+                # Sudah tidak di memori dan disk penuh: dataset dilupakan, sesi harus upload ulang
+                self._remove_file(entry)
+                del self._entries[key]
+
+    def _spill(self, key, entry):
+        if entry.path is None:
+            entry.path = self._write_spill(key, entry.df)
+            entry.disk_bytes = os.path.getsize(entry.path)
+            self.disk_bytes += entry.disk_bytes
+        # Folder yang masih dipakai tidak boleh terlihat yatim oleh proses lain
+        os.utime(self.spill_dir)
+        entry.df = None
+        self.memory_bytes -= entry.nbytes
+
+    def _write_spill(self, key, df):
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        path = os.path.join(self.spill_dir, f"{key}.arrow")
+        try:
+            feather.write_feather(df, path, compression='uncompressed')
+        except (pa.ArrowException, TypeError, ValueError):
+            # Kolom campuran tipe / nama kolom non-string tidak bisa ke Arrow
+            if os.path.exists(path):
+                os.remove(path)
+            path = os.path.join(self.spill_dir, f"{key}.pkl")
+            with open(path, 'wb') as f:
+                pickle.dump(df, f, protocol=5)
+        return path
+
+    @staticmethod
+    def _read_spill(path):
+        if path.endswith('.pkl'):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        import pyarrow.feather as feather
+
+        # to_pandas menyalin seluruh data; memory map hanya menghindari salinan baca tambahan
+        df = feather.read_table(path, memory_map=True).to_pandas()
+        # Arrow membaca sel kosong kolom object sebagai None, sedangkan salinan di memori berisi NaN
+        # (astype(str) -> 'nan' vs 'none'); fingerprint keduanya sama, jadi isinya harus identik
+        obj_cols = df.columns[df.dtypes == object]
+        if len(obj_cols):
+            df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), np.nan)
+        return df
+
+    def _remove_file(self, entry):
+        if entry.path is not None:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+            self.disk_bytes -= entry.disk_bytes
+            entry.path = None
+
+    def usage(self):
+        with self._lock:
+            in_memory = sum(1 for e in self._entries.values() if e.df is not None)
+            return {
+                'datasets': len(self._entries),
+                'in_memory': in_memory,
+                'spilled': len(self._entries) - in_memory,
+                'memory_bytes': self.memory_bytes,
+                'max_memory_bytes': self.max_memory,
+                'disk_bytes': self.disk_bytes,
+                'hits': self.hits,
+                'reloads': self.reloads,
+            }
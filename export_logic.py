@@ -0,0 +1,138 @@
+"""Ekspor hasil preprocessing per chunk ke file sementara (CSV, Parquet, JSONL) untuk diunduh dari disk.
+
+File hanya dibuat saat pengguna meminta unduhan, dicatat per sesi oleh ExportManager, dan dihapus
+saat data berubah atau sesi berakhir. File yatim (mis. server mati) dibersihkan saat start.
+"""
+import os
+import tempfile
+import time
+import uuid
+import weakref
+
+import io_logic
+
+EXPORT_DIR = os.environ.get('SA_EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'sa_exports'))
+EXPORT_CHUNK_SIZE = 20_000
+# File lebih tua dari ini dianggap yatim dan dihapus oleh sweep_stale
+STALE_SECONDS = 24 * 3600
+
+FORMATS = {
+    'csv': ('CSV', 'text/csv'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet'),
+    'jsonl': ('JSONL', 'application/x-ndjson'),
+}
+
+
+def _remove(paths):
+    for path in list(paths):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def sweep_stale(directory=EXPORT_DIR, max_age=STALE_SECONDS):
+    """Menghapus file ekspor yang lebih tua dari `max_age` detik; mengembalikan jumlah file terhapus."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    cutoff = time.time() - max_age
+    stale = [e.path for e in entries if e.is_file() and e.stat().st_mtime < cutoff]
+    _remove(stale)
+    return len(stale)
+
+
+def write_export(path, df, store, columns, renames=(), fmt='csv', chunk_size=EXPORT_CHUNK_SIZE):
+    """Menulis `columns` dari `df`/`store` ke `path` per chunk.
+
+    Kolom token dari TokenStore digabung dengan ', ' untuk CSV dan tetap berupa list untuk
+    Parquet/JSONL. Mengembalikan jumlah baris yang ditulis.
+    """
+    renames = dict(renames)
+    token_columns = [c for c in columns if store is not None and c in store.columns]
+    list_columns = [] if fmt == 'csv' else [renames.get(c, c) for c in token_columns]
+    with io_logic.ChunkWriter(path, fmt, list_columns=list_columns) as writer:
+        for start in range(0, len(df), chunk_size):
+            positions = range(start, min(start + chunk_size, len(df)))
+            chunk = df.iloc[start:start + chunk_size][[c for c in columns if c not in token_columns]].copy()
+            for column in token_columns:
+                token_column = store.column(column)
+                chunk[column] = token_column.joined(positions, sep=', ') if fmt == 'csv' else token_column.rows(positions)
+            writer.write(chunk[list(columns)].rename(columns=renames))
+        if writer.rows == 0:
+            # File kosong tetap punya header/skema
+            empty = df.iloc[:0][[c for c in columns if c not in token_columns]].copy()
+            for column in token_columns:
+                empty[column] = []
+            writer.write(empty[list(columns)].rename(columns=renames))
+        return writer.rows
+
+
+def write_spilled_export(path, source_path, columns, renames=(), fmt='csv', token_columns=()):
+    """Menyalin `columns` dari hasil Parquet mode chunk ke `path` per row group.
+
+    Sama seperti write_export: kolom token berupa list digabung dengan ', ' untuk CSV.
+    """
+    import pyarrow.parquet as pq
+
+    renames = dict(renames)
+    token_columns = [c for c in columns if c in token_columns]
+    list_columns = [] if fmt == 'csv' else [renames.get(c, c) for c in token_columns]
+    parquet = pq.ParquetFile(source_path)
+    with io_logic.ChunkWriter(path, fmt, list_columns=list_columns) as writer:
+        for i in range(parquet.metadata.num_row_groups):
+            chunk = parquet.read_row_group(i, columns=list(columns)).to_pandas()
+            if fmt == 'csv':
+                for column in token_columns:
+                    chunk[column] = [', '.join(tokens) for tokens in chunk[column]]
+            writer.write(chunk.rename(columns=renames))
+        if writer.rows == 0:
+            empty = parquet.schema_arrow.empty_table().select(list(columns)).to_pandas()
+            writer.write(empty.rename(columns=renames))
+        return writer.rows
+
+
+class ExportManager:
+    """Mencatat file ekspor milik satu sesi, dikunci dengan (fingerprint, nama tabel, format)."""
+
+    def __init__(self, directory=EXPORT_DIR):
+        self.directory = directory
+        self.files = {}
+        # Saat objek (dan sesi pemiliknya) dibuang, file ikut dihapus
+        self._finalizer = weakref.finalize(self, _remove, self.files.values())
+
+    def path_for(self, key):
+        return self.files.get(key)
+
+    def export(self, key, df, store, columns, renames=(), fmt='csv'):
+        """Membuat file ekspor untuk `key` (sekali; permintaan berikutnya memakai file yang sama)."""
+        return self._create(key, fmt, lambda path: write_export(path, df, store, columns, renames, fmt))
+
+    def export_spilled(self, key, source_path, columns, renames=(), fmt='csv', token_columns=()):
+        """Seperti export, tetapi sumbernya hasil Parquet mode chunk di disk."""
+        return self._create(
+            key, fmt, lambda path: write_spilled_export(path, source_path, columns, renames, fmt, token_columns)
+        )
+
+    def _create(self, key, fmt, write):
+        path = self.files.get(key)
+        if path is not None and os.path.exists(path):
+            return path
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.{fmt}")
+        try:
+            write(path)
+        except Exception:
+            _remove([path])
+            raise
+        self.files[key] = path
+        return path
+
+    def invalidate(self, fingerprint=None):
+        """Menghapus file milik `fingerprint` lain (data berubah), atau semua file bila None."""
+        stale = [key for key in self.files if fingerprint is None or key[0] != fingerprint]
+        _remove(self.files.pop(key) for key in stale)
+
+    def cleanup(self):
+        self.invalidate()
@@ -0,0 +1,349 @@
+"""Ekstraksi fitur sparse (TF-IDF / hashing n-gram) langsung dari kolom token hasil pipeline.
+
+Fitur dibangun dari array ID token (token_store) per chunk, tanpa menggabungkan token menjadi
+string lalu memecahnya lagi. N-gram dibentuk secara vektor di dalam batas baris; string n-gram
+hanya dibuat sekali per n-gram unik per chunk.
+
+- Mode `hash`: sama dengan sklearn HashingVectorizer (murmurhash3, `alternate_sign`, `norm`),
+  tanpa kosakata sehingga tiap chunk langsung ditulis (memori konstan, satu lintasan).
+- Mode `tfidf`: sama dengan sklearn TfidfVectorizer (smooth_idf, norm l2, kosakata terurut);
+  lintasan pertama menghitung document frequency, lintasan kedua menulis matriks.
+
+Hasil disimpan di satu folder: `part-00000.npz`, ... (CSR terkompresi, berurutan sesuai baris),
+`vocabulary.json` + `idf.npy` (mode tfidf) dan `meta.json`. Baca kembali dengan `load_features`.
+
+Contoh:
+    uv run python -m feature_logic run hasil.parquet --out fitur/ --mode hash --ngram 1 2
+    uv run python -m feature_logic run hasil.parquet --out fitur/ --mode tfidf --min-df 2
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import token_store as ts
+
+MODES = ('tfidf', 'hash')
+DEFAULT_N_FEATURES = 2 ** 20
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+# --- N-gram per Chunk ---
+
+def _ngrams(vocab, ids, offsets, n):
+    """N-gram di dalam baris: (baris tiap kemunculan, indeks n-gram unik, list string n-gram unik)."""
+    lengths = np.diff(offsets)
+    row_ids = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    m = len(ids) - n + 1
+    if m <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), []
+
+    # Kode n-gram dibangun bertahap; dipadatkan dengan unique tiap langkah agar tidak overflow
+    codes = ids[:m].astype(np.int64)
+    for k in range(1, n):
+        _, codes = np.unique(codes, return_inverse=True)
+        codes = codes * len(vocab) + ids[k:k + m]
+    valid = row_ids[:m] == row_ids[n - 1:n - 1 + m]
+    starts = np.flatnonzero(valid)
+    _, first, inverse = np.unique(codes[valid], return_index=True, return_inverse=True)
+
+    first_starts = starts[first]
+    terms = vocab[ids[first_starts]]
+    for k in range(1, n):
+        terms = terms + ' ' + vocab[ids[first_starts + k]]
+    return row_ids[starts], inverse.ravel(), terms.tolist()
+
+
+def _chunk_terms(vocab, ids, offsets, ngram_range):
+    """Semua n-gram dalam `ngram_range` untuk satu chunk: list (baris, indeks unik, string unik)."""
+    vocab = np.asarray(vocab, dtype=object)
+    return [_ngrams(vocab, ids, offsets, n) for n in range(ngram_range[0], ngram_range[1] + 1)]
+
+
+def _to_csr(rows, cols, values, n_rows, n_cols):
+    from scipy import sparse
+
+    matrix = sparse.csr_matrix((values, (rows, cols)), shape=(n_rows, n_cols), dtype=np.float64)
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _normalize(matrix, norm):
+    if norm is None:
+        return matrix
+    from sklearn.preprocessing import normalize
+
+    return normalize(matrix, norm=norm, copy=False)
+
+
+def iter_column_chunks(column, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Memecah TokenColumn menjadi (vocab, ids, offsets) per `chunk_size` baris tanpa menyalin ID."""
+    vocab = column.store.tokens
+    for start in range(0, len(column), chunk_size):
+        end = min(start + chunk_size, len(column))
+        offsets = column.offsets[start:end + 1]
+        yield vocab, column.ids[offsets[0]:offsets[-1]], offsets - offsets[0]
+
+
+# --- Featurizer ---
+
+class HashingFeaturizer:
+    """Hashing n-gram ala sklearn HashingVectorizer; tidak perlu fit maupun kosakata."""
+
+    mode = 'hash'
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, ngram_range=(1, 1), alternate_sign=True, norm='l2'):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.alternate_sign = alternate_sign
+        self.norm = norm
+
+    def transform_chunk(self, vocab, ids, offsets):
+        from sklearn.utils import murmurhash3_32
+
+        all_rows, all_cols, all_values = [], [], []
+        for rows, inverse, terms in _chunk_terms(vocab, ids, offsets, self.ngram_range):
+            hashes = np.fromiter((murmurhash3_32(t, seed=0) for t in terms), dtype=np.int64, count=len(terms))
+            all_rows.append(rows)
+            all_cols.append((np.abs(hashes) % self.n_features)[inverse])
+            signs = np.where(hashes >= 0, 1.0, -1.0) if self.alternate_sign else np.ones(len(hashes))
+            all_values.append(signs[inverse])
+        matrix = _to_csr(
+            np.concatenate(all_rows), np.concatenate(all_cols), np.concatenate(all_values),
+            len(offsets) - 1, self.n_features
+        )
+        return _normalize(matrix, self.norm)
+
+    def meta(self):
+        return {
+            'mode': self.mode, 'n_features': self.n_features, 'ngram_range': list(self.ngram_range),
+            'alternate_sign': self.alternate_sign, 'norm': self.norm,
+        }
+
+
+class TfidfFeaturizer:
+    """TF-IDF n-gram ala sklearn TfidfVectorizer, di-fit per chunk (document frequency) lalu transform per chunk."""
+
+    mode = 'tfidf'
+
+    def __init__(self, ngram_range=(1, 1), min_df=1, norm='l2'):
+        self.ngram_range = tuple(ngram_range)
+        self.min_df = min_df
+        self.norm = norm
+        self.n_docs = 0
+        self.vocabulary = None
+        self.idf = None
+        self._df = {}
+
+    def partial_fit(self, vocab, ids, offsets):
+        n_rows = len(offsets) - 1
+        self.n_docs += n_rows
+        if n_rows == 0:
+            return self
+        df = self._df
+        for rows, inverse, terms in _chunk_terms(vocab, ids, offsets, self.ngram_range):
+            # Pasangan (baris, n-gram) unik -> jumlah dokumen per n-gram
+            pairs = np.unique(inverse * n_rows + rows)
+            counts = np.bincount(pairs // n_rows, minlength=len(terms))
+            for term, count in zip(terms, counts.tolist()):
+                df[term] = df.get(term, 0) + count
+        return self
+
+    def finalize(self):
+        terms = sorted(term for term, count in self._df.items() if count >= self.min_df)
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        df = np.fromiter((self._df[t] for t in terms), dtype=np.float64, count=len(terms))
+        self.idf = np.log((1 + self.n_docs) / (1 + df)) + 1
+        self._df = {}
+        return self
+
+    def transform_chunk(self, vocab, ids, offsets):
+        all_rows, all_cols = [], []
+        for rows, inverse, terms in _chunk_terms(vocab, ids, offsets, self.ngram_range):
+            lookup = np.fromiter((self.vocabulary.get(t, -1) for t in terms), dtype=np.int64, count=len(terms))
+            cols = lookup[inverse]
+            keep = cols >= 0
+            all_rows.append(rows[keep])
+            all_cols.append(cols[keep])
+        rows, cols = np.concatenate(all_rows), np.concatenate(all_cols)
+        matrix = _to_csr(rows, cols, np.ones(len(rows)), len(offsets) - 1, len(self.vocabulary))
+        matrix.data *= self.idf[matrix.indices]
+        return _normalize(matrix, self.norm)
+
+    def meta(self):
+        return {
+            'mode': self.mode, 'n_features': len(self.vocabulary), 'ngram_range': list(self.ngram_range),
+            'min_df': self.min_df, 'norm': self.norm,
+        }
+
+
+def make_featurizer(mode, ngram_range=(1, 1), n_features=DEFAULT_N_FEATURES, min_df=1, norm='l2'):
+    if mode == 'hash':
+        return HashingFeaturizer(n_features, ngram_range, norm=norm)
+    if mode == 'tfidf':
+        return TfidfFeaturizer(ngram_range, min_df, norm=norm)
+    raise ValueError(f"Mode fitur tidak dikenal: {mode}")
+
+
+# --- Penulisan & Pembacaan ---
+
+class FeatureWriter:
+    """Menulis matriks per chunk sebagai part-NNNNN.npz beserta meta (dan kosakata untuk tfidf)."""
+
+    def __init__(self, out_dir, compressed=True):
+        self.out_dir = out_dir
+        self.compressed = compressed
+        self.parts = 0
+        self.rows = 0
+        self.nnz = 0
+        os.makedirs(out_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(out_dir, 'part-*.npz')):
+            os.remove(path)
+
+    def write(self, matrix):
+        from scipy import sparse
+
+        sparse.save_npz(os.path.join(self.out_dir, f"part-{self.parts:05d}.npz"), matrix, compressed=self.compressed)
+        self.parts += 1
+        self.rows += matrix.shape[0]
+        self.nnz += matrix.nnz
+
+    def close(self, featurizer, seconds):
+        meta = dict(featurizer.meta(), rows=self.rows, nnz=self.nnz, parts=self.parts, seconds=seconds)
+        if featurizer.mode == 'tfidf':
+            with open(os.path.join(self.out_dir, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+                json.dump(list(featurizer.vocabulary), f, ensure_ascii=False)
+            np.save(os.path.join(self.out_dir, 'idf.npy'), featurizer.idf)
+        with open(os.path.join(self.out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+
+def extract_features(column, out_dir, mode='tfidf', ngram_range=(1, 1), n_features=DEFAULT_N_FEATURES, min_df=1,
+                     norm='l2', chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None, compressed=True):
+    """Mengekstrak fitur dari TokenColumn (mis. `store.column('Tokens_Stemmed')`) ke `out_dir`; mengembalikan meta.
+
+    `on_progress(done_rows, total_rows)` dipanggil setiap satu chunk ditulis. Kompresi zlib bisa
+    memakan sekitar separuh waktu; `compressed=False` menulis .npz tanpa kompresi.
+    """
+    start = time.perf_counter()
+    featurizer = make_featurizer(mode, ngram_range, n_features, min_df, norm)
+    if mode == 'tfidf':
+        for vocab, ids, offsets in iter_column_chunks(column, chunk_size):
+            featurizer.partial_fit(vocab, ids, offsets)
+        featurizer.finalize()
+
+    writer = FeatureWriter(out_dir, compressed)
+    for vocab, ids, offsets in iter_column_chunks(column, chunk_size):
+        writer.write(featurizer.transform_chunk(vocab, ids, offsets))
+        if on_progress is not None:
+            on_progress(writer.rows, len(column))
+    return writer.close(featurizer, time.perf_counter() - start)
+
+
+class StreamingExtractor:
+    """Ekstraksi fitur sambil pipeline berjalan per chunk (mode batch).
+
+    Mode hash langsung menulis tiap chunk; mode tfidf menampung chunk dalam bentuk ringkas
+    (token_store) dan menulis semuanya saat `close()`.
+    """
+
+    def __init__(self, out_dir, mode='hash', ngram_range=(1, 1), n_features=DEFAULT_N_FEATURES, min_df=1,
+                 norm='l2'):
+        self.out_dir = out_dir
+        self.options = dict(mode=mode, ngram_range=ngram_range, n_features=n_features, min_df=min_df, norm=norm)
+        self.featurizer = make_featurizer(mode, ngram_range, n_features, min_df, norm)
+        self.writer = FeatureWriter(out_dir) if mode == 'hash' else None
+        self._chunks = []
+        self.rows = 0
+        self._start = time.perf_counter()
+
+    def add(self, token_rows):
+        """Menambah satu chunk list token per baris (mis. `df_res['Tokens_Stemmed'].tolist()`)."""
+        chunk = ts.encode_chunk({'tokens': token_rows})
+        self.rows += chunk.n_rows
+        if self.writer is not None:
+            ids, offsets = chunk.columns['tokens']
+            self.writer.write(self.featurizer.transform_chunk(chunk.vocab, ids, offsets))
+        else:
+            self._chunks.append(chunk)
+
+    def close(self):
+        if self.writer is not None:
+            return self.writer.close(self.featurizer, time.perf_counter() - self._start)
+        store = ts.TokenStore.from_chunks(self._chunks, range(self.rows))
+        self._chunks = []
+        return extract_features(store.column('tokens'), self.out_dir, **self.options)
+
+
+def load_features(out_dir):
+    """Membaca kembali hasil ekstraksi: (CSR seluruh baris, list kosakata atau None untuk mode hash, meta)."""
+    from scipy import sparse
+
+    with open(os.path.join(out_dir, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    parts = [sparse.load_npz(os.path.join(out_dir, f"part-{i:05d}.npz")) for i in range(meta['parts'])]
+    matrix = sparse.vstack(parts, format='csr') if parts else sparse.csr_matrix((0, meta['n_features']))
+    vocabulary = None
+    vocab_path = os.path.join(out_dir, 'vocabulary.json')
+    if meta['mode'] == 'tfidf' and os.path.exists(vocab_path):
+        with open(vocab_path, encoding='utf-8') as f:
+            vocabulary = json.load(f)
+    return matrix, vocabulary, meta
+
+
+# --- CLI ---
+
+def iter_export_token_chunks(path, column, chunk_size):
+    """Membaca kolom token (list) dari ekspor .parquet/.jsonl per chunk."""
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=[column]):
+            yield [tokens or [] for tokens in batch.column(0).to_pylist()]
+    elif path.lower().endswith(('.jsonl', '.ndjson')):
+        import pandas as pd
+
+        for chunk in pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False):
+            yield [tokens if isinstance(tokens, list) else [] for tokens in chunk[column]]
+    else:
+        raise ValueError("Input harus ekspor .parquet atau .jsonl (kolom token berupa list)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m feature_logic',
+        description="Ekstraksi fitur sparse (TF-IDF / hashing) dari kolom token hasil preprocessing."
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help="Ekstrak fitur dari ekspor .parquet/.jsonl per chunk")
+    run.add_argument('input', help="File ekspor .parquet atau .jsonl")
+    run.add_argument('--out', required=True, help="Folder output (.npz per chunk + kosakata + meta)")
+    run.add_argument('--column', default='Tokens_Stemmed')
+    run.add_argument('--mode', choices=MODES, default='tfidf')
+    run.add_argument('--ngram', nargs=2, type=int, default=[1, 1], metavar=('MIN', 'MAX'))
+    run.add_argument('--n-features', type=int, default=DEFAULT_N_FEATURES, help="Jumlah kolom (mode hash)")
+    run.add_argument('--min-df', type=int, default=1, help="Document frequency minimum (mode tfidf)")
+    run.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    extractor = StreamingExtractor(args.out, args.mode, tuple(args.ngram), args.n_features, args.min_df)
+    start = time.perf_counter()
+    for token_rows in iter_export_token_chunks(args.input, args.column, args.chunk_size):
+        extractor.add(token_rows)
+        elapsed = time.perf_counter() - start
+        print(f"{extractor.rows:,} baris ({extractor.rows / elapsed:,.0f} baris/detik)", file=sys.stderr)
+    meta = extractor.close()
+    print(
+        f"Selesai: {meta['rows']:,} baris x {meta['n_features']:,} fitur, nnz {meta['nnz']:,}, "
+        f"{meta['parts']} part di {args.out} dalam {time.perf_counter() - start:.1f} detik",
+        file=sys.stderr
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,433 @@
+"""Layanan HTTP lokal (stdlib) untuk pipeline preprocessing, dipakai service lain tanpa Streamlit.
+
+Endpoint:
+    POST /preprocess   batch teks -> hasil NDJSON yang di-stream per sub-batch
+    GET  /metrics      throughput, latensi (p50/p90/p99), antrean (format Prometheus; ?format=json)
+    GET  /healthz      status resource
+
+Body POST bisa berupa JSON::
+
+    {"texts": ["..."], "ids": [...], "language": "id", "pipeline_steps": {"tokenizer": "fast"}}
+
+atau NDJSON (Content-Type application/x-ndjson), satu teks per baris (string JSON atau objek
+{"id": ..., "text": ...}), dengan `language` dan `pipeline_steps` (JSON) di query string.
+`pipeline_steps` digabung dengan DEFAULT_PIPELINE_STEPS. Setiap baris respons berisi `id` dan
+kolom OUTPUT_COLUMNS, dalam urutan input.
+
+Stemmer, lemmatizer dan stopword dimuat sekali saat start; kamus kata baku baru dimuat pada request
+pertama yang memakai normalisasi, sehingga kamus yang rusak/hilang hanya membuat request tersebut
+gagal (503) dan tidak menghentikan layanan. Request yang melebihi
+`workers + queue_size` langsung ditolak 503 (Retry-After) agar klien menahan laju kirim.
+
+Contoh:
+    uv run python -m http_service --port 8765 --offline
+    curl -s localhost:8765/preprocess -d '{"texts": ["Barangnya bagus banget kak"]}'
+"""
+import argparse
+import json
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import kamus_builder
+import preprocessing_logic as pl
+
+DEFAULT_BATCH_SIZE = 1_000
+# Jumlah request terakhir untuk menghitung persentil latensi dan throughput
+METRICS_WINDOW = 2_048
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/ndjson')
+
+# Resource tiap bahasa dimuat sekali, langkah per request memilih yang dipakai; kamus dimuat lazy (kamus())
+_STARTUP_STEPS = dict(pl.DEFAULT_PIPELINE_STEPS, normalization=False)
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ServiceMetrics:
+    """Counter dan jendela latensi request; aman dipakai banyak thread."""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.started = time.time()
+        self.requests = {}
+        self.texts = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.waiting = 0
+        # (waktu selesai, latensi total, waktu tunggu antrean, jumlah teks)
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, status, latency, queue_wait, n_texts):
+        with self._lock:
+            self.requests[status] = self.requests.get(status, 0) + 1
+            if status == 200:
+                self.texts += n_texts
+                self._recent.append((time.time(), latency, queue_wait, n_texts))
+            elif status == 503:
+                self.rejected += 1
+
+    def adjust(self, waiting=0, in_flight=0):
+        with self._lock:
+            self.waiting += waiting
+            self.in_flight += in_flight
+
+    def snapshot(self):
+        with self._lock:
+            recent = np.array(self._recent, dtype=float).reshape(-1, 4)
+            data = {
+                'uptime_seconds': time.time() - self.started,
+                'requests_total': dict(self.requests),
+                'texts_total': self.texts,
+                'rejected_total': self.rejected,
+                'in_flight': self.in_flight,
+                'queue_depth': self.waiting,
+            }
+        if len(recent):
+            span = max(recent[-1, 0] - recent[0, 0] + recent[0, 1], 1e-9)
+            latency = recent[:, 1]
+            data.update({
+                'window_requests': len(recent),
+                'requests_per_second': len(recent) / span,
+                'texts_per_second': recent[:, 3].sum() / span,
+                'latency_seconds': {q: float(np.percentile(latency, q * 100)) for q in (0.5, 0.9, 0.99)},
+                'queue_wait_seconds_p99': float(np.percentile(recent[:, 2], 99)),
+            })
+        return data
+
+    def prometheus(self):
+        data = self.snapshot()
+        lines = [
+            '# TYPE sa_requests_total counter',
+            *(f'sa_requests_total{{status="{s}"}} {n}' for s, n in sorted(data['requests_total'].items())),
+            '# TYPE sa_texts_total counter',
+            f"sa_texts_total {data['texts_total']}",
+            '# TYPE sa_rejected_total counter',
+            f"sa_rejected_total {data['rejected_total']}",
+            '# TYPE sa_in_flight gauge',
+            f"sa_in_flight {data['in_flight']}",
+            '# TYPE sa_queue_depth gauge',
+            f"sa_queue_depth {data['queue_depth']}",
+            '# TYPE sa_uptime_seconds gauge',
+            f"sa_uptime_seconds {data['uptime_seconds']:.1f}",
+        ]
+        if 'latency_seconds' in data:
+            lines += [
+                '# TYPE sa_request_latency_seconds summary',
+                *(f'sa_request_latency_seconds{{quantile="{q}"}} {v:.6f}' for q, v in data['latency_seconds'].items()),
+                '# TYPE sa_queue_wait_seconds_p99 gauge',
+                f"sa_queue_wait_seconds_p99 {data['queue_wait_seconds_p99']:.6f}",
+                '# TYPE sa_requests_per_second gauge',
+                f"sa_requests_per_second {data['requests_per_second']:.3f}",
+                '# TYPE sa_texts_per_second gauge',
+                f"sa_texts_per_second {data['texts_per_second']:.3f}",
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+class PreprocessingService:
+    """Resource pipeline yang sudah dimuat + batas konkurensi/antrean request."""
+
+    def __init__(self, workers=1, queue_size=16, queue_timeout=30.0, batch_size=DEFAULT_BATCH_SIZE,
+                 max_body_bytes=64 * 1024 * 1024, offline=pl.OFFLINE):
+        self.batch_size = batch_size
+        self.queue_timeout = queue_timeout
+        self.max_body_bytes = max_body_bytes
+        self.metrics = ServiceMetrics()
+        # Slot total (diproses + menunggu) dan slot pemrosesan
+        self._admission = threading.BoundedSemaphore(workers + queue_size)
+        self._execution = threading.BoundedSemaphore(workers)
+
+        self.missing = {}
+        self.resources = {}
+        for language in ('id', 'en'):
+            self.missing[language] = pl.missing_nltk_resources(_STARTUP_STEPS, language, offline=offline)
+            steps = dict(_STARTUP_STEPS, lemmatization='wordnet' not in self.missing[language])
+            self.resources[language] = pl.load_pipeline_resources(steps, language)
+        self._kamus = None
+        self._kamus_lock = threading.Lock()
+
+    def kamus(self):
+        """Kamus kata baku, dimuat sekali saat pertama dibutuhkan; gagal -> RequestError 503 (dicoba lagi nanti)."""
+        with self._kamus_lock:
+            if self._kamus is None:
+                try:
+                    self._kamus = pl.load_kamus_kata_baku()
+                except kamus_builder.KamusError as e:
+                    raise RequestError(503, f"Kamus kata baku tidak bisa dimuat: {e}")
+            return self._kamus
+
+    def resources_for(self, steps, language):
+        """Resource untuk langkah request; kamus hanya dimuat bila normalisasi diminta."""
+        resources = self.resources[language]
+        if steps.get('normalization'):
+            resources = dict(resources, kamus=self.kamus())
+        return resources
+
+    def resolve_steps(self, requested, language):
+        """Langkah request digabung dengan default; langkah yang datanya tidak tersedia dimatikan."""
+        steps = dict(pl.DEFAULT_PIPELINE_STEPS)
+        steps.update({k: v for k, v in (requested or {}).items() if k in steps})
+        missing = self.missing[language]
+        if 'punkt' in missing or 'punkt_tab' in missing:
+            steps['tokenizer'] = 'fast'
+        if 'wordnet' in missing:
+            steps['lemmatization'] = False
+        return steps
+
+    def admit(self):
+        return self._admission.acquire(blocking=False)
+
+    def release(self):
+        self._admission.release()
+
+    def acquire_worker(self):
+        """Menunggu slot pemrosesan (maksimal `queue_timeout` detik); False jika waktu habis."""
+        self.metrics.adjust(waiting=1)
+        try:
+            return self._execution.acquire(timeout=self.queue_timeout)
+        finally:
+            self.metrics.adjust(waiting=-1)
+
+    def release_worker(self):
+        self._execution.release()
+
+    def process(self, texts, steps, language, resources=None):
+        """Generator DataFrame hasil per sub-batch `batch_size` teks."""
+        if resources is None:
+            resources = self.resources_for(steps, language)
+        for start in range(0, len(texts), self.batch_size):
+            series = pd.Series(texts[start:start + self.batch_size], dtype=object)
+            yield pl.preprocess_series(
+                series, steps, language, vocab_first=True, resources=resources, dedupe=True
+            )
+
+    def health(self):
+        return {'status': 'ok', 'missing_nltk_resources': self.missing, 'kamus_loaded': self._kamus is not None}
+
+
+def parse_request(body, content_type, query):
+    """Mengembalikan (texts, ids, language, pipeline_steps) dari body JSON/NDJSON + query string."""
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    try:
+        steps = json.loads(params['pipeline_steps']) if 'pipeline_steps' in params else {}
+        if content_type in NDJSON_TYPES:
+            texts, ids = [], []
+            for line in body.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    ids.append(record.get('id', len(texts)))
+                    record = record.get('text')
+                else:
+                    ids.append(len(texts))
+                texts.append(record)
+            language = params.get('language', 'id')
+        else:
+            payload = json.loads(body or b'{}')
+            if not isinstance(payload, dict):
+                raise RequestError(400, "Body JSON harus berupa objek")
+            texts = payload.get('texts', [])
+            if not isinstance(texts, list):
+                raise RequestError(400, "texts harus berupa list")
+            ids = payload.get('ids') or list(range(len(texts)))
+            language = payload.get('language', params.get('language', 'id'))
+            steps = payload.get('pipeline_steps', steps)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise RequestError(400, f"Body/parameter tidak valid: {e}")
+
+    if language not in ('id', 'en'):
+        raise RequestError(400, "language harus 'id' atau 'en'")
+    if not isinstance(ids, list) or len(ids) != len(texts):
+        raise RequestError(400, "ids harus list yang sama panjang dengan texts")
+    if not isinstance(steps, dict):
+        raise RequestError(400, "pipeline_steps harus berupa objek")
+    texts = [text if isinstance(text, str) else '' for text in texts]
+    return texts, ids, language, steps
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        server_version = 'SAPreprocess/1.0'
+
+        def setup(self):
+            super().setup()
+            # Respons di-stream dalam beberapa write kecil; tanpa ini Nagle + delayed ACK menambah ~40 ms
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type='application/json', headers=()):
+            data = body if isinstance(body, bytes) else body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, status, payload, headers=()):
+            self._send(status, json.dumps(payload, ensure_ascii=False), headers=headers)
+
+        def _write_chunk(self, data):
+            self.wfile.write(b'%X\r\n%s\r\n' % (len(data), data))
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == '/metrics':
+                if 'format=json' in url.query:
+                    self._send_json(200, service.metrics.snapshot())
+                else:
+                    self._send(200, service.metrics.prometheus(), 'text/plain; version=0.0.4')
+            elif url.path == '/healthz':
+                self._send_json(200, service.health())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            received = time.perf_counter()
+            url = urlsplit(self.path)
+            if url.path != '/preprocess':
+                self._send_json(404, {'error': 'not found'})
+                return
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self._send_json(411, {'error': 'Content-Length wajib diisi'})
+                return
+            try:
+                length = int(length)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # Panjang body tidak diketahui: sisa stream tidak bisa dibaca dengan aman
+                self.close_connection = True
+                self._send_json(400, {'error': 'Content-Length harus bilangan bulat non-negatif'})
+                return
+            if length > service.max_body_bytes:
+                self.close_connection = True
+                self._send_json(413, {'error': 'body terlalu besar'})
+                return
+            if not service.admit():
+                # Antrean penuh: tolak segera (backpressure) sebelum body dibaca ke memori.
+                # Body dibiarkan tak terbaca sehingga koneksi harus ditutup.
+                self.close_connection = True
+                service.metrics.record(503, 0.0, 0.0, 0)
+                self._send_json(503, {'error': 'antrean penuh'}, headers=[('Retry-After', '1')])
+                return
+            try:
+                body = self.rfile.read(length)
+                self._handle_preprocess(body, url.query, received)
+            finally:
+                service.release()
+
+        def _handle_preprocess(self, body, query, received):
+            content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+            try:
+                texts, ids, language, steps = parse_request(body, content_type, query)
+                steps = service.resolve_steps(steps, language)
+                resources = service.resources_for(steps, language)
+            except RequestError as e:
+                service.metrics.record(e.status, 0.0, 0.0, 0)
+                self._send_json(e.status, {'error': str(e)})
+                return
+
+            if not service.acquire_worker():
+                service.metrics.record(503, time.perf_counter() - received, 0.0, 0)
+                self._send_json(503, {'error': 'waktu tunggu antrean habis'}, headers=[('Retry-After', '1')])
+                return
+            queue_wait = time.perf_counter() - received
+            service.metrics.adjust(in_flight=1)
+            status, tail = 200, b''
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                offset = 0
+                for df_res in service.process(texts, steps, language, resources):
+                    rows = df_res.to_dict('records')
+                    lines = [
+                        json.dumps(dict(id=ids[offset + i], **row), ensure_ascii=False)
+                        for i, row in enumerate(rows)
+                    ]
+                    offset += len(rows)
+                    self._write_chunk(('\n'.join(lines) + '\n').encode('utf-8'))
+            except (BrokenPipeError, ConnectionResetError):
+                # Klien memutus koneksi di tengah stream
+                status, tail = 499, None
+                self.close_connection = True
+            except Exception as e:
+                # Header 200 sudah terkirim: error dilaporkan sebagai baris terakhir
+                status, tail = 500, json.dumps({'error': f"{type(e).__name__}: {e}"}).encode('utf-8') + b'\n'
+            finally:
+                service.release_worker()
+                service.metrics.adjust(in_flight=-1)
+            # Dicatat sebelum chunk penutup agar klien yang langsung membaca /metrics melihat request ini
+            service.metrics.record(status, time.perf_counter() - received, queue_wait, len(texts))
+            if tail is not None:
+                if tail:
+                    self._write_chunk(tail)
+                self._write_chunk(b'')
+
+    return Handler
+
+
+def serve(host='127.0.0.1', port=8765, **options):
+    service = PreprocessingService(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server, service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m http_service',
+        description="Layanan HTTP lokal untuk pipeline preprocessing (JSON/NDJSON, hasil di-stream)."
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Request yang diproses bersamaan (pipeline CPU-bound; jalankan beberapa proses untuk skala)")
+    parser.add_argument('--queue-size', type=int, default=16, help="Request yang boleh menunggu; sisanya ditolak 503")
+    parser.add_argument('--queue-timeout', type=float, default=30.0, help="Batas tunggu di antrean (detik)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Teks per sub-batch yang di-stream")
+    parser.add_argument('--max-body-mb', type=int, default=64)
+    parser.add_argument('--offline', action='store_true', help="Jangan mencoba mengunduh data NLTK (sama dengan SA_OFFLINE=1)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    server, service = serve(
+        args.host, args.port, workers=args.workers, queue_size=args.queue_size, queue_timeout=args.queue_timeout,
+        batch_size=args.batch_size, max_body_bytes=args.max_body_mb * 1024 * 1024, offline=args.offline or pl.OFFLINE
+    )
+    for language, missing in service.missing.items():
+        if missing:
+            print(f"Peringatan ({language}): data NLTK tidak tersedia: {', '.join(missing)}", file=sys.stderr)
+    print(
+        f"Resource dimuat dalam {time.perf_counter() - start:.1f} s; melayani di http://{args.host}:{args.port}",
+        file=sys.stderr
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
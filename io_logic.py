@@ -0,0 +1,244 @@
+"""Baca/tulis tabel per chunk (CSV, XLSX, Parquet, JSONL) agar memori bergantung pada ukuran chunk."""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+WRITE_FORMATS = ('csv', 'parquet', 'jsonl')
+
+
+# --- Reader ---
+
+def iter_table_chunks(path, chunk_size, columns=None):
+    """Membaca CSV/XLSX sebagai rangkaian DataFrame berisi string, masing-masing maksimal `chunk_size` baris."""
+    if path.lower().endswith('.xlsx'):
+        yield from _iter_xlsx_chunks(path, chunk_size, columns)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=str, usecols=columns)
+
+
+def _header_names(header):
+    """Nama kolom dari baris header XLSX; sel kosong menjadi 'Unnamed: N' seperti pd.read_excel."""
+    return [f"Unnamed: {i}" if h is None else str(h) for i, h in enumerate(header)]
+
+
+def missing_as_nan(df):
+    """Sel kosong di kolom object menjadi NaN (engine pyarrow memberi None), sama dengan pd.read_csv/read_excel."""
+    obj_cols = df.columns[df.dtypes == object]
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), np.nan)
+    return df
+
+
+def _iter_xlsx_chunks(path, chunk_size, columns, as_str=True):
+    # Mode read-only openpyxl membaca baris secara streaming, tidak memuat seluruh workbook
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _header_names(next(rows, ()))
+        selected = columns or header
+        positions = [header.index(c) for c in selected]
+
+        buffer = []
+        offset = 0
+        for row in rows:
+            # Sel kosong = NaN, sama dengan pd.read_csv / pd.read_excel
+            if as_str:
+                buffer.append([np.nan if i >= len(row) or row[i] is None else str(row[i]) for i in positions])
+            else:
+                buffer.append([np.nan if i >= len(row) or row[i] is None else row[i] for i in positions])
+            if len(buffer) == chunk_size:
+                yield pd.DataFrame(buffer, columns=selected, index=range(offset, offset + len(buffer)))
+                offset += len(buffer)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=selected, index=range(offset, offset + len(buffer)))
+    finally:
+        workbook.close()
+
+
+# --- Ingestion (upload di aplikasi) ---
+
+TEXT_COLUMN_HINTS = ('komentar', 'text', 'content')
+USER_COLUMN_HINTS = ('user', 'nama', 'author')
+
+
+def guess_text_column(columns):
+    """Indeks kolom teks yang paling mungkin (heuristik nama kolom), default 0."""
+    for i, column in enumerate(columns):
+        name = str(column).lower()
+        if any(hint in name for hint in TEXT_COLUMN_HINTS) and 'jumlah' not in name:
+            return i
+    return 0
+
+
+def guess_user_column(columns):
+    """Indeks kolom nama user yang paling mungkin, atau None."""
+    for i, column in enumerate(columns):
+        if any(hint in str(column).lower() for hint in USER_COLUMN_HINTS):
+            return i
+    return None
+
+
+def sniff_columns(source, name):
+    """Membaca nama kolom saja (baris header) dari file upload atau path."""
+    if name.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            header = next(workbook.active.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        columns = _header_names(header)
+    else:
+        columns = pd.read_csv(source, nrows=0).columns.tolist()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return columns
+
+
+def read_table(source, name, columns=None, chunk_size=50_000):
+    """Membaca file upload, hanya kolom `columns` (None = semua).
+
+    CSV dibaca dengan engine pyarrow (multi-thread), fallback ke engine C bila pyarrow tidak
+    tersedia atau gagal mem-parsing. XLSX dibaca dengan python-calamine bila terpasang, jika
+    tidak secara streaming (openpyxl read-only).
+    Mengembalikan (DataFrame, info) dengan info berisi rows, seconds, rows_per_sec dan engine.
+    """
+    start = time.perf_counter()
+    if name.lower().endswith('.xlsx'):
+        try:
+            # python-calamine (opsional, parser Rust) jauh lebih cepat daripada openpyxl
+            import python_calamine  # noqa: F401
+
+            df = pd.read_excel(source, usecols=columns, engine='calamine')
+            engine = 'calamine'
+        except ImportError:
+            chunks = list(_iter_xlsx_chunks(source, chunk_size, columns, as_str=False))
+            if chunks:
+                df = pd.concat(chunks).infer_objects()
+            else:
+                df = pd.DataFrame(columns=columns or sniff_columns(source, name))
+            engine = 'openpyxl-read-only'
+    else:
+        try:
+            df = missing_as_nan(pd.read_csv(source, usecols=columns, engine='pyarrow'))
+            engine = 'pyarrow'
+        except (ImportError, ValueError, TypeError) as e:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            df = pd.read_csv(source, usecols=columns)
+            engine = f'c (pyarrow gagal: {type(e).__name__})'
+        if columns:
+            df = df[columns]
+    seconds = time.perf_counter() - start
+    info = {
+        'rows': len(df),
+        'seconds': seconds,
+        'rows_per_sec': len(df) / seconds if seconds > 0 else 0.0,
+        'engine': engine,
+    }
+    return df, info
+
+
+# --- Writer ---
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext == 'ndjson':
+        return 'jsonl'
+    if ext not in WRITE_FORMATS:
+        raise ValueError(f"Format output tidak dikenal: '{ext}' (pilih {', '.join(WRITE_FORMATS)})")
+    return ext
+
+
+class ChunkWriter:
+    """Menulis DataFrame per chunk ke satu file; kolom di `list_columns` disimpan sebagai list di Parquet."""
+
+    def __init__(self, path, fmt=None, list_columns=()):
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.list_columns = set(list_columns)
+        self.rows = 0
+        self._file = None
+        self._parquet = None
+        self._schema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _arrow_schema(self, df):
+        """Schema dari chunk pertama (tipe hasil inferensi pandas/Arrow); kolom token selalu list<string>.
+
+        Kolom yang chunk pertamanya kosong semua (tipe null) ditulis sebagai string agar chunk
+        berikutnya yang berisi data tetap bisa di-cast.
+        """
+        import pyarrow as pa
+
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        for i, field in enumerate(schema):
+            if field.name in self.list_columns:
+                schema = schema.set(i, pa.field(field.name, pa.list_(pa.string())))
+            elif pa.types.is_null(field.type):
+                schema = schema.set(i, pa.field(field.name, pa.string()))
+        return schema
+
+    def _stringify_mixed(self, df):
+        """Kolom object campuran tipe (mis. teks & angka dari XLSX) menjadi string; null tetap null.
+
+        Begitu pula kolom yang di schema sudah string tetapi chunk ini berisi tipe lain.
+        """
+        import pyarrow as pa
+
+        converted = {}
+        for col in df.columns:
+            if col in self.list_columns:
+                continue
+            kind = pd.api.types.infer_dtype(df[col], skipna=True)
+            if self._schema is None:
+                mixed = df[col].dtype == object and kind in ('mixed', 'mixed-integer')
+            else:
+                mixed = pa.types.is_string(self._schema.field(col).type) and kind not in ('string', 'empty')
+            if mixed:
+                converted[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        if not converted:
+            return df
+        df = df.copy()
+        for col, values in converted.items():
+            df[col] = values
+        return df
+
+    def write(self, df):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            df = self._stringify_mixed(df)
+            if self._parquet is None:
+                self._schema = self._arrow_schema(df)
+                self._parquet = pq.ParquetWriter(self.path, self._schema)
+            # Chunk berikutnya di-cast ke schema chunk pertama (mis. float dengan NaN -> int64 nullable)
+            self._parquet.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        else:
+            if self._file is None:
+                self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            if self.fmt == 'csv':
+                df.to_csv(self._file, header=self.rows == 0, index=False)
+            elif len(df):
+                self._file.write(df.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n')
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,369 @@
+"""Antrean job preprocessing yang berjalan di latar belakang, terpisah dari rerun skrip Streamlit.
+
+Satu JobManager per proses server (lihat `get_job_manager`) memegang antrean FIFO dan satu thread
+worker; job dijalankan satu per satu (tiap job sendiri sudah memakai banyak proses lewat
+parallel_engine). Status, progress dan hasil job disimpan di objek Job, sehingga skrip cukup
+menyimpan ID job (di session_state dan query param) lalu mem-poll progresnya. Tab yang
+reconnect atau rerun karena klik lain tidak menghentikan proses.
+
+Sebelum mulai, memori run diperkirakan (memory_logic); run yang melebihi anggaran menulis hasil
+per chunk ke Parquet di RESULT_SPILL_DIR dan hanya menyimpan ringkasannya di memori.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+import streamlit as st
+
+import aggregate_logic as al
+import dataset_store as ds
+import io_logic
+import memory_logic as ml
+import parallel_engine as pe
+import preprocessing_logic as pl
+import sentiment_logic as sl
+import token_store as ts
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Job selesai (beserta hasilnya) yang tetap disimpan agar bisa dibuka lagi
+MAX_FINISHED_JOBS = int(os.environ.get('SA_JOB_HISTORY', 20))
+# Kata teratas yang tetap disimpan di agregat job selesai (sama dengan yang ditampilkan Tab Visualisasi)
+FINISHED_TOP_WORDS = 200
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Hasil run mode chunk (Parquet); dihapus bersama job saat keluar dari riwayat
+RESULT_SPILL_DIR = os.environ.get('SA_RESULT_SPILL_DIR', os.path.join(BASE_DIR, '.cache', 'results'))
+_result_dir = None
+_result_dir_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Dilempar dari callback progress saat job diminta berhenti."""
+
+
+class Job:
+    """Satu permintaan preprocessing untuk satu dataset beserta status dan hasilnya."""
+
+    def __init__(self, dataset_name, dataset_key, column, language, pipeline_steps,
+                 workers=None, approx_freq=False, original_fp=None, stage_cache=None,
+                 memory_mode='auto', budget_bytes=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.dataset_name = dataset_name
+        self.dataset_key = dataset_key
+        self.column = column
+        self.language = language
+        self.pipeline_steps = dict(pipeline_steps)
+        self.workers = workers
+        self.approx_freq = approx_freq
+        self.original_fp = original_fp
+        self.stage_cache = stage_cache
+        self.memory_mode = memory_mode
+        self.budget_bytes = budget_bytes
+
+        self.status = QUEUED
+        self.done_rows = 0
+        self.total_rows = 0
+        self.rows_per_sec = 0.0
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.result = None
+        # memory_logic.RunPlan (perkiraan & mode) dan RssMonitor.to_dict() (puncak RSS run)
+        self.plan = None
+        self.memory = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    @property
+    def fraction(self):
+        return self.done_rows / self.total_rows if self.total_rows else 0.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def report(self, done, total, rows_per_sec):
+        """Callback on_progress untuk parallel_engine; sekaligus titik berhenti saat dibatalkan."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.done_rows, self.total_rows, self.rows_per_sec = done, total, rows_per_sec
+
+
+def run_job(job, store):
+    """Menjalankan pipeline untuk `job`; hasilnya sama dengan proses langsung di app.
+
+    Mengembalikan dict berisi fingerprint, PipelineStats, CorpusAggregates, ringkasan sentimen,
+    rencana memori dan puncak RSS, plus salah satu dari: kunci DataFrame hasil di `store` dan
+    TokenStore (mode memori), atau path Parquet hasil (mode chunk).
+    """
+    original_df = store.get(job.dataset_key)
+    if original_df is None:
+        raise RuntimeError("Dataset sudah dihapus dari penyimpanan server")
+    original_fp = job.original_fp or pl.dataset_fingerprint(original_df)
+
+    text_series = original_df[job.column]
+    job.total_rows = len(text_series)
+    cache_key = (original_fp, job.column, job.language)
+    # Perkiraan dari jumlah baris & rata-rata panjang teks; melebihi anggaran -> mode chunk ke disk
+    job.plan = ml.plan_run(text_series, store.nbytes(job.dataset_key), job.budget_bytes, job.memory_mode)
+
+    lexicon = sl.lexicon_for(job.pipeline_steps, job.language) if job.pipeline_steps.get('sentiment') else None
+    processed_fp = pl.derive_fingerprint(
+        cache_key, pl.stage_signature(job.pipeline_steps, job.language), lexicon and lexicon.signature
+    )
+
+    run_stats = pl.PipelineStats()
+    # Frekuensi kata & statistik panjang dihitung sambil jalan untuk Tab Visualisasi
+    run_aggregates = al.CorpusAggregates(al.DEFAULT_HEAVY_HITTER_CAPACITY if job.approx_freq else None)
+    sentiment = sl.SentimentSummary() if lexicon is not None else None
+    with ml.RssMonitor() as monitor:
+        if job.plan.spill:
+            result = _run_spilled(job, original_df, processed_fp, lexicon, run_stats, run_aggregates, sentiment)
+        else:
+            result = _run_in_memory(
+                job, store, original_df, cache_key, processed_fp, lexicon, run_stats, run_aggregates, sentiment
+            )
+    job.memory = monitor.to_dict()
+    result.update({
+        'original_fp': original_fp,
+        'processed_fp': processed_fp,
+        'pipeline_stats': run_stats,
+        'aggregates': run_aggregates,
+        'sentiment': sentiment,
+        'plan': job.plan.to_dict(),
+        'memory': job.memory,
+    })
+    return result
+
+
+def _run_in_memory(job, store, original_df, cache_key, processed_fp, lexicon, run_stats, run_aggregates, sentiment):
+    # Kolom token disimpan ringkas (ID integer) di token_store, bukan list di DataFrame
+    df_res, token_store = pe.run_pipeline_compact(
+        original_df[job.column], job.pipeline_steps, job.language,
+        workers=job.workers,
+        on_progress=job.report,
+        stats=run_stats,
+        stage_cache=job.stage_cache,
+        cache_key=cache_key,
+        aggregates=run_aggregates
+    )
+    if job._cancel.is_set():
+        raise JobCancelled()
+
+    df_proc = original_df.join(df_res)
+    df_proc['Jumlah_Tokens_Akhir'] = token_store.column('Tokens_Stemmed').lengths()
+    if 'No' not in df_proc.columns:
+        df_proc.insert(0, 'No', range(1, len(df_proc) + 1))
+
+    # Skor sentimen dihitung secara vektor dari kolom token ringkas (bukan per baris)
+    if lexicon is not None:
+        sl.add_sentiment_columns(df_proc, token_store.column('Tokens_Stemmed'), lexicon)
+        sentiment.update(df_proc[sl.SCORE_COLUMN].to_numpy())
+
+    return {
+        'processed_key': store.put(f"processed:{processed_fp}", df_proc),
+        'processed_path': None,
+        'processed_rows': len(df_proc),
+        'processed_columns': list(df_proc.columns) + list(token_store.columns),
+        'token_store': token_store,
+    }
+
+
+def _run_spilled(job, original_df, processed_fp, lexicon, run_stats, run_aggregates, sentiment):
+    """Mode chunk: tiap chunk hasil digabung dengan baris aslinya, ditulis ke Parquet, lalu dibuang.
+
+    Kolom dan urutannya sama dengan mode memori; kolom token disimpan sebagai list. StageCache
+    tidak diisi karena justru akan menahan seluruh hasil antara di memori.
+    """
+    path = os.path.join(result_dir(), f"{processed_fp}-{job.id}.parquet")
+    add_no = 'No' not in original_df.columns
+    columns = []
+    chunks = pe.iter_pipeline_chunks(
+        original_df[job.column], job.pipeline_steps, job.language,
+        workers=job.workers,
+        on_progress=job.report,
+        stats=run_stats,
+        aggregates=run_aggregates
+    )
+    try:
+        with io_logic.ChunkWriter(path, 'parquet', list_columns=pl.TOKEN_COLUMNS) as writer:
+            for start, df_chunk in chunks:
+                df_out = original_df.iloc[start:start + len(df_chunk)].join(df_chunk)
+                df_out['Jumlah_Tokens_Akhir'] = df_chunk['Tokens_Stemmed'].map(len).to_numpy()
+                if add_no:
+                    df_out.insert(0, 'No', range(start + 1, start + len(df_out) + 1))
+                if lexicon is not None:
+                    chunk_store = ts.TokenStore.from_frame(df_chunk, ['Tokens_Stemmed'])
+                    sl.add_sentiment_columns(df_out, chunk_store.column('Tokens_Stemmed'), lexicon)
+                    sentiment.update(df_out[sl.SCORE_COLUMN].to_numpy())
+                writer.write(df_out)
+                columns = list(df_out.columns)
+            if job._cancel.is_set():
+                raise JobCancelled()
+    except BaseException:
+        chunks.close()
+        remove_result_file(path)
+        raise
+    return {
+        'processed_key': None,
+        'processed_path': path,
+        'processed_rows': len(original_df),
+        'processed_columns': columns,
+        'token_store': None,
+    }
+
+
+def release_result(job, result):
+    """Hasil job selesai hanya menyimpan handle: TokenStore ditulis ke disk, agregat dipangkas ke kata teratas.
+
+    DataFrame hasil sudah ada di DatasetStore (berbatas memori) lewat `processed_key`; riwayat job
+    tidak lagi menahan data sebesar korpus di memori.
+    """
+    token_store, result['token_store'], result['token_store_path'] = result['token_store'], None, None
+    if token_store is not None:
+        path = os.path.join(result_dir(), f"{result['processed_fp']}-{job.id}.tokens.npz")
+        try:
+            token_store.save(path)
+        except BaseException:
+            remove_result_file(path)
+            raise
+        result['token_store_path'] = path
+    result['aggregates'].compact(FINISHED_TOP_WORDS)
+    return result
+
+
+def load_token_store(result, store):
+    """TokenStore hasil job mode memori, dibaca dari disk; None untuk mode chunk atau bila hasilnya sudah hilang."""
+    path = result.get('token_store_path')
+    if path is None:
+        return None
+    df = store.get(result['processed_key'])
+    if df is None:
+        return None
+    try:
+        return ts.TokenStore.load(path, df.index)
+    except OSError:
+        return None
+
+
+def result_dir():
+    """Subfolder RESULT_SPILL_DIR milik proses ini (dibuat sekali; folder proses lain yang yatim dibersihkan)."""
+    global _result_dir
+    with _result_dir_lock:
+        if _result_dir is None or not os.path.isdir(_result_dir):
+            _result_dir = ds.process_spill_dir(RESULT_SPILL_DIR)
+        else:
+            # Folder yang masih dipakai tidak boleh terlihat yatim oleh proses lain
+            os.utime(_result_dir)
+        return _result_dir
+
+
+def remove_result_file(path):
+    if path is not None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class JobManager:
+    """Antrean FIFO job preprocessing dengan satu thread worker; aman dipakai banyak sesi."""
+
+    def __init__(self, store, max_finished=MAX_FINISHED_JOBS):
+        self.store = store
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name='preprocess-jobs', daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        with self._cond:
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._cond.notify()
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self, job_ids):
+        """Job yang masih dikenal dari daftar ID (ID yang sudah dibuang diabaikan)."""
+        with self._cond:
+            return [self._jobs[i] for i in job_ids if i in self._jobs]
+
+    def position(self, job):
+        """Nomor antrean (1 = berikutnya); 0 jika job tidak sedang menunggu."""
+        with self._cond:
+            try:
+                return self._queue.index(job) + 1
+            except ValueError:
+                return 0
+
+    def cancel(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return
+            job.cancel()
+            if job.status == QUEUED:
+                # Belum mulai: cukup dikeluarkan dari antrean
+                self._queue.remove(job)
+                self._finish(job, CANCELLED)
+
+    # --- Worker ---
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._queue.popleft()
+                job.status = RUNNING
+                job.started_at = time.time()
+            try:
+                result = release_result(job, run_job(job, self.store))
+            except JobCancelled:
+                status, result = CANCELLED, None
+            except Exception as e:
+                logger.exception("Job %s (%s) gagal", job.id, job.dataset_name)
+                job.error = f"{type(e).__name__}: {e}"
+                status, result = FAILED, None
+            else:
+                status = DONE
+            with self._cond:
+                job.result = result
+                self._finish(job, status)
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        job.stage_cache = None
+        finished = [j for j in self._jobs.values() if j.finished]
+        for old in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[old.id]
+            if old.result is not None:
+                remove_result_file(old.result.get('processed_path'))
+                remove_result_file(old.result.get('token_store_path'))
+
+
+@st.cache_resource
+def get_job_manager():
+    """JobManager bersama untuk semua sesi dalam satu proses server."""
+    return JobManager(pl.get_dataset_store())
@@ -0,0 +1,154 @@
+"""Kompilasi `kamuskatabaku.xlsx` (plus kamus slang opsional) menjadi artefak biner yang cepat dimuat.
+
+Format artefak: MAGIC, panjang header (4 byte), header JSON, lalu payload JSON berisi dict
+tidak_baku -> kata_baku. Header menyimpan hash isi file sumber (untuk deteksi perubahan xlsx)
+dan hash payload (untuk validasi integritas). Payload sengaja bukan pickle: artefak ada di
+folder cache yang bisa ditulis, dan memuatnya tidak boleh bisa menjalankan kode.
+
+Contoh:
+    python -m kamus_builder
+    python -m kamus_builder --extra slang_tambahan.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KAMUS_XLSX = os.path.join(BASE_DIR, 'kamuskatabaku.xlsx')
+KAMUS_ARTIFACT = os.environ.get('SA_KAMUS_ARTIFACT', os.path.join(BASE_DIR, '.cache', 'kamus_kata_baku.bin'))
+# Kamus slang tambahan (CSV/XLSX dengan kolom tidak_baku, kata_baku), dipisah os.pathsep
+EXTRA_SOURCES = [p for p in os.environ.get('SA_KAMUS_EXTRA', '').split(os.pathsep) if p]
+
+MAGIC = b'SAKAMUS2'
+
+
+class KamusError(Exception):
+    """Kamus tidak bisa dibangun atau dimuat."""
+
+
+def source_paths(extra_paths=None):
+    return [KAMUS_XLSX, *(EXTRA_SOURCES if extra_paths is None else extra_paths)]
+
+
+def source_hash(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(os.path.basename(path).encode('utf-8'))
+                digest.update(hashlib.sha256(f.read()).digest())
+        except OSError as e:
+            raise KamusError(f"File kamus tidak bisa dibaca: {path} ({e})") from e
+    return digest.hexdigest()
+
+
+def _read_source(path):
+    if path.lower().endswith('.xlsx'):
+        df = pd.read_excel(path)
+    else:
+        df = pd.read_csv(path)
+    missing = {'tidak_baku', 'kata_baku'} - set(df.columns)
+    if missing:
+        raise KamusError(f"Kolom {sorted(missing)} tidak ada di {path}")
+    df = df[['tidak_baku', 'kata_baku']].dropna()
+    return dict(zip(df['tidak_baku'].astype(str), df['kata_baku'].astype(str)))
+
+
+def build_kamus(paths=None, artifact_path=KAMUS_ARTIFACT):
+    """Membangun artefak dari file sumber (entri di file belakang menimpa yang di depan)."""
+    paths = source_paths() if paths is None else paths
+    kamus = {}
+    for path in paths:
+        try:
+            kamus.update(_read_source(path))
+        except KamusError:
+            raise
+        except Exception as e:
+            raise KamusError(f"Gagal membaca kamus {path}: {e}") from e
+
+    payload = json.dumps(kamus, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    header = json.dumps({
+        'source_hash': source_hash(paths),
+        'payload_sha256': hashlib.sha256(payload).hexdigest(),
+        'entries': len(kamus),
+        'sources': [os.path.basename(p) for p in paths],
+    }).encode('utf-8')
+
+    os.makedirs(os.path.dirname(os.path.abspath(artifact_path)), exist_ok=True)
+    tmp_path = f"{artifact_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(header)) + header + payload)
+    os.replace(tmp_path, artifact_path)  # atomik: proses lain tidak pernah membaca file setengah jadi
+    return kamus
+
+
+def read_artifact(artifact_path, expected_source_hash):
+    """Membaca artefak; None (bangun ulang) jika tidak ada, terpotong, rusak, atau dari sumber berbeda."""
+    try:
+        with open(artifact_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(MAGIC):
+        return None
+    try:
+        (header_len,) = struct.unpack_from('<I', data, len(MAGIC))
+        offset = len(MAGIC) + 4
+        header = json.loads(data[offset:offset + header_len])
+        payload = data[offset + header_len:]
+        if header['source_hash'] != expected_source_hash:
+            return None
+        if hashlib.sha256(payload).hexdigest() != header['payload_sha256']:
+            return None
+        kamus = json.loads(payload)
+    except (struct.error, ValueError, KeyError, TypeError):
+        # ValueError mencakup JSONDecodeError dan UnicodeDecodeError
+        return None
+    return kamus if isinstance(kamus, dict) else None
+
+
+def load_kamus(artifact_path=KAMUS_ARTIFACT):
+    """Memuat kamus dari artefak, membangun ulang otomatis bila xlsx berubah.
+
+    Mengembalikan (kamus_dict, info) dengan info berisi jumlah entri, waktu muat dan
+    apakah artefak dibangun ulang. Kegagalan dilaporkan sebagai KamusError.
+    """
+    start = time.perf_counter()
+    paths = source_paths()
+    kamus = read_artifact(artifact_path, source_hash(paths))
+    rebuilt = kamus is None
+    if rebuilt:
+        try:
+            kamus = build_kamus(paths, artifact_path)
+        except OSError:
+            # Folder artefak read-only: tetap pakai hasil parsing di memori
+            kamus = {}
+            for path in paths:
+                kamus.update(_read_source(path))
+    info = {
+        'entries': len(kamus),
+        'load_ms': (time.perf_counter() - start) * 1000,
+        'rebuilt': rebuilt,
+        'artifact': artifact_path,
+    }
+    return kamus, info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m kamus_builder', description="Bangun artefak kamus kata baku.")
+    parser.add_argument('--extra', action='append', default=None, help="Kamus slang tambahan (CSV/XLSX)")
+    parser.add_argument('--out', default=KAMUS_ARTIFACT)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    kamus = build_kamus(source_paths(args.extra), args.out)
+    print(f"{len(kamus):,} entri ditulis ke {args.out} dalam {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""Anggaran memori untuk satu run preprocessing: perkiraan sebelum mulai dan pemantauan puncak RSS.
+
+Perkiraan dihitung dari jumlah baris dan rata-rata panjang teks (sampel), dengan konstanta per
+byte yang dikalibrasi terhadap RSS nyata run_job (lihat benchmarks/bench_memory_budget.py).
+Jika perkiraan melebihi anggaran (SA_MEMORY_BUDGET_MB, default setengah batas memori
+container/mesin), job berjalan dalam mode chunk: hasil tiap chunk ditulis ke Parquet di disk dan
+yang tersisa di memori hanya ringkasan (statistik, frekuensi kata, distribusi sentimen).
+"""
+import os
+import resource
+import sys
+import threading
+
+MODE_MEMORY = 'memory'
+MODE_SPILL = 'spill'
+MODES = {'auto': "Otomatis", MODE_MEMORY: "Selalu di memori", MODE_SPILL: "Selalu chunk ke disk"}
+
+# Konstanta perkiraan (byte); dikalibrasi dengan benchmarks/bench_memory_budget.py
+STR_OVERHEAD = 49          # header objek str CPython (ASCII) + pointer di kolom object
+ROW_OVERHEAD = 160         # kolom numerik, index, offset token, list per chunk, dll. per baris
+CHARS_PER_TOKEN = 6.0      # rata-rata karakter per token termasuk spasi
+TOKEN_BYTES = 3 * 4 * 2    # tiga kolom ID int32, disalin sekali saat hasil unik disebar ke semua baris
+TEXT_FACTOR = 2.0          # Teks_Clean + Teks_Final_Joined (lebih pendek) plus salinan sementara
+ORIGINAL_FACTOR = 1.0      # original_df.join(...) menyalin semua kolom asli
+
+
+def _read_int(path):
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def memory_limit_bytes():
+    """Batas memori efektif: limit cgroup (container) bila ada, selain itu RAM fisik."""
+    physical = None
+    try:
+        physical = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        pass
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = _read_int(path)
+        if limit and (physical is None or limit < physical):
+            return limit
+    return physical
+
+
+def default_budget_bytes():
+    if os.environ.get('SA_MEMORY_BUDGET_MB'):
+        return int(os.environ['SA_MEMORY_BUDGET_MB']) * 1024 * 1024
+    limit = memory_limit_bytes()
+    return limit // 2 if limit else 2 * 1024 ** 3
+
+
+DEFAULT_BUDGET_BYTES = default_budget_bytes()
+
+
+# --- Perkiraan ---
+
+def average_text_length(series, sample_size=1000):
+    """Rata-rata panjang teks (karakter) dari sampel berjarak rata; NaN dihitung 0."""
+    if not len(series):
+        return 0.0
+    step = max(1, len(series) // sample_size)
+    sample = series.iloc[::step]
+    return float(sample.where(sample.notna(), '').astype(str).str.len().mean())
+
+
+def estimate_run_bytes(n_rows, avg_chars, original_bytes=0):
+    """Perkiraan memori tambahan run dalam mode di-memori: hasil teks, TokenStore dan salinan dataset asli."""
+    text_bytes = TEXT_FACTOR * (STR_OVERHEAD + avg_chars)
+    token_bytes = TOKEN_BYTES * (avg_chars / CHARS_PER_TOKEN)
+    return int(n_rows * (text_bytes + token_bytes + ROW_OVERHEAD) + ORIGINAL_FACTOR * original_bytes)
+
+
+class RunPlan:
+    """Keputusan mode untuk satu run: perkiraan, anggaran dan mode yang dipakai."""
+
+    def __init__(self, n_rows, avg_chars, estimate_bytes, budget_bytes, mode):
+        self.n_rows = n_rows
+        self.avg_chars = avg_chars
+        self.estimate_bytes = estimate_bytes
+        self.budget_bytes = budget_bytes
+        self.mode = mode
+
+    @property
+    def spill(self):
+        return self.mode == MODE_SPILL
+
+    def to_dict(self):
+        return {
+            'rows': self.n_rows, 'avg_chars': self.avg_chars, 'estimate_bytes': self.estimate_bytes,
+            'budget_bytes': self.budget_bytes, 'mode': self.mode,
+        }
+
+
+def plan_run(series, original_bytes=0, budget_bytes=None, mode='auto'):
+    """Memperkirakan memori run untuk kolom teks `series` lalu memilih mode (auto: spill bila melebihi anggaran)."""
+    budget_bytes = DEFAULT_BUDGET_BYTES if budget_bytes is None else budget_bytes
+    avg_chars = average_text_length(series)
+    estimate = estimate_run_bytes(len(series), avg_chars, original_bytes)
+    if mode == 'auto':
+        mode = MODE_SPILL if estimate > budget_bytes else MODE_MEMORY
+    return RunPlan(len(series), avg_chars, estimate, budget_bytes, mode)
+
+
+# --- Pemantauan RSS ---
+
+def _rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _children(pid):
+    pids = []
+    try:
+        tasks = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return pids
+    for task in tasks:
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                pids.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            pass
+    return pids
+
+
+def process_tree_rss():
+    """RSS proses ini plus semua proses anaknya (mis. worker parallel_engine); None jika /proc tidak ada."""
+    own = _rss_bytes(os.getpid())
+    if own is None:
+        return None
+    total, stack = own, _children(os.getpid())
+    while stack:
+        pid = stack.pop()
+        total += _rss_bytes(pid) or 0
+        stack.extend(_children(pid))
+    return total
+
+
+def max_rss_bytes():
+    """Puncak RSS seumur proses (getrusage) sebagai cadangan bila /proc tidak tersedia."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssMonitor:
+    """Mencatat puncak RSS (proses + anak) selama blok `with`, dengan sampling di thread latar."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.start_bytes = None
+        self.peak_bytes = None
+        self.end_bytes = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        rss = process_tree_rss()
+        if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+            self.peak_bytes = rss
+        return rss
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.start_bytes = self.sample()
+        if self.start_bytes is not None:
+            self._thread = threading.Thread(target=self._loop, name='rss-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.end_bytes = self.sample()
+        if self.peak_bytes is None:
+            self.peak_bytes = max_rss_bytes()
+
+    def to_dict(self):
+        return {
+            'start_rss_bytes': self.start_bytes,
+            'peak_rss_bytes': self.peak_bytes,
+            'end_rss_bytes': self.end_bytes,
+            'peak_delta_bytes': None if self.start_bytes is None else self.peak_bytes - self.start_bytes,
+        }
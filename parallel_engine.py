@@ -0,0 +1,280 @@
+"""Eksekusi pipeline preprocessing secara paralel (multi-proses) per chunk dengan laporan progress."""
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import aggregate_logic as al
+import preprocessing_logic as pl
+import token_store as ts
+
+DEFAULT_CHUNK_SIZE = 5_000
+# Chunk mode spill (iter_pipeline_chunks) lebih besar: dedupe per chunk dan satu row group Parquet per chunk
+SPILL_CHUNK_SIZE = 20_000
+# Di bawah jumlah baris ini biaya start pool lebih besar daripada penghematannya
+MIN_PARALLEL_ROWS = 20_000
+
+# Resource milik tiap proses worker, diisi sekali oleh _init_worker
+_worker_state = {}
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _init_worker(pipeline_steps, language, aggregate_config=None):
+    """Initializer worker: stemmer, lemmatizer, stopword dan kamus dimuat sekali per proses."""
+    _worker_state['pipeline_steps'] = pipeline_steps
+    _worker_state['language'] = language
+    # None: tanpa agregasi; selain itu kapasitas heavy-hitter (0 = frekuensi eksak)
+    _worker_state['aggregate_config'] = aggregate_config
+    _worker_state['resources'] = pl.load_pipeline_resources(pipeline_steps, language)
+
+
+def _pack(df_chunk, compact):
+    """Mode ringkas: kolom teks tetap DataFrame, kolom token di-encode ke ID (list tidak dikirim)."""
+    if not compact:
+        return df_chunk
+    encoded = ts.encode_chunk({name: df_chunk[name].tolist() for name in pl.TOKEN_COLUMNS})
+    return df_chunk[pl.TEXT_COLUMNS], encoded
+
+
+def _process_chunk(chunk_id, texts, compact=False, weights=None, dedupe=False):
+    stats = pl.PipelineStats()
+    aggregate_config = _worker_state['aggregate_config']
+    aggregates = None if aggregate_config is None else al.CorpusAggregates(aggregate_config or None)
+    df_chunk = pl.preprocess_series(
+        texts,
+        _worker_state['pipeline_steps'],
+        _worker_state['language'],
+        vocab_first=True,
+        resources=_worker_state['resources'],
+        stats=stats,
+        aggregates=aggregates,
+        dedupe=dedupe,
+        weights=weights
+    )
+    return chunk_id, _pack(df_chunk, compact), stats, aggregates
+
+
+def _chunks(series, chunk_size):
+    return [series.iloc[start:start + chunk_size] for start in range(0, len(series), chunk_size)]
+
+
+def run_pipeline(series, pipeline_steps, language, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 min_parallel_rows=MIN_PARALLEL_ROWS, on_progress=None, stats=None,
+                 stage_cache=None, cache_key=None, aggregates=None, dedupe=True):
+    """Memproses kolom teks per chunk, paralel bila input cukup besar.
+
+    `on_progress(done_rows, total_rows, rows_per_sec)` dipanggil setiap satu chunk selesai.
+    Statistik dan frekuensi kata tiap chunk/worker digabung ke `stats` (PipelineStats) dan
+    `aggregates` (aggregate_logic.CorpusAggregates) bila diberikan.
+    Hasil disusun kembali sesuai urutan index asli, sama seperti `pl.preprocess_series`.
+
+    Dengan `stage_cache`/`cache_key`, run kecil atau run yang tokenisasinya sudah di-cache
+    dijalankan di proses ini lewat StageCache (hanya tahap yang berubah yang diulang);
+    hasil run paralel dipakai untuk mengisi cache.
+
+    Dengan `dedupe` (default), teks identik hanya diproses sekali lalu hasilnya disebar kembali
+    ke semua baris; rasio duplikat dan perkiraan waktu hemat dicatat di `stats`.
+    """
+    return _run(series, pipeline_steps, language, workers, chunk_size, min_parallel_rows, on_progress,
+                stats, stage_cache, cache_key, aggregates, compact=False, dedupe=dedupe)
+
+
+def run_pipeline_compact(series, pipeline_steps, language, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                         min_parallel_rows=MIN_PARALLEL_ROWS, on_progress=None, stats=None,
+                         stage_cache=None, cache_key=None, aggregates=None, dedupe=True):
+    """Seperti run_pipeline, tetapi mengembalikan (DataFrame kolom teks, token_store.TokenStore).
+
+    Kolom token di-encode per chunk (di worker untuk run paralel), sehingga list token untuk
+    seluruh dataset tidak pernah ada di memori sekaligus.
+    """
+    return _run(series, pipeline_steps, language, workers, chunk_size, min_parallel_rows, on_progress,
+                stats, stage_cache, cache_key, aggregates, compact=True, dedupe=dedupe)
+
+
+def iter_pipeline_chunks(series, pipeline_steps, language, workers=None, chunk_size=SPILL_CHUNK_SIZE,
+                         min_parallel_rows=MIN_PARALLEL_ROWS, on_progress=None, stats=None, aggregates=None,
+                         max_pending=None):
+    """Menghasilkan (posisi awal, DataFrame hasil chunk) berurutan, satu chunk per iterasi.
+
+    Untuk run yang hasilnya tidak muat di memori: pemanggil menulis tiap chunk (mis. ke Parquet)
+    lalu membuangnya. Paling banyak `max_pending` chunk (default 2x worker) sedang diproses atau
+    menunggu diambil, sehingga memori tidak bergantung pada ukuran dataset. Teks duplikat
+    dideduplikasi per chunk; `stats`, `aggregates` dan `on_progress` sama seperti run_pipeline.
+    """
+    workers = workers or default_workers()
+    total = len(series)
+    chunks = _chunks(series, chunk_size)
+    done = 0
+    start = time.perf_counter()
+
+    def report(rows):
+        nonlocal done
+        done += rows
+        if on_progress is not None:
+            elapsed = time.perf_counter() - start
+            on_progress(done, total, done / elapsed if elapsed > 0 else 0.0)
+
+    if workers <= 1 or total < min_parallel_rows:
+        resources = pl.load_pipeline_resources(pipeline_steps, language)
+        for i, texts in enumerate(chunks):
+            df_chunk = pl.preprocess_series(
+                texts, pipeline_steps, language, vocab_first=True, resources=resources, stats=stats,
+                aggregates=aggregates, dedupe=True
+            )
+            report(len(texts))
+            yield i * chunk_size, df_chunk
+        return
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(pipeline_steps, language, None if aggregates is None else (aggregates.heavy_hitter_capacity or 0))
+    ) as pool:
+        pending = deque()
+        next_chunk = 0
+        try:
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < max_pending:
+                    pending.append(pool.submit(_process_chunk, next_chunk, chunks[next_chunk], dedupe=True))
+                    next_chunk += 1
+                # Diambil sesuai urutan submit agar chunk keluar berurutan
+                chunk_id, df_chunk, chunk_stats, chunk_aggregates = pending.popleft().result()
+                if stats is not None:
+                    stats.merge(chunk_stats)
+                if aggregates is not None:
+                    aggregates.merge(chunk_aggregates)
+                report(len(df_chunk))
+                yield chunk_id * chunk_size, df_chunk
+        except BaseException:
+            # Gagal/dibatalkan/generator ditutup: chunk yang belum mulai tidak dijalankan
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def _run(series, pipeline_steps, language, workers, chunk_size, min_parallel_rows, on_progress,
+         stats, stage_cache, cache_key, aggregates, compact, dedupe=False, weights=None):
+    if dedupe:
+        return _run_deduped(series, pipeline_steps, language, workers, chunk_size, min_parallel_rows, on_progress,
+                            stats, stage_cache, cache_key, aggregates, compact)
+
+    workers = workers or default_workers()
+    total = len(series)
+    chunks = _chunks(series, chunk_size)
+    parts = [None] * len(chunks)
+    done = 0
+    start = time.perf_counter()
+
+    def report(rows):
+        nonlocal done
+        done += rows
+        if on_progress is not None:
+            elapsed = time.perf_counter() - start
+            on_progress(done, total, done / elapsed if elapsed > 0 else 0.0)
+
+    serial = workers <= 1 or total < min_parallel_rows
+    use_cache = stage_cache is not None and cache_key is not None
+    if use_cache:
+        tokens_key = tuple(cache_key) + pl.stage_signature(pipeline_steps, language)[:1]
+        if serial or stage_cache.get(tokens_key) is not None:
+            df_res = pl.preprocess_series(
+                series, pipeline_steps, language, stats=stats, stage_cache=stage_cache, cache_key=cache_key,
+                aggregates=aggregates, weights=weights
+            )
+            report(total)
+            return _assemble([_pack(df_res, compact)], series, compact)
+
+    if serial:
+        # Fallback serial: tetap per chunk agar progress bisa dilaporkan
+        resources = pl.load_pipeline_resources(pipeline_steps, language)
+        for i, texts in enumerate(chunks):
+            df_chunk = pl.preprocess_series(
+                texts, pipeline_steps, language, vocab_first=True, resources=resources, stats=stats,
+                aggregates=aggregates, weights=_chunk_weights(weights, i, chunk_size)
+            )
+            parts[i] = _pack(df_chunk, compact)
+            report(len(texts))
+    else:
+        # 'spawn' karena fork dari proses Streamlit yang multi-thread tidak aman
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(
+                pipeline_steps, language,
+                None if aggregates is None else (aggregates.heavy_hitter_capacity or 0)
+            )
+        ) as pool:
+            futures = [
+                pool.submit(_process_chunk, i, texts, compact, _chunk_weights(weights, i, chunk_size))
+                for i, texts in enumerate(chunks)
+            ]
+            try:
+                for future in as_completed(futures):
+                    chunk_id, part, chunk_stats, chunk_aggregates = future.result()
+                    parts[chunk_id] = part
+                    if stats is not None:
+                        stats.merge(chunk_stats)
+                    if aggregates is not None:
+                        aggregates.merge(chunk_aggregates)
+                    report(len(chunks[chunk_id]))
+            except BaseException:
+                # Gagal/dibatalkan (mis. on_progress melempar): chunk yang belum mulai tidak dijalankan
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    result = _assemble(parts, series, compact)
+    if use_cache:
+        if compact:
+            pl.seed_stage_cache_from_store(stage_cache, cache_key, pipeline_steps, language, result[1])
+        else:
+            pl.seed_stage_cache(stage_cache, cache_key, pipeline_steps, language, result)
+    return result
+
+
+def _chunk_weights(weights, chunk_id, chunk_size):
+    return None if weights is None else weights[chunk_id * chunk_size:(chunk_id + 1) * chunk_size]
+
+
+def _run_deduped(series, pipeline_steps, language, workers, chunk_size, min_parallel_rows, on_progress,
+                 stats, stage_cache, cache_key, aggregates, compact):
+    """Menjalankan pipeline atas teks unik saja, lalu menyebar hasilnya ke semua baris `series`."""
+    uniques, codes, counts = pl.dedupe_texts(series)
+    scale = len(series) / len(uniques) if len(uniques) else 1.0
+
+    def report(done, total, rows_per_sec):
+        # Progress tetap dilaporkan dalam satuan baris input
+        if on_progress is not None:
+            on_progress(min(len(series), round(done * scale)), len(series), rows_per_sec * scale)
+
+    # Waktu tahap saja: start worker dan warm-up stemmer tidak ikut diekstrapolasi ke baris duplikat
+    busy_before = stats.processing_seconds() if stats is not None else 0.0
+    result = _run(uniques, pipeline_steps, language, workers, chunk_size, min_parallel_rows, report,
+                  stats, stage_cache, pl.dedupe_cache_key(cache_key), aggregates, compact, weights=counts)
+    if stats is not None:
+        stats.record_dedupe(len(series), len(uniques), stats.processing_seconds() - busy_before)
+
+    if not compact:
+        return result.iloc[codes].set_axis(series.index)
+    df_text, store = result
+    return df_text.iloc[codes].set_axis(series.index), store.take(codes, series.index)
+
+
+def _assemble(parts, series, compact):
+    if not compact:
+        if not parts:
+            return pd.DataFrame(index=series.index, columns=pl.OUTPUT_COLUMNS)
+        return pd.concat(parts)
+    if not parts:
+        empty = pd.DataFrame(index=series.index, columns=pl.OUTPUT_COLUMNS)
+        return _assemble([_pack(empty, True)], series, True)
+    df_text = pd.concat([part[0] for part in parts])
+    store = ts.TokenStore.from_chunks([part[1] for part in parts], df_text.index)
+    return df_text, store
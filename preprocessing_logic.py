@@ -1,47 +1,135 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
 import re
 import string
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
 import streamlit as st
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+import numpy as np
 import pandas as pd
 
+import dataset_store
+import io_logic
+import kamus_builder
+import stem_cache
+
 
 # --- Resources Loading (Cache) ---
 
+# NLTK dan Sastrawi diimpor di dalam fungsi yang memakainya: `import nltk` sendiri butuh ~1 detik
+# (menarik scipy/sklearn), padahal halaman awal aplikasi tidak memerlukannya.
+
+# Mode offline: tidak pernah mencoba nltk.download (mis. server tanpa akses internet)
+OFFLINE = os.environ.get('SA_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+NLTK_RESOURCES = [
+    ('tokenizers/punkt', 'punkt'),
+    ('corpora/stopwords', 'stopwords'),
+    ('corpora/wordnet', 'wordnet'),
+    ('tokenizers/punkt_tab', 'punkt_tab')
+]
+
+
 @st.cache_resource
 def get_sastrawi_stemmer():
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+
     factory = StemmerFactory()
     return factory.create_stemmer()
 
 
 @st.cache_resource
 def get_nltk_lemmatizer():
+    from nltk.stem import WordNetLemmatizer
+
     return WordNetLemmatizer()
 
 
-def load_nltk_resources():
-    resources = [
-        ('tokenizers/punkt', 'punkt'),
-        ('corpora/stopwords', 'stopwords'),
-        ('corpora/wordnet', 'wordnet'),
-        ('tokenizers/punkt_tab', 'punkt_tab')
-    ]
-    for path, res in resources:
+@st.cache_resource
+def get_stem_cache():
+    """Cache stem/lemma persisten di disk; None jika file cache tidak bisa dibuka."""
+    try:
+        return stem_cache.StemCache()
+    except (OSError, stem_cache.sqlite3.Error):
+        return None
+
+
+@st.cache_resource
+def get_dataset_store():
+    """Penyimpanan dataset bersama untuk semua sesi (dideduplikasi berdasarkan isi file)."""
+    return dataset_store.DatasetStore()
+
+
+@st.cache_resource
+def load_nltk_resources(offline=OFFLINE):
+    """Memastikan data NLTK tersedia, sekali per proses; mengembalikan dict nama -> tersedia.
+
+    Resource yang belum ada diunduh kecuali dalam mode offline.
+    """
+    import nltk
+
+    status = {}
+    for path, res in NLTK_RESOURCES:
         try:
             nltk.data.find(path)
-        except Exception:
+            status[res] = True
+            continue
+        except LookupError:
+            pass
+        if not offline:
             try:
-                nltk.download(res, quiet=True)
-            except:
-                pass # Handle if download fails gracefully
-
-
-def get_stopword_list(language):
+                status[res] = bool(nltk.download(res, quiet=True))
+                continue
+            except Exception:
+                pass  # Handle if download fails gracefully
+        status[res] = False
+    return status
+
+
+def missing_nltk_resources(pipeline_steps, language, offline=OFFLINE):
+    """Resource NLTK yang dibutuhkan konfigurasi pipeline ini tetapi tidak tersedia."""
+    needed = []
+    if pipeline_steps.get('tokenizer', 'nltk') == 'nltk':
+        needed += ['punkt', 'punkt_tab']
+    if language == 'en' and pipeline_steps.get('stopword_removal'):
+        needed.append('stopwords')
+    if language == 'en' and pipeline_steps.get('lemmatization'):
+        needed.append('wordnet')
+    if not needed:
+        return []
+    status = load_nltk_resources(offline)
+    return [res for res in needed if not status.get(res)]
+
+
+# Kata negasi untuk jendela negasi sentiment_logic; dipertahankan dari stopword bila skor sentimen aktif.
+# Daftar Bahasa Indonesia sejak awal tidak membuang negasi baku; bentuk percakapan (ga, gak, nggak,
+# enggak) tetap stopword kecuali skor sentimen aktif.
+# 'nt' adalah sisa "n't" dari tokenizer NLTK; 'dont' dkk. dari tokenizer cepat.
+NEGATION_WORDS = {
+    'id': {'tidak', 'tak', 'jangan', 'bukan', 'belum', 'kurang', 'ga', 'gak', 'nggak', 'enggak'},
+    'en': {
+        'not', 'no', 'nor', 'never', 'nt', 'cannot', 'without', 'dont', 'doesnt', 'didnt', 'isnt', 'wasnt',
+        'arent', 'werent', 'wont', 'cant', 'couldnt', 'shouldnt', 'wouldnt', 'hasnt', 'havent', 'hadnt', 'aint',
+    },
+}
+
+
+def get_stopword_list(language, keep_negations=False):
+    """Daftar stopword; `keep_negations=True` (skor sentimen aktif) tidak membuang NEGATION_WORDS."""
+    stopwords = _base_stopword_list(language)
+    return stopwords - NEGATION_WORDS.get(language, set()) if keep_negations else stopwords
+
+
+def _base_stopword_list(language):
     if language == 'id':
+        from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+
         factory = StopWordRemoverFactory()
         base_stopwords = set(factory.get_stop_words())
         negation_words = {'tidak', 'tak', 'jangan', 'bukan', 'belum', 'kurang'}
@@ -68,21 +156,25 @@ def get_stopword_list(language):
         return base_stopwords.union(custom_stopwords)
     elif language == 'en':
         try:
+            from nltk.corpus import stopwords
+
             return set(stopwords.words('english'))
         except:
             return set()
     return set()
 
 
-@st.cache_data
+@st.cache_resource
+def load_kamus_with_info():
+    """Memuat kamus dari artefak terkompilasi (lazy, sekali per proses) beserta info muatnya.
+
+    Gagal dilaporkan sebagai kamus_builder.KamusError, tidak lagi diam-diam menjadi dict kosong.
+    """
+    return kamus_builder.load_kamus()
+
+
 def load_kamus_kata_baku():
-    try:
-        # Pastikan file ada, jika tidak return dict kosong
-        df_kamus = pd.read_excel('kamuskatabaku.xlsx')
-        kamus_dict = dict(zip(df_kamus['tidak_baku'], df_kamus['kata_baku']))
-        return kamus_dict
-    except:
-        return {}
+    return load_kamus_with_info()[0]
 
 
 # --- Text Processing Functions ---
@@ -92,14 +184,46 @@ def case_fold(text):
 
 
 def tokenize(text):
+    from nltk.tokenize import word_tokenize
+
     return word_tokenize(text)
 
 
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation)
+
+# Karakter yang dipisah NLTK menjadi token sendiri -> spasi; sisa punctuation ASCII -> dihapus
+_FAST_SPLIT_CHARS = '"`;@#$%&?!()[]{}<>,:' + '«»“”‘’„'
+_FAST_TOKEN_TABLE = str.maketrans(
+    {**{c: None for c in string.punctuation}, **{c: ' ' for c in _FAST_SPLIT_CHARS}}
+)
+
+
+def fast_tokenize(text):
+    """Tokenisasi + cleaning satu langkah, pengganti cepat untuk tokenize() + clean_tokens().
+
+    Hasilnya sama dengan jalur NLTK untuk slang Indonesia, emoji, URL, mention, hashtag
+    dan aksara non-Latin, kecuali kasus berikut:
+    - kontraksi Inggris: "don't" -> ['dont'] (NLTK: ['do', 'nt']), "it's" -> ['its'] (NLTK: ['it', 's'])
+    - ',' atau ':' sebelum angka: "jam:5" -> ['jam'] (NLTK membuang token 'jam:5' utuh)
+    - tanda hubung ganda: "a--b" -> ['ab'] (NLTK: ['a', 'b'])
+
+    Korpus pembanding ada di tests/data/tokenizer_corpus.tsv (tests/test_fast_tokenizer.py).
+    """
+    return [token for token in text.translate(_FAST_TOKEN_TABLE).split() if token.isalpha()]
+
+
+def fast_tokenize_series(series):
+    """Versi vektor fast_tokenize untuk satu Series teks (operasi .str pandas)."""
+    return series.str.translate(_FAST_TOKEN_TABLE).str.split().map(
+        lambda tokens: [token for token in tokens if token.isalpha()]
+    )
+
+
 def clean_tokens(tokens):
     cleaned_tokens = []
     for token in tokens:
         # Hapus punctuation
-        token = token.translate(str.maketrans('', '', string.punctuation))
+        token = token.translate(_PUNCT_TABLE)
         # Pastikan alphanumeric dan tidak kosong
         if token.isalpha() and token != '':
             cleaned_tokens.append(token)
@@ -114,70 +238,642 @@ def remove_stopwords(tokens, stopwords_list):
     return [word for word in tokens if word not in stopwords_list]
 
 
-def stem_text(tokens, stemmer):
+def stem_text(tokens, stemmer, cache=None):
     if not tokens: return []
-    text_to_stem = ' '.join(tokens)
-    return stemmer.stem(text_to_stem).split()
+    if cache is not None:
+        # Sastrawi menstem tiap kata secara independen, jadi hasil per token bisa di-cache
+        text_to_stem = ' '.join(cache.lookup('id', tokens, stemmer.stem))
+    else:
+        text_to_stem = stemmer.stem(' '.join(tokens))
+    return text_to_stem.split()
 
 
-def lemmatize_text(tokens, lemmatizer):
+def lemmatize_text(tokens, lemmatizer, cache=None):
+    if cache is not None:
+        return cache.lookup('en', tokens, lemmatizer.lemmatize)
     return [lemmatizer.lemmatize(word) for word in tokens]
 
 
-# --- Main Pipeline ---
+# --- Pipeline Statistics ---
+
+class PipelineStats:
+    """Waktu per tahap dan jumlah token masuk/keluar; cukup murah untuk selalu aktif.
+
+    Bisa digabung (`merge`) dari beberapa chunk/worker, lalu diekspor ke JSON/CSV.
+    """
+
+    STAGES = ('tokenization', 'normalization', 'stopword_removal', 'stemming', 'assembly')
+
+    def __init__(self):
+        self.rows = 0
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.tokens_in = dict.fromkeys(self.STAGES, 0)
+        self.tokens_out = dict.fromkeys(self.STAGES, 0)
+        self.kamus_replacements = 0
+        self.stem_cache_hits = 0
+        self.stem_cache_misses = 0
+        self.cached_stages = 0
+        self.duplicate_rows = 0
+        self.dedupe_seconds_saved = 0.0
+
+    def add(self, stage, seconds, tokens_in=0, tokens_out=0):
+        self.seconds[stage] += seconds
+        self.tokens_in[stage] += tokens_in
+        self.tokens_out[stage] += tokens_out
+
+    def merge(self, other):
+        self.rows += other.rows
+        for stage in self.STAGES:
+            self.add(stage, other.seconds[stage], other.tokens_in[stage], other.tokens_out[stage])
+        self.kamus_replacements += other.kamus_replacements
+        self.stem_cache_hits += other.stem_cache_hits
+        self.stem_cache_misses += other.stem_cache_misses
+        self.cached_stages += other.cached_stages
+        self.duplicate_rows += other.duplicate_rows
+        self.dedupe_seconds_saved += other.dedupe_seconds_saved
+        return self
+
+    def processing_seconds(self):
+        """Total waktu tahap pipeline (tanpa memuat resource/warm-up stemmer dan start worker)."""
+        return sum(self.seconds.values())
+
+    def record_dedupe(self, total_rows, unique_rows, seconds):
+        """Baris duplikat tidak diproses ulang; waktu hemat diperkirakan dari rata-rata per teks unik.
+
+        `seconds` sebaiknya waktu tahap saja (selisih processing_seconds), bukan waktu dinding yang
+        ikut menghitung warm-up. Counter token & kamus sudah diberi bobot jumlah kemunculan tiap teks
+        unik oleh pemanggil, sehingga setara dengan memproses semua baris.
+        """
+        duplicates = total_rows - unique_rows
+        self.rows += duplicates
+        self.duplicate_rows += duplicates
+        if unique_rows:
+            self.dedupe_seconds_saved += seconds / unique_rows * duplicates
+
+    def summary(self):
+        dropped_in = self.tokens_in['stopword_removal']
+        lookups = self.stem_cache_hits + self.stem_cache_misses
+        return {
+            'rows': self.rows,
+            'total_seconds': sum(self.seconds.values()),
+            'stages': [
+                {
+                    'stage': stage,
+                    'seconds': self.seconds[stage],
+                    'tokens_in': self.tokens_in[stage],
+                    'tokens_out': self.tokens_out[stage],
+                }
+                for stage in self.STAGES
+            ],
+            'stopword_drop_rate': 1 - self.tokens_out['stopword_removal'] / dropped_in if dropped_in else 0.0,
+            'kamus_replacements': self.kamus_replacements,
+            'stem_cache_hits': self.stem_cache_hits,
+            'stem_cache_misses': self.stem_cache_misses,
+            'stem_cache_hit_rate': self.stem_cache_hits / lookups if lookups else 0.0,
+            'cached_stages': self.cached_stages,
+            'duplicate_rows': self.duplicate_rows,
+            'duplicate_ratio': self.duplicate_rows / self.rows if self.rows else 0.0,
+            'dedupe_seconds_saved': self.dedupe_seconds_saved,
+        }
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    def to_csv(self):
+        """Format panjang `metric,value` agar mudah dimasukkan ke sistem monitoring."""
+        summary = self.summary()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['metric', 'value'])
+        for row in summary.pop('stages'):
+            for key in ('seconds', 'tokens_in', 'tokens_out'):
+                writer.writerow([f"stage.{row['stage']}.{key}", row[key]])
+        for key, value in summary.items():
+            writer.writerow([key, value])
+        return buffer.getvalue()
 
-def preprocess_pipeline(text, pipeline_steps, language):
-    if not isinstance(text, str):
-        return "", [], [], [], ""
 
-    processed_text = text
+# --- Main Pipeline ---
+
+OUTPUT_COLUMNS = ['Teks_Clean', 'Tokens_Awal', 'Tokens_Filtered', 'Tokens_Stemmed', 'Teks_Final_Joined']
+TEXT_COLUMNS = ['Teks_Clean', 'Teks_Final_Joined']
+TOKEN_COLUMNS = ['Tokens_Awal', 'Tokens_Filtered', 'Tokens_Stemmed']
 
-    # Load resources on the fly based on need (cached)
-    stemmer = get_sastrawi_stemmer() if (language == 'id' and pipeline_steps.get('stemming')) else None
-    lemmatizer = get_nltk_lemmatizer() if (language == 'en' and pipeline_steps.get('lemmatization')) else None
-    stopwords_list = get_stopword_list(language) if pipeline_steps.get('stopword_removal') else set()
-    kamus_dict = load_kamus_kata_baku() if pipeline_steps.get('normalization') else {}
 
+def extract_tokens(text, pipeline_steps):
+    """Langkah 1-2 pipeline: case folding, tokenisasi dan pembersihan simbol."""
     # 1. Case Folding
     if pipeline_steps.get('case_folding'):
-        processed_text = case_fold(processed_text)
+        text = case_fold(text)
 
     # 2. Tokenization & Cleaning
-    if pipeline_steps.get('tokenization'):
-        tokens = tokenize(processed_text)
+    if pipeline_steps.get('tokenization') and pipeline_steps.get('tokenizer') == 'fast':
+        tokens = fast_tokenize(text)
+    elif pipeline_steps.get('tokenization'):
+        tokens = tokenize(text)
         tokens = clean_tokens(tokens)
     else:
         # Basic split if no tokenization selected (rare case)
-        tokens = processed_text.split()
+        tokens = text.split()
+    return tokens
+
+
+def extract_tokens_series(texts, pipeline_steps):
+    """extract_tokens untuk seluruh Series; tokenizer 'fast' dijalankan dengan operasi .str."""
+    if pipeline_steps.get('tokenization') and pipeline_steps.get('tokenizer') == 'fast':
+        if pipeline_steps.get('case_folding'):
+            texts = texts.str.lower()
+        return fast_tokenize_series(texts).tolist()
+    return [extract_tokens(text, pipeline_steps) for text in texts]
+
+
+def load_pipeline_resources(pipeline_steps, language):
+    """Memuat stemmer, lemmatizer, stopword dan kamus sesuai langkah yang aktif."""
+    return {
+        'stemmer': get_sastrawi_stemmer() if (language == 'id' and pipeline_steps.get('stemming')) else None,
+        'lemmatizer': get_nltk_lemmatizer() if (language == 'en' and pipeline_steps.get('lemmatization')) else None,
+        'stopwords': (
+            get_stopword_list(language, keep_negations=bool(pipeline_steps.get('sentiment')))
+            if pipeline_steps.get('stopword_removal') else set()
+        ),
+        'kamus': load_kamus_kata_baku() if pipeline_steps.get('normalization') else {},
+        'stem_cache': get_stem_cache() if (pipeline_steps.get('stemming') or pipeline_steps.get('lemmatization')) else None,
+    }
+
+
+def preprocess_pipeline(text, pipeline_steps, language, resources=None, stats=None, weight=1):
+    """Memproses satu teks; `weight` = jumlah baris yang diwakili teks ini (counter `stats` dikali bobotnya)."""
+    if not isinstance(text, str):
+        return "", [], [], [], ""
+
+    # Load resources on the fly based on need (cached), kecuali sudah disiapkan oleh pemanggil batch
+    if resources is None:
+        resources = load_pipeline_resources(pipeline_steps, language)
+    stemmer = resources['stemmer']
+    lemmatizer = resources['lemmatizer']
+    stopwords_list = resources['stopwords']
+    kamus_dict = resources['kamus']
+    cache = resources['stem_cache']
+    clock = time.perf_counter
+    t0 = clock()
+
+    # 1-2. Case Folding, Tokenization & Cleaning
+    tokens = extract_tokens(text, pipeline_steps)
 
     teks_clean = ' '.join(tokens)
     tokens_awal = tokens[:]
+    t1 = clock()
 
     # 3. Normalization
     if pipeline_steps.get('normalization'):
         tokens = normalize_kata_baku(tokens, kamus_dict)
+    t2 = clock()
 
     # 4. Stopword Removal
     if pipeline_steps.get('stopword_removal'):
         tokens = remove_stopwords(tokens, stopwords_list)
     
     tokens_filtered = tokens[:]
+    t3 = clock()
 
     # 5. Stemming / Lemmatization
     if language == 'id' and pipeline_steps.get('stemming'):
-        tokens = stem_text(tokens, stemmer)
+        tokens = stem_text(tokens, stemmer, cache)
     elif language == 'en' and pipeline_steps.get('lemmatization'):
-        tokens = lemmatize_text(tokens, lemmatizer)
+        tokens = lemmatize_text(tokens, lemmatizer, cache)
 
     tokens_stemmed = tokens
     teks_final_joined = ' '.join(tokens_stemmed)
 
+    if stats is not None:
+        n_awal, n_filtered = len(tokens_awal) * weight, len(tokens_filtered) * weight
+        stats.rows += 1
+        stats.add('tokenization', t1 - t0, 0, n_awal)
+        stats.add('normalization', t2 - t1, n_awal, n_awal)
+        stats.add('stopword_removal', t3 - t2, n_awal, n_filtered)
+        stats.add('stemming', clock() - t3, n_filtered, len(tokens_stemmed) * weight)
+        if pipeline_steps.get('normalization'):
+            replaced = sum(1 for token in tokens_awal if kamus_dict.get(token, token) != token)
+            stats.kamus_replacements += replaced * weight
+
     return (teks_clean, tokens_awal, tokens_filtered, tokens_stemmed, teks_final_joined)
 
 
-# --- Utility Functions ---
+# --- Vocabulary-First Stages & Stage Cache ---
+
+STAGES = ('tokens', 'normalization', 'stopword_removal', 'stemming')
+
 
-@st.cache_data
-def convert_df_to_csv(df):
-    """Mengubah DataFrame menjadi format CSV binary untuk download."""
-    return df.to_csv(index=False).encode('utf-8')
+def stage_signature(pipeline_steps, language):
+    """Konfigurasi tiap tahap secara berurutan; prefix yang sama berarti hasil tahap itu bisa dipakai ulang."""
+    if language == 'id':
+        stem_step = ('stemming', bool(pipeline_steps.get('stemming')))
+    else:
+        stem_step = ('lemmatization', bool(pipeline_steps.get('lemmatization')))
+    return (
+        ('tokens', bool(pipeline_steps.get('case_folding')), bool(pipeline_steps.get('tokenization')),
+         pipeline_steps.get('tokenizer', 'nltk')),
+        ('normalization', bool(pipeline_steps.get('normalization'))),
+        # Dengan skor sentimen, kata negasi tidak dibuang: hasil tahap ini berbeda
+        ('stopword_removal', bool(pipeline_steps.get('stopword_removal')),
+         bool(pipeline_steps.get('stopword_removal') and pipeline_steps.get('sentiment'))),
+        stem_step,
+    )
+
+
+def dataset_fingerprint(data):
+    """Fingerprint isi Series/DataFrame dari hash per baris yang dihitung secara vektor.
+
+    Dihitung sekali saat dataset dibuka lalu disimpan bersamanya; fungsi ber-cache memakai
+    fingerprint ini sebagai kunci sehingga rerun Streamlit tidak perlu meng-hash data lagi.
+    """
+    row_hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    return f"{len(data)}-{hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()}"
+
+
+def derive_fingerprint(*parts):
+    """Fingerprint turunan (mis. dataset + kolom + konfigurasi pipeline) tanpa menyentuh datanya."""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def estimate_rows_bytes(rows, sample_size=1000):
+    """Perkiraan memori list-of-list token (list + pointer + string), diekstrapolasi dari sampel."""
+    if not rows:
+        return 0
+    step = max(1, len(rows) // sample_size)
+    sample = rows[::step]
+    sample_bytes = sum(sys.getsizeof(r) + sum(sys.getsizeof(w) for w in r) for r in sample)
+    return int(sample_bytes * len(rows) / len(sample))
+
+
+class StageCache:
+    """Cache LRU untuk hasil antara tiap tahap pipeline dengan batas memori total.
+
+    Kunci: (fingerprint dataset, kolom teks, bahasa) + prefix stage_signature. Satu cache
+    dipakai bersama oleh semua dataset dalam satu sesi; aman dipakai bersamaan oleh thread
+    job latar belakang dan rerun sesi.
+    """
+
+    def __init__(self, max_bytes=int(os.environ.get('SA_STAGE_CACHE_MB', 512)) * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, rows, nbytes=None):
+        with self._lock:
+            self._put(key, rows, nbytes)
+
+    def _put(self, key, rows, nbytes):
+        if key in self._entries:
+            self.used_bytes -= self._entries.pop(key)[1]
+        # Tahap yang dimatikan mengembalikan list yang sama dengan tahap sebelumnya: tidak dihitung dua kali
+        if nbytes is None:
+            shared = any(value is rows for value, _ in self._entries.values())
+            nbytes = 0 if shared else estimate_rows_bytes(rows)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (rows, nbytes)
+        self.used_bytes += nbytes
+        while self.used_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.used_bytes -= evicted_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def _map_rows(rows, table):
+    return [[word for token in tokens for word in table[token]] for tokens in rows]
+
+
+def _token_total(rows, weights=None):
+    """Jumlah token semua baris; dengan `weights` tiap baris dihitung sebanyak kemunculannya."""
+    if weights is None:
+        return sum(map(len, rows))
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    return int(np.dot(lengths, weights))
+
+
+def _run_stage(stage, rows, texts, pipeline_steps, language, resources, stats, weights=None):
+    """Menjalankan satu tahap kolumnar; tiap transformasi dihitung sekali per jenis token."""
+    if stage == 'tokens':
+        return extract_tokens_series(texts, pipeline_steps)
+
+    if stage == 'normalization':
+        if not pipeline_steps.get('normalization'):
+            return rows
+        vocabulary = Counter()
+        for tokens in rows:
+            vocabulary.update(tokens)
+        table = {token: normalize_kata_baku([token], resources['kamus']) for token in vocabulary}
+        if stats is not None:
+            replaced = {token for token in vocabulary if table[token] != [token]}
+            if weights is None:
+                stats.kamus_replacements += sum(vocabulary[token] for token in replaced)
+            elif replaced:
+                stats.kamus_replacements += _token_total(
+                    [[token for token in tokens if token in replaced] for tokens in rows], weights
+                )
+        return _map_rows(rows, table)
+
+    if stage == 'stopword_removal':
+        if not pipeline_steps.get('stopword_removal'):
+            return rows
+        return [remove_stopwords(tokens, resources['stopwords']) for tokens in rows]
+
+    if language == 'id' and pipeline_steps.get('stemming'):
+        compute = resources['stemmer'].stem
+    elif language == 'en' and pipeline_steps.get('lemmatization'):
+        compute = resources['lemmatizer'].lemmatize
+    else:
+        return rows
+    unique_words = list({word for tokens in rows for word in tokens})
+    cache = resources['stem_cache']
+    if cache is not None:
+        # Satu query dan satu penulisan batch ke disk untuk seluruh kosakata
+        forms = cache.lookup(language, unique_words, compute)
+    else:
+        forms = [compute(word) for word in unique_words]
+    if language == 'id':
+        # Sama dengan stem_text: hasil Sastrawi digabung lalu dipecah ulang
+        table = {word: form.split() for word, form in zip(unique_words, forms)}
+    else:
+        table = {word: [form] for word, form in zip(unique_words, forms)}
+    return _map_rows(rows, table)
+
+
+def _preprocess_vocab_first(texts, pipeline_steps, language, resources, stats=None, stage_cache=None, cache_key=None,
+                            weights=None):
+    signature = stage_signature(pipeline_steps, language)
+    keys = [None] * len(STAGES)
+    if stage_cache is not None and cache_key is not None:
+        keys = [tuple(cache_key) + signature[:i + 1] for i in range(len(STAGES))]
+
+    outputs = []
+    for i, stage in enumerate(STAGES):
+        # Hasil tahap hanya bergantung pada prefix konfigurasinya, jadi hit di tahap mana pun valid
+        cached = stage_cache.get(keys[i]) if keys[i] is not None else None
+        if cached is not None:
+            outputs.append(cached)
+            if stats is not None:
+                stats.cached_stages += 1
+            continue
+
+        previous = outputs[-1] if outputs else None
+        t0 = time.perf_counter()
+        rows = _run_stage(stage, previous, texts, pipeline_steps, language, resources, stats, weights)
+        if stats is not None:
+            stats_stage = 'tokenization' if stage == 'tokens' else stage
+            n_in = 0 if previous is None else _token_total(previous, weights)
+            stats.add(stats_stage, time.perf_counter() - t0, n_in, _token_total(rows, weights))
+        if keys[i] is not None:
+            stage_cache.put(keys[i], rows)
+        outputs.append(rows)
+
+    t1 = time.perf_counter()
+    tokens_awal, _, tokens_filtered, tokens_stemmed = outputs
+    results = [
+        (' '.join(awal), awal, filtered, stemmed, ' '.join(stemmed))
+        for awal, filtered, stemmed in zip(tokens_awal, tokens_filtered, tokens_stemmed)
+    ]
+    if stats is not None:
+        stats.rows += len(results)
+        stats.add('assembly', time.perf_counter() - t1)
+    return results
+
+
+def seed_stage_cache(stage_cache, cache_key, pipeline_steps, language, df_res):
+    """Mengisi StageCache dari hasil run yang tidak lewat cache (mis. run paralel)."""
+    signature = stage_signature(pipeline_steps, language)
+    tokens_awal = df_res['Tokens_Awal'].tolist()
+    stage_cache.put(tuple(cache_key) + signature[:1], tokens_awal)
+    if not pipeline_steps.get('normalization'):
+        # Hasil normalisasi tidak ada di output kecuali tahapnya mati (sama dengan Tokens_Awal)
+        stage_cache.put(tuple(cache_key) + signature[:2], tokens_awal)
+    stage_cache.put(tuple(cache_key) + signature[:3], df_res['Tokens_Filtered'].tolist())
+    stage_cache.put(tuple(cache_key) + signature[:4], df_res['Tokens_Stemmed'].tolist())
+
+
+def seed_stage_cache_from_store(stage_cache, cache_key, pipeline_steps, language, store):
+    """Seperti seed_stage_cache, dari TokenStore; kolom dimaterialisasi hanya jika muat di cache."""
+    signature = stage_signature(pipeline_steps, language)
+    prefixes = [(1, 'Tokens_Awal'), (3, 'Tokens_Filtered'), (4, 'Tokens_Stemmed')]
+    if not pipeline_steps.get('normalization'):
+        prefixes.insert(1, (2, 'Tokens_Awal'))
+    materialized = {}
+    for length, name in prefixes:
+        column = store.column(name)
+        # Perkiraan ukuran list Python: objek list per baris + pointer per token
+        estimate = len(column) * sys.getsizeof([]) + 8 * len(column.ids)
+        if estimate > stage_cache.max_bytes:
+            continue
+        if name not in materialized:
+            materialized[name] = column.rows()
+        stage_cache.put(tuple(cache_key) + signature[:length], materialized[name])
+
+
+def dedupe_texts(series):
+    """Teks unik (urutan kemunculan pertama), kode posisi unik per baris, dan jumlah kemunculan tiap teks unik.
+
+    NaN dianggap satu teks tersendiri agar hasilnya sama dengan memproses tiap baris.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    return pd.Series(np.asarray(uniques, dtype=object), dtype=object), codes, counts
+
+
+def dedupe_cache_key(cache_key):
+    """Kunci StageCache untuk hasil per teks unik (berbeda susunan barisnya dengan hasil per baris)."""
+    return None if cache_key is None else tuple(cache_key) + ('dedupe',)
+
+
+def preprocess_series(series, pipeline_steps, language, vocab_first=False, resources=None, stats=None,
+                      stage_cache=None, cache_key=None, aggregates=None, dedupe=False, weights=None):
+    """Memproses satu kolom teks sekaligus; resource dimuat sekali per batch.
+
+    Dengan `vocab_first=True`, normalisasi, stopword removal dan stemming/lemmatization
+    dijalankan sekali per token unik lalu dipetakan kembali ke tiap baris. Hasilnya identik
+    dengan mode per-baris (Sastrawi menstem tiap kata secara independen), tetapi jauh lebih
+    cepat untuk korpus besar dengan kosakata yang berulang.
+
+    `resources` bisa diberikan oleh pemanggil (mis. worker paralel) agar tidak dimuat ulang.
+    Jika `stats` (PipelineStats) diberikan, waktu dan counter tiap tahap ditambahkan ke sana.
+    Dengan `stage_cache` (StageCache) dan `cache_key` (mis. (fingerprint, kolom, bahasa)), hasil
+    tiap tahap disimpan dan run berikutnya hanya mengulang tahap sejak langkah pertama yang berubah;
+    ini selalu memakai jalur vocab-first.
+    `aggregates` (aggregate_logic.CorpusAggregates) menerima frekuensi kata mentah dan akhir
+    sebagai hasil samping, sehingga visualisasi tidak perlu memindai ulang data; `weights` adalah
+    jumlah kemunculan tiap baris bila `series` sudah dideduplikasi (juga dipakai counter `stats`).
+    Dengan `dedupe=True`, teks yang identik diproses sekali lalu hasilnya disebar ke semua barisnya.
+    Mengembalikan DataFrame dengan kolom OUTPUT_COLUMNS dan index yang sama dengan `series`.
+    """
+    if dedupe:
+        uniques, codes, counts = dedupe_texts(series)
+        busy_before = stats.processing_seconds() if stats is not None else 0.0
+        df_unique = preprocess_series(
+            uniques, pipeline_steps, language, vocab_first, resources, stats, stage_cache,
+            dedupe_cache_key(cache_key), aggregates, weights=counts
+        )
+        if stats is not None:
+            stats.record_dedupe(len(series), len(uniques), stats.processing_seconds() - busy_before)
+        return df_unique.iloc[codes].set_axis(series.index)
+
+    if resources is None:
+        resources = load_pipeline_resources(pipeline_steps, language)
+    cache = resources['stem_cache']
+    if cache is not None:
+        hits_before, misses_before = cache.thread_counts()
+
+    texts = series.astype(str)
+    if vocab_first or stage_cache is not None:
+        results = _preprocess_vocab_first(
+            texts, pipeline_steps, language, resources, stats, stage_cache, cache_key, weights
+        )
+    elif weights is None:
+        results = [preprocess_pipeline(text, pipeline_steps, language, resources, stats) for text in texts]
+    else:
+        results = [
+            preprocess_pipeline(text, pipeline_steps, language, resources, stats, int(weight))
+            for text, weight in zip(texts, weights)
+        ]
+
+    if stats is not None and cache is not None:
+        hits, misses = cache.thread_counts()
+        stats.stem_cache_hits += hits - hits_before
+        stats.stem_cache_misses += misses - misses_before
+    if aggregates is not None:
+        aggregates.update(series, [result[3] for result in results], weights)
+    return pd.DataFrame(results, index=series.index, columns=OUTPUT_COLUMNS)
+
+
+# --- Batch CLI ---
+
+DEFAULT_PIPELINE_STEPS = {
+    'case_folding': True,
+    'tokenization': True,
+    'tokenizer': 'nltk',
+    'stopword_removal': True,
+    'normalization': False,
+    'stemming': True,
+    'lemmatization': True,
+}
+
+
+def run_batch(input_path, column, language, output_path, pipeline_steps, chunk_size=10_000, on_chunk=None,
+              stats=None, features=None, lexicon_path=None):
+    """Memproses file CSV/XLSX per chunk dan menulis hasilnya bertahap; mengembalikan jumlah baris.
+
+    Hanya satu chunk input dan satu chunk output yang ada di memori pada satu waktu.
+    `features` (feature_logic.StreamingExtractor) menerima kolom Tokens_Stemmed tiap chunk.
+    Jika `pipeline_steps['sentiment']` aktif, kolom Skor_Sentimen dan Label_Sentimen ikut ditulis.
+    """
+    resources = load_pipeline_resources(pipeline_steps, language)
+    lexicon = None
+    if pipeline_steps.get('sentiment'):
+        import sentiment_logic
+        import token_store
+
+        lexicon = sentiment_logic.lexicon_for(pipeline_steps, language, lexicon_path)
+    with io_logic.ChunkWriter(output_path, list_columns=TOKEN_COLUMNS) as writer:
+        for chunk in io_logic.iter_table_chunks(input_path, chunk_size):
+            if column not in chunk.columns:
+                raise KeyError(f"Kolom '{column}' tidak ada di {input_path}")
+            df_res = preprocess_series(
+                chunk[column], pipeline_steps, language, vocab_first=True, resources=resources, stats=stats,
+                dedupe=True
+            )
+            df_out = chunk.join(df_res)
+            df_out['Jumlah_Tokens_Akhir'] = df_res['Tokens_Stemmed'].apply(len)
+            if lexicon is not None:
+                store = token_store.TokenStore.from_frame(df_res, ['Tokens_Stemmed'])
+                sentiment_logic.add_sentiment_columns(df_out, store.column('Tokens_Stemmed'), lexicon)
+            writer.write(df_out)
+            if features is not None:
+                features.add(df_res['Tokens_Stemmed'].tolist())
+            if on_chunk is not None:
+                on_chunk(writer.rows)
+        return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m preprocessing_logic',
+        description="Jalankan pipeline preprocessing tanpa Streamlit."
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help="Proses file CSV/XLSX secara streaming per chunk")
+    run.add_argument('input', help="File input .csv atau .xlsx")
+    run.add_argument('--column', required=True, help="Nama kolom teks")
+    run.add_argument('--lang', choices=['id', 'en'], default='id')
+    run.add_argument('--out', required=True, help="File output .csv, .parquet atau .jsonl")
+    run.add_argument('--chunk-size', type=int, default=10_000)
+    run.add_argument('--fast-tokenizer', action='store_true', help="Pakai tokenizer regex cepat, bukan NLTK")
+    run.add_argument('--normalization', action='store_true', help="Aktifkan normalisasi kata baku (kamus)")
+    run.add_argument('--no-stopwords', action='store_true', help="Matikan stopword removal")
+    run.add_argument('--no-stemming', action='store_true', help="Matikan stemming/lemmatization")
+    run.add_argument('--stats-out', help="Simpan statistik per tahap ke file .json atau .csv")
+    run.add_argument('--features-out', help="Folder fitur sparse dari Tokens_Stemmed (.npz per chunk)")
+    run.add_argument('--features-mode', choices=['hash', 'tfidf'], default='hash')
+    run.add_argument('--features-ngram', nargs=2, type=int, default=[1, 1], metavar=('MIN', 'MAX'))
+    run.add_argument('--sentiment', action='store_true', help="Tambahkan kolom Skor_Sentimen dan Label_Sentimen")
+    run.add_argument('--lexicon', help="Leksikon sentimen sendiri (.tsv/.csv/.xlsx dengan kolom kata, bobot)")
+    run.add_argument('--offline', action='store_true', help="Jangan mencoba mengunduh data NLTK (sama dengan SA_OFFLINE=1)")
+    args = parser.parse_args(argv)
+
+    pipeline_steps = dict(DEFAULT_PIPELINE_STEPS)
+    pipeline_steps['tokenizer'] = 'fast' if args.fast_tokenizer else 'nltk'
+    pipeline_steps['normalization'] = args.normalization
+    pipeline_steps['stopword_removal'] = not args.no_stopwords
+    pipeline_steps['stemming'] = pipeline_steps['lemmatization'] = not args.no_stemming
+    pipeline_steps['sentiment'] = args.sentiment or bool(args.lexicon)
+
+    missing = missing_nltk_resources(pipeline_steps, args.lang, offline=args.offline or OFFLINE)
+    if missing:
+        print(f"Peringatan: data NLTK tidak tersedia: {', '.join(missing)}", file=sys.stderr)
+    start = time.perf_counter()
+
+    def report(rows):
+        elapsed = time.perf_counter() - start
+        print(f"{rows:,} baris ({rows / elapsed:,.0f} baris/detik)", file=sys.stderr)
+
+    features = None
+    if args.features_out:
+        import feature_logic
+
+        features = feature_logic.StreamingExtractor(
+            args.features_out, args.features_mode, tuple(args.features_ngram)
+        )
+
+    stats = PipelineStats()
+    total = run_batch(
+        args.input, args.column, args.lang, args.out, pipeline_steps, args.chunk_size, on_chunk=report, stats=stats,
+        features=features, lexicon_path=args.lexicon
+    )
+    if features is not None:
+        meta = features.close()
+        print(
+            f"Fitur {meta['mode']}: {meta['rows']:,} x {meta['n_features']:,}, nnz {meta['nnz']:,} -> {args.features_out}",
+            file=sys.stderr
+        )
+    print(f"Selesai: {total:,} baris ditulis ke {args.out} dalam {time.perf_counter() - start:.1f} detik", file=sys.stderr)
+    if args.stats_out:
+        with open(args.stats_out, 'w', encoding='utf-8', newline='') as f:
+            f.write(stats.to_csv() if args.stats_out.lower().endswith('.csv') else stats.to_json())
+
+
+if __name__ == '__main__':
+    main()
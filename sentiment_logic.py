@@ -0,0 +1,225 @@
+"""Skor sentimen berbasis leksikon polaritas, dihitung secara vektor dari kolom token hasil pipeline.
+
+Leksikon (`kata<TAB>bobot`, bobot -5..5 seperti InSet/AFINN) dilewatkan ke tahap stemming /
+lemmatization yang sama dengan pipeline sehingga cocok dengan isi `Tokens_Stemmed`. Kata negasi
+(preprocessing_logic.NEGATION_WORDS) membalik polaritas kata leksikon pertama dalam `window` token
+sesudahnya di baris yang sama, mis. "tidak bagus" -> -bagus.
+
+Per chunk, kolom token (array ID + offset dari token_store) langsung menjadi matriks CSR
+baris x kosakata berisi tanda +1/-1 (negasi), lalu skor = matriks @ bobot kosakata. Tidak ada
+loop Python per baris; loop Python hanya sekali per kata unik kosakata.
+
+Leksikon bawaan (`leksikon_sentimen_id.tsv`, `leksikon_sentimen_en.tsv`) kecil dan umum; ganti
+dengan leksikon sendiri lewat SA_LEXICON_ID / SA_LEXICON_EN atau `--lexicon` di CLI batch.
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import feature_logic as fl
+import preprocessing_logic as pl
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEXICON_PATHS = {
+    'id': os.environ.get('SA_LEXICON_ID', os.path.join(BASE_DIR, 'leksikon_sentimen_id.tsv')),
+    'en': os.environ.get('SA_LEXICON_EN', os.path.join(BASE_DIR, 'leksikon_sentimen_en.tsv')),
+}
+DEFAULT_NEGATION_WINDOW = 3
+
+SCORE_COLUMN = 'Skor_Sentimen'
+LABEL_COLUMN = 'Label_Sentimen'
+LABELS = ['negatif', 'netral', 'positif']
+# Skor di luar ±SCORE_CLIP digabung ke bin tepi histogram SentimentSummary
+SCORE_CLIP = 10
+
+
+class LexiconError(Exception):
+    """Leksikon sentimen tidak bisa dibaca."""
+
+
+# --- Leksikon ---
+
+def read_lexicon(path):
+    """Membaca file leksikon (.tsv/.csv/.xlsx dengan kolom kata, bobot) menjadi dict kata -> bobot."""
+    try:
+        if path.lower().endswith('.xlsx'):
+            df = pd.read_excel(path)
+        else:
+            df = pd.read_csv(path, sep='\t' if path.lower().endswith(('.tsv', '.txt')) else ',')
+    except (OSError, ValueError) as e:
+        raise LexiconError(f"Leksikon tidak bisa dibaca: {path} ({e})") from e
+    missing = {'kata', 'bobot'} - set(df.columns)
+    if missing:
+        raise LexiconError(f"Kolom {sorted(missing)} tidak ada di {path}")
+    df = df.assign(bobot=pd.to_numeric(df['bobot'], errors='coerce')).dropna(subset=['kata', 'bobot'])
+    words = df['kata'].astype(str).str.strip().str.lower()
+    # Frasa multi-kata tidak bisa dicocokkan per token; dilewati
+    single = words.str.len().gt(0) & ~words.str.contains(r'\s', regex=True)
+    return dict(zip(words[single], df['bobot'][single].astype(float)))
+
+
+class Lexicon:
+    """Bobot polaritas per kata (sudah di-stem/lemma) plus kata negasi untuk satu bahasa."""
+
+    def __init__(self, weights, negations, window=DEFAULT_NEGATION_WINDOW, signature=None):
+        self.weights = weights
+        self.negations = set(negations)
+        self.window = window
+        self.signature = signature
+
+    @classmethod
+    def from_entries(cls, entries, pipeline_steps, language, window=DEFAULT_NEGATION_WINDOW, signature=None):
+        """Kata leksikon di-stem/lemma seperti pipeline; kata yang menyatu ke bentuk dasar sama dirata-rata."""
+        words = list(entries)
+        resources = pl.load_pipeline_resources(
+            {k: pipeline_steps.get(k) for k in ('stemming', 'lemmatization')}, language
+        )
+        if resources['stemmer'] is not None:
+            stemmer, cache = resources['stemmer'], resources['stem_cache']
+            roots = cache.lookup('id', words, stemmer.stem) if cache is not None else [stemmer.stem(w) for w in words]
+        elif resources['lemmatizer'] is not None:
+            roots = pl.lemmatize_text(words, resources['lemmatizer'], resources['stem_cache'])
+        else:
+            roots = words
+
+        grouped = pd.Series([entries[w] for w in words], dtype=float).groupby(pd.Series(roots)).mean()
+        negations = pl.NEGATION_WORDS.get(language, set())
+        weights = {root: weight for root, weight in grouped.items() if root and root not in negations}
+        return cls(weights, negations, window, signature)
+
+    def vocab_arrays(self, vocab):
+        """(bobot float64, penanda negasi bool) sejajar dengan kosakata TokenStore; sekali per kata unik."""
+        weights = np.fromiter((self.weights.get(t, 0.0) for t in vocab), dtype=np.float64, count=len(vocab))
+        negations = np.fromiter((t in self.negations for t in vocab), dtype=bool, count=len(vocab))
+        return weights, negations
+
+
+def is_stemmed(pipeline_steps, language):
+    if language == 'id':
+        return bool(pipeline_steps.get('stemming'))
+    return bool(pipeline_steps.get('lemmatization'))
+
+
+@st.cache_resource(show_spinner=False)
+def get_lexicon(language, stemmed, path=None, window=DEFAULT_NEGATION_WINDOW):
+    """Leksikon siap pakai, sekali per proses untuk setiap (bahasa, stemming, file, window)."""
+    path = path or LEXICON_PATHS[language]
+    try:
+        with open(path, 'rb') as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError as e:
+        raise LexiconError(f"Leksikon tidak bisa dibaca: {path} ({e})") from e
+    steps = {'stemming': stemmed, 'lemmatization': stemmed}
+    signature = ('sentiment', os.path.basename(path), content_hash, stemmed, window)
+    return Lexicon.from_entries(read_lexicon(path), steps, language, window, signature)
+
+
+def lexicon_for(pipeline_steps, language, path=None):
+    return get_lexicon(language, is_stemmed(pipeline_steps, language), path)
+
+
+# --- Scoring ---
+
+def _previous(mask):
+    """Posisi token bertanda `mask` terakhir sebelum tiap token (-1 jika tidak ada)."""
+    last = np.where(mask, np.arange(len(mask), dtype=np.int64), -1)
+    np.maximum.accumulate(last, out=last)
+    previous = np.empty_like(last)
+    previous[:1] = -1
+    previous[1:] = last[:-1]
+    return previous
+
+
+def _negation_signs(ids, offsets, weights, negations, window):
+    """+1/-1 per token: -1 untuk kata leksikon pertama maksimal `window` token sesudah kata negasi.
+
+    Hanya kata berbobot pertama yang dibalik, sehingga "tidak bagus kecewa" tetap negatif
+    (-bagus, kecewa) dan bukan -bagus, -kecewa. Negasi tidak melewati batas baris.
+    """
+    polar = weights[ids] != 0
+    previous_negation = _previous(negations[ids])
+    previous_polar = _previous(polar)
+    positions = np.arange(len(ids), dtype=np.int64)
+    row_starts = np.repeat(offsets[:-1], np.diff(offsets))
+    negated = (
+        polar
+        & (previous_negation >= row_starts)
+        & (positions - previous_negation <= window)
+        & (previous_polar < previous_negation)
+    )
+    return np.where(negated, -1.0, 1.0)
+
+
+def score_chunk(ids, offsets, weights, negations, window):
+    """Skor per baris satu chunk: CSR (tanda negasi, ID token, offset) @ bobot kosakata."""
+    from scipy import sparse
+
+    n_rows = len(offsets) - 1
+    if not len(ids):
+        return np.zeros(n_rows)
+    signs = _negation_signs(ids, offsets, weights, negations, window)
+    # Struktur CSR sama dengan kolom token: indices = ID, indptr = offset; duplikat ikut dijumlah
+    matrix = sparse.csr_matrix((signs, ids, offsets), shape=(n_rows, len(weights)))
+    return matrix @ weights
+
+
+def score_column(column, lexicon, chunk_size=fl.DEFAULT_CHUNK_SIZE):
+    """Skor sentimen (float32) untuk setiap baris TokenColumn, dihitung per chunk."""
+    weights, negations = lexicon.vocab_arrays(column.store.tokens)
+    scores = np.empty(len(column), dtype=np.float32)
+    start = 0
+    for _, ids, offsets in fl.iter_column_chunks(column, chunk_size):
+        n_rows = len(offsets) - 1
+        scores[start:start + n_rows] = score_chunk(ids, offsets, weights, negations, lexicon.window)
+        start += n_rows
+    return scores
+
+
+def label_scores(scores, threshold=0.0):
+    """Label kategorikal: positif jika skor > threshold, negatif jika < -threshold, selain itu netral."""
+    codes = np.where(scores > threshold, 2, np.where(scores < -threshold, 0, 1)).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=LABELS)
+
+
+def add_sentiment_columns(df, column, lexicon):
+    """Menambahkan Skor_Sentimen dan Label_Sentimen ke `df` (baris sejajar dengan `column`)."""
+    scores = score_column(column, lexicon)
+    df[SCORE_COLUMN] = scores
+    df[LABEL_COLUMN] = label_scores(scores)
+    return df
+
+
+class SentimentSummary:
+    """Jumlah baris per label dan histogram skor (bin 1 poin, dipotong ke ±SCORE_CLIP), diakumulasi per chunk.
+
+    Cukup untuk grafik distribusi tanpa menyimpan kolom skor (mis. hasil yang di-spill ke disk).
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(len(LABELS), dtype=np.int64)
+        self.histogram = np.zeros(2 * SCORE_CLIP + 1, dtype=np.int64)
+        self.score_sum = 0.0
+
+    def update(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        self.counts += np.bincount(label_scores(scores).codes, minlength=len(LABELS))
+        bins = np.rint(np.clip(scores, -SCORE_CLIP, SCORE_CLIP)).astype(np.int64) + SCORE_CLIP
+        self.histogram += np.bincount(bins, minlength=len(self.histogram))
+        self.score_sum += float(scores.sum())
+        return self
+
+    @property
+    def rows(self):
+        return int(self.counts.sum())
+
+    def mean_score(self):
+        return self.score_sum / self.rows if self.rows else 0.0
+
+    def label_counts(self):
+        return pd.Series(self.counts, index=LABELS)
+
+    def histogram_frame(self):
+        return pd.DataFrame({'Skor': np.arange(-SCORE_CLIP, SCORE_CLIP + 1), 'Jumlah': self.histogram})
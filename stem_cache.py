@@ -0,0 +1,307 @@
+"""Cache persisten hasil stemming (Sastrawi) dan lemmatization (NLTK) berbasis SQLite.
+
+Cache dibagi antar restart container dan antar proses worker pada satu host: SQLite
+dalam mode WAL mengizinkan banyak pembaca bersamaan dengan satu penulis. Kunci cache
+adalah (bahasa, versi stemmer, token) sehingga upgrade Sastrawi/NLTK tidak memakai
+hasil lama.
+
+Pembaca tidak menulis ke database: penanda `last_used` (untuk eviksi LRU perkiraan) hanya
+diperbarui bila sudah lebih tua dari RECENCY_SECONDS, dikumpulkan di memori, lalu ditulis
+bersama transaksi simpan berikutnya.
+
+`stem_cache_seed.csv` (dibangun dengan `build-seed` dari kosakata kamus kata baku dan leksikon
+sentimen) dimuat otomatis ke cache yang masih kosong.
+
+Contoh:
+    python -m stem_cache stats
+    python -m stem_cache export-seed stem_cache_seed.csv
+    python -m stem_cache build-seed
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+import time
+from importlib import metadata
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.environ.get(
+    'SA_STEM_CACHE_PATH', os.path.join(BASE_DIR, '.cache', 'stem_cache.sqlite3')
+)
+DEFAULT_SEED_PATH = os.path.join(BASE_DIR, 'stem_cache_seed.csv')
+DEFAULT_MAX_ENTRIES = int(os.environ.get('SA_STEM_CACHE_MAX_ENTRIES', 500_000))
+
+# Batas jumlah parameter per query SQLite
+_SQL_BATCH = 500
+# Penanda last_used yang lebih baru dari ini tidak diperbarui (cukup untuk eviksi LRU perkiraan)
+RECENCY_SECONDS = 3600
+# Penanda yang tertunda ditulis sendiri bila sudah sebanyak ini tanpa ada penyimpanan baru
+_TOUCH_BATCH = 5_000
+
+
+def backend_version(language):
+    """Versi library stemmer/lemmatizer untuk bahasa tertentu (bagian dari kunci cache)."""
+    package = 'sastrawi' if language == 'id' else 'nltk'
+    try:
+        return f"{package}-{metadata.version(package)}"
+    except metadata.PackageNotFoundError:
+        return f"{package}-unknown"
+
+
+class StemCache:
+    """Cache token -> hasil stem/lemma dengan lapisan memori di depan file SQLite."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, seed_path=DEFAULT_SEED_PATH):
+        self.path = path
+        self.max_entries = max_entries
+        # Total seluruh proses; per thread (satu sesi/job) ada di thread_counts()
+        self.hits = 0
+        self.misses = 0
+        self._thread = threading.local()
+        self._memory = {}
+        self._versions = {}
+        self._touched = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stems ("
+            " language TEXT NOT NULL, version TEXT NOT NULL, token TEXT NOT NULL,"
+            " result TEXT NOT NULL, last_used INTEGER NOT NULL,"
+            " PRIMARY KEY (language, version, token)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_stems_last_used ON stems (last_used)")
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM stems").fetchone()[0]
+
+        if self._entries == 0 and seed_path and os.path.exists(seed_path):
+            self.load_seed(seed_path)
+
+    def _version(self, language):
+        if language not in self._versions:
+            self._versions[language] = backend_version(language)
+        return self._versions[language]
+
+    # --- Akses Disk ---
+
+    def _fetch(self, language, tokens):
+        """Hanya membaca; token dengan last_used kedaluwarsa dicatat untuk ditulis belakangan."""
+        version = self._version(language)
+        found = {}
+        stale_before = int(time.time()) - RECENCY_SECONDS
+        with self._lock:
+            for start in range(0, len(tokens), _SQL_BATCH):
+                batch = tokens[start:start + _SQL_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    "SELECT token, result, last_used FROM stems"
+                    f" WHERE language = ? AND version = ? AND token IN ({placeholders})",
+                    [language, version, *batch]
+                ).fetchall()
+                for token, result, last_used in rows:
+                    found[token] = result
+                    if last_used < stale_before:
+                        self._touched[(language, version, token)] = None
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._write([])
+        return found
+
+    def _store(self, language, mapping):
+        version = self._version(language)
+        now = int(time.time())
+        with self._lock:
+            written = self._write([(
+                "INSERT OR REPLACE INTO stems (language, version, token, result, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(language, version, token, result, now) for token, result in mapping.items()]
+            )])
+            if written:
+                self._entries += len(mapping)
+            if self._entries > self.max_entries:
+                self._evict()
+
+    def _write(self, statements):
+        """Menjalankan daftar (sql, rows) plus penanda last_used tertunda dalam satu transaksi.
+
+        Mengembalikan False jika database sedang dikunci penulis lain; penulisan dilewati dan
+        cache tetap valid (hasil dihitung ulang bila perlu).
+        """
+        if self._touched:
+            now = int(time.time())
+            touched = [(now, *key) for key in self._touched]
+            self._touched.clear()
+            # Tandai sebagai baru dipakai agar tidak tergusur (LRU perkiraan)
+            statements = [
+                *statements,
+                ("UPDATE stems SET last_used = ? WHERE language = ? AND version = ? AND token = ?", touched),
+            ]
+        if not statements:
+            return True
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for sql, rows in statements:
+                self._conn.executemany(sql, rows)
+            self._conn.execute("COMMIT")
+            return True
+        except sqlite3.OperationalError:
+            # Penulis lain memegang lock terlalu lama: lewati, cache tetap valid
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            return False
+
+    def _evict(self):
+        # Hapus entri paling lama tidak dipakai sampai tersisa 90% kapasitas
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM stems").fetchone()[0]
+        excess = self._entries - int(self.max_entries * 0.9)
+        if excess <= 0:
+            return
+        evicted = self._write([(
+            "DELETE FROM stems WHERE (language, version, token) IN ("
+            " SELECT language, version, token FROM stems ORDER BY last_used LIMIT ?)",
+            [(excess,)]
+        )])
+        if evicted:
+            self._entries -= excess
+
+    # --- API Publik ---
+
+    def warm(self, language, tokens):
+        """Memuat token yang sudah ada di disk ke memori dalam satu batch query."""
+        with self._lock:
+            missing = [t for t in set(tokens) if (language, t) not in self._memory]
+        if missing:
+            found = self._fetch(language, missing)
+            with self._lock:
+                for token, result in found.items():
+                    self._memory[(language, token)] = result
+
+    def lookup(self, language, tokens, compute):
+        """Mengembalikan hasil per token; token yang belum ada dihitung dengan `compute` lalu disimpan.
+
+        Lapisan memori dan counter dibaca/diubah di bawah lock; `compute` berjalan di luar lock
+        agar sesi lain tidak menunggu stemmer.
+        """
+        self.warm(language, tokens)
+        unique = set(tokens)
+        with self._lock:
+            known = {t: self._memory[(language, t)] for t in unique if (language, t) in self._memory}
+        # Kemunculan pertama token baru = miss, sisanya hit (sama dengan lookup per token)
+        computed = {token: compute(token) for token in unique if token not in known}
+        misses = len(computed)
+        hits = len(tokens) - misses
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            for token, result in computed.items():
+                self._memory[(language, token)] = result
+            if len(self._memory) > self.max_entries:
+                self._memory.clear()
+        counts = self._thread
+        counts.hits = getattr(counts, 'hits', 0) + hits
+        counts.misses = getattr(counts, 'misses', 0) + misses
+        if computed:
+            self._store(language, computed)
+        known.update(computed)
+        return [known[token] for token in tokens]
+
+    def thread_counts(self):
+        """(hits, misses) kumulatif dari thread ini saja; selisihnya aman dipakai per run meski cache dibagi."""
+        counts = self._thread
+        return getattr(counts, 'hits', 0), getattr(counts, 'misses', 0)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': self._entries,
+            'path': self.path,
+        }
+
+    def load_seed(self, seed_path):
+        """Warm-up dari file seed CSV (kolom: language, version, token, result)."""
+        by_language = {}
+        with open(seed_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                # Seed dari versi stemmer lain tidak dipakai
+                if row['version'] == self._version(row['language']):
+                    by_language.setdefault(row['language'], {})[row['token']] = row['result']
+        for language, mapping in by_language.items():
+            self._store(language, mapping)
+
+    def export_seed(self, seed_path):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT language, version, token, result FROM stems ORDER BY language, token"
+            ).fetchall()
+        with open(seed_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['language', 'version', 'token', 'result'])
+            writer.writerows(rows)
+        return len(rows)
+
+
+# --- Seed ---
+
+def seed_vocabulary():
+    """Kata yang pasti sering ditemui pipeline Bahasa Indonesia: isi kamus kata baku dan leksikon sentimen."""
+    import kamus_builder
+
+    words = set()
+    for tidak_baku, kata_baku in kamus_builder._read_source(kamus_builder.KAMUS_XLSX).items():
+        words.update(tidak_baku.lower().split())
+        words.update(kata_baku.lower().split())
+    lexicon_path = os.path.join(BASE_DIR, 'leksikon_sentimen_id.tsv')
+    with open(lexicon_path, newline='', encoding='utf-8') as f:
+        words.update(row['kata'].strip().lower() for row in csv.DictReader(f, delimiter='\t'))
+    # Sama dengan token hasil tokenisasi: hanya huruf
+    return sorted(word for word in words if word.isalpha())
+
+
+def build_seed(seed_path, words=None):
+    """Menstem `words` (default seed_vocabulary) dengan Sastrawi terpasang dan menulis file seed."""
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+
+    stemmer = StemmerFactory().create_stemmer()
+    words = seed_vocabulary() if words is None else words
+    version = backend_version('id')
+    with open(seed_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['language', 'version', 'token', 'result'])
+        writer.writerows(('id', version, word, stemmer.stem(word)) for word in words)
+    return len(words)
+
+
+# --- CLI ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stem_cache', description="Kelola cache stem/lemma persisten.")
+    parser.add_argument('--path', default=DEFAULT_CACHE_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help="Tampilkan jumlah entri cache")
+    export = sub.add_parser('export-seed', help="Tulis isi cache sebagai file seed CSV")
+    export.add_argument('output', nargs='?', default=DEFAULT_SEED_PATH)
+    load = sub.add_parser('load-seed', help="Muat file seed CSV ke cache")
+    load.add_argument('input', nargs='?', default=DEFAULT_SEED_PATH)
+    build = sub.add_parser('build-seed', help="Bangun file seed dari kosakata kamus & leksikon (Sastrawi terpasang)")
+    build.add_argument('output', nargs='?', default=DEFAULT_SEED_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build-seed':
+        print(f"{build_seed(args.output)} entri ditulis ke {args.output}")
+        return
+    cache = StemCache(args.path, seed_path=None)
+    if args.command == 'stats':
+        print(cache.stats())
+    elif args.command == 'export-seed':
+        print(f"{cache.export_seed(args.output)} entri ditulis ke {args.output}")
+    elif args.command == 'load-seed':
+        cache.load_seed(args.input)
+        print(cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Tampilan tabel hasil per halaman: filter dan format (join token) hanya untuk baris yang terlihat.
+
+Seperti visualization_logic, argumen berawalan '_' tidak di-hash oleh st.cache_data; kunci cache
+adalah `fingerprint` hasil pipeline ditambah parameter halaman/filter. Hasil mode chunk (Parquet di
+disk) dibaca per row group yang mencakup halaman saja lewat read_spilled_page.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+@st.cache_data(max_entries=32)
+def filter_positions(_df, fingerprint, search_columns, query):
+    """Posisi baris (0..n-1) yang salah satu kolomnya memuat `query` (tanpa beda huruf besar/kecil)."""
+    if not query:
+        return np.arange(len(_df))
+    mask = np.zeros(len(_df), dtype=bool)
+    for column in search_columns:
+        values = _df[column].astype(str)
+        mask |= values.str.contains(query, case=False, regex=False, na=False).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def build_frame(df, store, positions, columns, renames, token_sep=', '):
+    """DataFrame berisi `columns` untuk `positions`; kolom token TokenStore digabung jadi string."""
+    frame = pd.DataFrame(index=df.index[positions])
+    for column in columns:
+        if store is not None and column in store.columns:
+            frame[column] = store.column(column).joined(positions, sep=token_sep)
+        else:
+            frame[column] = df[column].iloc[positions].to_numpy()
+    return frame.rename(columns=dict(renames))
+
+
+@st.cache_data(max_entries=64)
+def format_page(_df, _store, fingerprint, _positions, filter_key, page, page_size, columns, renames):
+    """Satu halaman tabel; hanya baris di halaman ini yang diformat.
+
+    `filter_key` mewakili `_positions` (kolom pencarian + query) di kunci cache.
+    """
+    positions = _positions[(page - 1) * page_size:page * page_size]
+    return build_frame(_df, _store, positions, columns, renames)
+
+
+@st.cache_data(max_entries=64)
+def read_spilled_page(path, page, page_size, columns, renames, token_columns=(), token_sep=', '):
+    """Satu halaman dari hasil Parquet (mode chunk); hanya row group yang mencakup halaman yang dibaca."""
+    import pyarrow.parquet as pq
+
+    start, stop = (page - 1) * page_size, page * page_size
+    parquet = pq.ParquetFile(path)
+    groups, parts, offset = [], [], 0
+    for i in range(parquet.metadata.num_row_groups):
+        n_rows = parquet.metadata.row_group(i).num_rows
+        if offset < stop and offset + n_rows > start:
+            groups.append(i)
+            parts.append((max(start, offset) - offset, min(stop, offset + n_rows) - offset))
+        offset += n_rows
+    frames = [
+        parquet.read_row_group(i, columns=list(columns)).to_pandas().iloc[lo:hi]
+        for i, (lo, hi) in zip(groups, parts)
+    ]
+    frame = pd.concat(frames) if frames else parquet.schema_arrow.empty_table().select(list(columns)).to_pandas()
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    for column in token_columns:
+        if column in frame.columns:
+            frame[column] = [token_sep.join(tokens) for tokens in frame[column]]
+    return frame.rename(columns=dict(renames))
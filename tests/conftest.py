@@ -0,0 +1,26 @@
+"""Konfigurasi pytest: cache, spill dan ekspor ditulis ke folder sementara; tanpa akses jaringan.
+
+Variabel lingkungan diisi sebelum modul aplikasi diimpor karena path default dibaca saat impor.
+"""
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix='sa_tests_')
+
+os.environ.setdefault('SA_OFFLINE', '1')
+for _name, _path in {
+    'SA_STEM_CACHE_PATH': 'stem_cache.sqlite3',
+    'SA_KAMUS_ARTIFACT': 'kamus_kata_baku.bin',
+    'SA_DATASET_SPILL_DIR': 'datasets',
+    'SA_RESULT_SPILL_DIR': 'results',
+    'SA_EXPORT_DIR': 'exports',
+}.items():
+    os.environ.setdefault(_name, os.path.join(_TMP_DIR, _path))
+
+
+def nltk_available(*resources):
+    """True jika semua data NLTK `resources` (mis. 'punkt', 'wordnet') sudah terpasang."""
+    import preprocessing_logic as pl
+
+    status = pl.load_nltk_resources(offline=True)
+    return all(status.get(resource) for resource in resources)
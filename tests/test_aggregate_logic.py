@@ -0,0 +1,60 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import aggregate_logic as al
+
+
+def _stream(seed, n=20_000, vocabulary=2_000):
+    rng = np.random.default_rng(seed)
+    return [f"kata{i}" for i in rng.zipf(1.3, size=n) % vocabulary]
+
+
+def _summarize(tokens, capacity):
+    summary = al.SpaceSaving(capacity)
+    for start in range(0, len(tokens), 500):
+        summary.update(Counter(tokens[start:start + 500]))
+    return summary
+
+
+def _assert_bounds(summary, truth):
+    for token, count in summary.counts.items():
+        assert count - summary.errors[token] <= truth[token] <= count, token
+
+
+@pytest.mark.parametrize('parts', [2, 4, 8])
+def test_merged_summary_keeps_error_bounds(parts):
+    capacity = 100
+    streams = [_stream(seed) for seed in range(parts)]
+    truth = Counter(token for stream in streams for token in stream)
+
+    merged = _summarize(streams[0], capacity)
+    for stream in streams[1:]:
+        merged.merge(_summarize(stream, capacity))
+
+    assert len(merged) <= capacity
+    _assert_bounds(merged, truth)
+    # Setiap kata dengan frekuensi > N/k pasti ada di ringkasan
+    total = sum(truth.values())
+    for token, count in truth.items():
+        if count > total / capacity:
+            assert token in merged.counts
+
+
+def test_merge_of_unfilled_summaries_is_exact():
+    left, right = al.SpaceSaving(10), al.SpaceSaving(10)
+    left.update(Counter({'bagus': 3, 'jelek': 1}))
+    right.update(Counter({'bagus': 2, 'mantap': 4}))
+    left.merge(right)
+    assert left.counts == {'bagus': 5, 'jelek': 1, 'mantap': 4}
+    assert set(left.errors.values()) == {0}
+
+
+def test_merged_halves_find_true_top_words():
+    stream = _stream(0)
+    halves = stream[:10_000], stream[10_000:]
+    merged = _summarize(halves[0], 50).merge(_summarize(halves[1], 50))
+    truth = Counter(stream)
+    _assert_bounds(merged, truth)
+    assert [token for token, _ in merged.most_common(5)] == [token for token, _ in truth.most_common(5)]
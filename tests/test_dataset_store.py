@@ -0,0 +1,73 @@
+import os
+import time
+
+import pandas as pd
+
+import dataset_store as ds
+
+
+def _frame(rows=1000):
+    return pd.DataFrame({'teks': [f"komentar ke {i}" for i in range(rows)]})
+
+
+def _spilled(store, key):
+    """Menyimpan dataset lalu dataset kedua agar yang pertama di-spill (anggaran memori 0)."""
+    store.put(key, _frame())
+    store.put(f"{key}-lain", _frame(10))
+    entry = store._entries[key]
+    assert entry.df is None and os.path.exists(entry.path)
+    return entry
+
+
+def test_new_store_keeps_spill_files_of_other_processes(tmp_path):
+    first = ds.DatasetStore(str(tmp_path), memory_mb=0)
+    _spilled(first, 'a')
+
+    # Proses kedua yang berbagi folder tidak boleh menghapus file spill proses pertama
+    second = ds.DatasetStore(str(tmp_path), memory_mb=0)
+    assert second.spill_dir != first.spill_dir
+    pd.testing.assert_frame_equal(first.get('a'), _frame())
+
+
+def test_sweep_removes_only_stale_entries(tmp_path):
+    stale = tmp_path / 'proc-1-dead'
+    stale.mkdir()
+    (stale / 'x.arrow').write_bytes(b'x')
+    old = time.time() - ds.STALE_SECONDS - 60
+    os.utime(stale, (old, old))
+    fresh = tmp_path / 'proc-2-live'
+    fresh.mkdir()
+
+    ds.DatasetStore(str(tmp_path))
+
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_missing_spill_file_drops_entry(tmp_path):
+    store = ds.DatasetStore(str(tmp_path), memory_mb=0)
+    entry = _spilled(store, 'a')
+    os.remove(entry.path)
+
+    assert store.get('a') is None
+    assert 'a' not in store
+    assert store.disk_bytes == 0
+
+
+def test_processing_matches_before_and_after_spill(tmp_path):
+    import numpy as np
+
+    import preprocessing_logic as pl
+
+    df = pd.DataFrame({'teks': ['bagus', np.nan, 'jelek', 'mahal'], 'skor': [1.0, np.nan, 3.0, 4.0]})
+    store = ds.DatasetStore(str(tmp_path), memory_mb=0)
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast')
+    before = pl.preprocess_series(df['teks'], steps, 'id')
+
+    store.put('a', df)
+    _spilled(store, 'a')
+    reloaded = store.get('a')
+
+    pd.testing.assert_frame_equal(reloaded, df)
+    assert pl.dataset_fingerprint(reloaded) == pl.dataset_fingerprint(df)
+    pd.testing.assert_frame_equal(pl.preprocess_series(reloaded['teks'], steps, 'id'), before)
@@ -0,0 +1,60 @@
+"""Tokenizer cepat vs jalur NLTK (word_tokenize + clean_tokens) pada korpus diferensial.
+
+`data/tokenizer_corpus.tsv` menyimpan hasil yang dipatok untuk kedua jalur. Kedua kolom harus
+sama kecuali untuk kategori perbedaan yang terdokumentasi di docstring fast_tokenize.
+"""
+import csv
+import os
+
+import pandas as pd
+import pytest
+
+import preprocessing_logic as pl
+from conftest import nltk_available
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'tokenizer_corpus.tsv')
+# Perbedaan yang terdokumentasi di fast_tokenize
+DOCUMENTED_DIFFERENCES = {'kontraksi', 'angka-tanda-baca', 'tanda-hubung-ganda'}
+
+
+def _load_corpus():
+    with open(CORPUS_PATH, newline='', encoding='utf-8') as f:
+        return [
+            (row['kategori'], row['teks'], row['fast'].split(), row['nltk'].split())
+            for row in csv.DictReader(f, delimiter='\t')
+        ]
+
+
+CORPUS = _load_corpus()
+IDS = [f"{category}-{i}" for i, (category, *_) in enumerate(CORPUS)]
+
+
+def test_corpus_covers_required_categories():
+    categories = {category for category, *_ in CORPUS}
+    assert {'slang', 'emoji', 'url', 'mention', 'hashtag', 'aksara'} <= categories
+    assert DOCUMENTED_DIFFERENCES <= categories
+
+
+@pytest.mark.parametrize('category, text, fast, nltk', CORPUS, ids=IDS)
+def test_pinned_outputs_differ_only_where_documented(category, text, fast, nltk):
+    if category in DOCUMENTED_DIFFERENCES:
+        assert fast != nltk
+    else:
+        assert fast == nltk
+
+
+@pytest.mark.parametrize('category, text, fast, nltk', CORPUS, ids=IDS)
+def test_fast_tokenize(category, text, fast, nltk):
+    assert pl.fast_tokenize(pl.case_fold(text)) == fast
+
+
+def test_fast_tokenize_series_matches_scalar():
+    texts = pd.Series([text for _, text, _, _ in CORPUS])
+    steps = {'case_folding': True, 'tokenization': True, 'tokenizer': 'fast'}
+    assert pl.extract_tokens_series(texts, steps) == [fast for *_, fast, _ in CORPUS]
+
+
+@pytest.mark.skipif(not nltk_available('punkt', 'punkt_tab'), reason="Data tokenizer NLTK tidak terpasang")
+@pytest.mark.parametrize('category, text, fast, nltk', CORPUS, ids=IDS)
+def test_nltk_tokenize(category, text, fast, nltk):
+    assert pl.clean_tokens(pl.tokenize(pl.case_fold(text))) == nltk
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+import feature_logic as fl
+import token_store as ts
+
+NGRAM_RANGE = (1, 2)
+# Ukuran chunk sengaja tidak membagi jumlah baris agar n-gram diuji di batas chunk
+CHUNK_SIZE = 97
+
+
+def _rows(seed=0, n=500, vocabulary=60):
+    rng = np.random.default_rng(seed)
+    rows = [[f"kata{i}" for i in rng.integers(0, vocabulary, size=rng.integers(0, 12))] for _ in range(n)]
+    # Baris kosong dan satu token di sekitar batas chunk: tidak boleh ada bigram lintas baris
+    rows[CHUNK_SIZE - 1], rows[CHUNK_SIZE], rows[CHUNK_SIZE + 1] = [], ['kata1'], ['kata2', 'kata3']
+    return rows
+
+
+def _sklearn_options():
+    # Token sudah dipisah pipeline: sklearn cukup memecah spasi tanpa lowercase/pola token
+    return dict(ngram_range=NGRAM_RANGE, tokenizer=str.split, token_pattern=None, lowercase=False)
+
+
+def _column(rows):
+    chunks = [ts.encode_chunk({'tokens': rows[i:i + CHUNK_SIZE]}) for i in range(0, len(rows), CHUNK_SIZE)]
+    return ts.TokenStore.from_chunks(chunks, range(len(rows))).column('tokens')
+
+
+def test_hash_matches_sklearn_hashing_vectorizer(tmp_path):
+    rows = _rows()
+    extractor = fl.StreamingExtractor(str(tmp_path), 'hash', NGRAM_RANGE, n_features=2 ** 12)
+    for start in range(0, len(rows), CHUNK_SIZE):
+        extractor.add(rows[start:start + CHUNK_SIZE])
+    extractor.close()
+    matrix, vocabulary, meta = fl.load_features(str(tmp_path))
+
+    expected = HashingVectorizer(n_features=2 ** 12, **_sklearn_options()).transform([' '.join(r) for r in rows])
+    assert vocabulary is None
+    assert meta['parts'] == -(-len(rows) // CHUNK_SIZE)
+    assert matrix.shape == expected.shape
+    assert abs(matrix - expected).max() < 1e-12
+
+
+@pytest.mark.parametrize('min_df', [1, 3])
+def test_tfidf_matches_sklearn_tfidf_vectorizer(tmp_path, min_df):
+    rows = _rows(seed=1)
+    fl.extract_features(_column(rows), str(tmp_path), 'tfidf', NGRAM_RANGE, min_df=min_df, chunk_size=CHUNK_SIZE)
+    matrix, vocabulary, meta = fl.load_features(str(tmp_path))
+
+    vectorizer = TfidfVectorizer(min_df=min_df, **_sklearn_options())
+    expected = vectorizer.fit_transform([' '.join(r) for r in rows])
+    assert vocabulary == list(vectorizer.get_feature_names_out())
+    assert meta['parts'] == -(-len(rows) // CHUNK_SIZE)
+    assert matrix.shape == expected.shape
+    assert abs(matrix - expected).max() < 1e-12
+
+
+def test_streaming_tfidf_matches_single_pass(tmp_path):
+    rows = _rows(seed=2)
+    extractor = fl.StreamingExtractor(str(tmp_path / 'stream'), 'tfidf', NGRAM_RANGE)
+    for start in range(0, len(rows), CHUNK_SIZE):
+        extractor.add(rows[start:start + CHUNK_SIZE])
+    extractor.close()
+    fl.extract_features(_column(rows), str(tmp_path / 'whole'), 'tfidf', NGRAM_RANGE, chunk_size=len(rows))
+
+    streamed, streamed_vocab, _ = fl.load_features(str(tmp_path / 'stream'))
+    whole, whole_vocab, _ = fl.load_features(str(tmp_path / 'whole'))
+    assert streamed_vocab == whole_vocab
+    assert abs(streamed - whole).max() < 1e-12
@@ -0,0 +1,138 @@
+import http.client
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import http_service as hs
+import kamus_builder
+import preprocessing_logic as pl
+
+
+@pytest.fixture
+def server():
+    server, service = hs.serve('127.0.0.1', 0, offline=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, service
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, body, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=30)
+    conn.putrequest('POST', '/preprocess')
+    for name, value in (headers or {'Content-Length': str(len(body))}).items():
+        conn.putheader(name, value)
+    conn.endheaders(body)
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response.status, data
+
+
+def _request(texts, **steps):
+    return json.dumps({'texts': texts, 'pipeline_steps': dict(tokenizer='fast', **steps)}).encode('utf-8')
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1.5'])
+def test_invalid_content_length_is_rejected(server, length):
+    status, data = _post(server[0], b'{}', {'Content-Length': length})
+
+    assert status == 400
+    assert 'Content-Length' in json.loads(data)['error']
+
+
+def test_kamus_is_loaded_on_first_normalization_request(server):
+    server, service = server
+    assert not service.health()['kamus_loaded']
+
+    status, _ = _post(server, _request(["gak suka"]))
+    assert status == 200
+    assert not service.health()['kamus_loaded']
+
+    status, data = _post(server, _request(["gak suka"], normalization=True))
+    assert status == 200
+    assert service.health()['kamus_loaded']
+    expected = pl.preprocess_series(
+        pd.Series(["gak suka"]), dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast', normalization=True), 'id'
+    )
+    assert json.loads(data.splitlines()[0])['Tokens_Filtered'] == expected['Tokens_Filtered'][0]
+
+
+def test_broken_kamus_only_fails_normalization_requests(server, monkeypatch):
+    server, service = server
+
+    def broken():
+        raise kamus_builder.KamusError("File kamus tidak bisa dibaca")
+
+    monkeypatch.setattr(pl, 'load_kamus_kata_baku', broken)
+
+    status, data = _post(server, _request(["gak suka"], normalization=True))
+    assert status == 503
+    assert 'Kamus' in json.loads(data)['error']
+
+    status, _ = _post(server, _request(["gak suka"]))
+    assert status == 200
+
+
+def test_service_starts_without_kamus(monkeypatch):
+    def broken():
+        raise kamus_builder.KamusError("File kamus tidak bisa dibaca")
+
+    monkeypatch.setattr(pl, 'load_kamus_kata_baku', broken)
+    service = hs.PreprocessingService(offline=True)
+
+    assert service.health()['status'] == 'ok'
+    with pytest.raises(hs.RequestError) as error:
+        service.resources_for({'normalization': True}, 'id')
+    assert error.value.status == 503
+
+
+def test_full_queue_is_rejected_before_reading_body(server):
+    server, service = server
+    held = 0
+    while service.admit():
+        held += 1
+    try:
+        # Body tidak pernah dikirim: server harus menjawab 503 tanpa menunggu body
+        conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+        conn.putrequest('POST', '/preprocess')
+        conn.putheader('Content-Length', '1000000')
+        conn.endheaders()
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+    finally:
+        for _ in range(held):
+            service.release()
+
+    assert response.status == 503
+    assert response.getheader('Retry-After') == '1'
+
+
+def _free_admission_slots(service):
+    held = 0
+    while service.admit():
+        held += 1
+    for _ in range(held):
+        service.release()
+    return held
+
+
+def test_admission_slot_is_released_on_every_path(server):
+    server, service = server
+    free = _free_admission_slots(service)
+
+    status, _ = _post(server, b'{bukan json', {'Content-Length': '11', 'Content-Type': 'application/json'})
+    assert status == 400
+    status, _ = _post(server, _request(["gak suka"]))
+    assert status == 200
+
+    # Slot dilepas di handler setelah respons terkirim; beri waktu sebentar
+    deadline = time.monotonic() + 5
+    while _free_admission_slots(service) != free and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _free_admission_slots(service) == free
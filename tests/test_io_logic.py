@@ -0,0 +1,87 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import io_logic
+
+
+def _chunks():
+    first = pd.DataFrame({
+        'aktif': [True, False],
+        'tanggal': pd.to_datetime(['2024-01-01', '2024-01-02']),
+        'campuran': ['a', 1],
+        'nilai': [np.nan, np.nan],
+        'catatan': [None, None],
+        'jumlah': [1, 2],
+        'Tokens_Stemmed': [['bagus'], []],
+    })
+    second = pd.DataFrame({
+        'aktif': [True, None],
+        'tanggal': pd.to_datetime(['2024-01-03', None]),
+        'campuran': [2, 3],
+        'nilai': [1.5, np.nan],
+        'catatan': ['dikirim', None],
+        'jumlah': [3.0, np.nan],
+        'Tokens_Stemmed': [['kirim', 'cepat'], ['mahal']],
+    })
+    return first, second
+
+
+def test_parquet_writer_handles_bool_datetime_mixed_and_leading_nan(tmp_path):
+    path = str(tmp_path / 'hasil.parquet')
+    with io_logic.ChunkWriter(path, 'parquet', list_columns=['Tokens_Stemmed']) as writer:
+        for chunk in _chunks():
+            writer.write(chunk)
+
+    result = pq.read_table(path).to_pandas()
+    assert len(result) == 4
+    assert result['aktif'].tolist()[:3] == [True, False, True]
+    assert pd.api.types.is_datetime64_any_dtype(result['tanggal'])
+    assert result['tanggal'].isna().tolist() == [False, False, False, True]
+    assert result['campuran'].tolist() == ['a', '1', '2', '3']
+    assert result['nilai'].iloc[2] == 1.5
+    assert result['catatan'].tolist()[2] == 'dikirim'
+    assert result['jumlah'].iloc[:3].tolist() == [1, 2, 3]
+    assert [list(tokens) for tokens in result['Tokens_Stemmed']] == [['bagus'], [], ['kirim', 'cepat'], ['mahal']]
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_text_formats_accept_the_same_chunks(tmp_path, fmt):
+    path = str(tmp_path / f'hasil.{fmt}')
+    with io_logic.ChunkWriter(path, fmt, list_columns=['Tokens_Stemmed']) as writer:
+        for chunk in _chunks():
+            writer.write(chunk)
+
+    assert writer.rows == 4
+
+
+CSV_WITH_GAPS = b"teks,skor\nbagus,1\n,2\njelek,\n"
+
+
+def test_csv_empty_cells_are_nan_like_read_csv():
+    df, info = io_logic.read_table(io.BytesIO(CSV_WITH_GAPS), 'data.csv')
+
+    pd.testing.assert_frame_equal(df, pd.read_csv(io.BytesIO(CSV_WITH_GAPS)))
+    # 'nan' (bukan 'none') setelah astype(str), sama dengan engine C dan XLSX
+    assert df['teks'].astype(str).tolist() == ['bagus', 'nan', 'jelek']
+
+
+def test_xlsx_matches_read_excel(tmp_path):
+    from openpyxl import Workbook
+
+    path = str(tmp_path / 'data.xlsx')
+    workbook = Workbook()
+    workbook.active.append(['teks', None, 'skor'])
+    workbook.active.append(['bagus', 'x', 1])
+    workbook.active.append([None, None, 2])
+    workbook.save(path)
+
+    df, _ = io_logic.read_table(path, 'data.xlsx')
+    expected = pd.read_excel(path)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected)
+    assert io_logic.sniff_columns(path, 'data.xlsx') == ['teks', 'Unnamed: 1', 'skor']
+    chunk = next(io_logic.iter_table_chunks(path, 10))
+    assert chunk['teks'].astype(str).tolist() == ['bagus', 'nan']
@@ -0,0 +1,97 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import dataset_store as ds
+import job_logic as jl
+import preprocessing_logic as pl
+from test_preprocessing_parity import CORPUS
+
+
+def _steps():
+    return dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast')
+
+
+def _wait(job, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert job.status == jl.DONE, job.error
+
+
+@pytest.fixture
+def manager(tmp_path):
+    store = ds.DatasetStore(str(tmp_path))
+    store.put('data', pd.DataFrame({'komentar': CORPUS['id'] * 4}))
+    return jl.JobManager(store, max_finished=1)
+
+
+def _submit(manager, **options):
+    return manager.submit(jl.Job('data.csv', 'data', 'komentar', 'id', _steps(), workers=1, **options))
+
+
+def test_finished_job_keeps_only_handles(manager):
+    job = _submit(manager)
+    _wait(job)
+
+    result = job.result
+    assert result['token_store'] is None
+    assert os.path.exists(result['token_store_path'])
+    assert len(result['aggregates'].final) <= jl.FINISHED_TOP_WORDS
+
+    token_store = jl.load_token_store(result, manager.store)
+    expected = pl.preprocess_series(manager.store.get('data')['komentar'], _steps(), 'id')
+    assert token_store.column('Tokens_Stemmed').rows() == expected['Tokens_Stemmed'].tolist()
+
+
+def test_pruned_job_removes_token_store_file(manager):
+    first = _submit(manager)
+    _wait(first)
+    path = first.result['token_store_path']
+    second = _submit(manager)
+    _wait(second)
+
+    assert manager.get(first.id) is None
+    assert not os.path.exists(path)
+    assert os.path.exists(second.result['token_store_path'])
+
+
+def test_missing_token_store_file_is_not_loaded(manager):
+    job = _submit(manager)
+    _wait(job)
+    os.remove(job.result['token_store_path'])
+
+    assert jl.load_token_store(job.result, manager.store) is None
+
+
+def test_job_shares_stage_cache_with_session(manager):
+    cache = pl.StageCache()
+    job = _submit(manager, stage_cache=cache)
+    # Sesi tetap boleh membaca/menulis cache selama job berjalan
+    while not job.finished:
+        cache.put(('sesi',), [['a']])
+        cache.get(('sesi',))
+        len(cache)
+    _wait(job)
+    assert len(cache) > 1
+    assert job.stage_cache is None
+
+
+def test_spilled_job_writes_mixed_type_columns(manager):
+    texts = CORPUS['id'] * 4
+    manager.store.put('campuran', pd.DataFrame({
+        'komentar': texts,
+        'aktif': [i % 2 == 0 for i in range(len(texts))],
+        'tanggal': pd.date_range('2024-01-01', periods=len(texts)),
+        'kode': ['A' if i % 3 else i for i in range(len(texts))],
+        'nilai': [float('nan')] * 10 + [1.5] * (len(texts) - 10),
+    }))
+    job = manager.submit(jl.Job('campuran.xlsx', 'campuran', 'komentar', 'id', _steps(), workers=1,
+                                memory_mode='spill'))
+    _wait(job)
+
+    result = pd.read_parquet(job.result['processed_path'])
+    assert len(result) == len(texts)
+    assert result['kode'].tolist()[:3] == ['0', 'A', 'A']
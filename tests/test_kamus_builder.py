@@ -0,0 +1,33 @@
+import pytest
+
+import kamus_builder
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'slang.csv'
+    path.write_text("tidak_baku,kata_baku\ngk,tidak\nbgt,banget\nmkasih,terima kasih\n", encoding='utf-8')
+    return [str(path)]
+
+
+def test_artifact_roundtrip(source, tmp_path):
+    artifact = str(tmp_path / 'kamus.bin')
+    kamus = kamus_builder.build_kamus(source, artifact)
+    assert kamus == {'gk': 'tidak', 'bgt': 'banget', 'mkasih': 'terima kasih'}
+    assert kamus_builder.read_artifact(artifact, kamus_builder.source_hash(source)) == kamus
+    assert kamus_builder.read_artifact(artifact, 'sumber-lain') is None
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: data[:len(kamus_builder.MAGIC) + 2],        # panjang header terpotong
+    lambda data: data[:len(kamus_builder.MAGIC) + 10],       # header JSON terpotong
+    lambda data: data[:-5],                                  # payload terpotong
+    lambda data: data[:len(kamus_builder.MAGIC)] + b'\xff' * (len(data) - len(kamus_builder.MAGIC)),
+    lambda data: b'SAKAMUS1' + data[len(kamus_builder.MAGIC):],  # format lama (pickle)
+], ids=['panjang-header', 'header', 'payload', 'sampah', 'format-lama'])
+def test_corrupt_artifact_is_a_cache_miss(source, tmp_path, corrupt):
+    artifact = tmp_path / 'kamus.bin'
+    kamus_builder.build_kamus(source, str(artifact))
+    artifact.write_bytes(corrupt(artifact.read_bytes()))
+    assert kamus_builder.read_artifact(str(artifact), kamus_builder.source_hash(source)) is None
+
@@ -0,0 +1,56 @@
+"""PipelineStats dengan dedupe harus setara dengan memproses setiap baris."""
+import pandas as pd
+import pytest
+
+import parallel_engine as pe
+import preprocessing_logic as pl
+from test_preprocessing_parity import CORPUS
+
+COUNTERS = ('rows', 'kamus_replacements', 'stopword_drop_rate')
+
+
+def _steps():
+    return dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast', normalization=True)
+
+
+def _series():
+    return pd.Series(CORPUS['id'] * 5, dtype=object)
+
+
+def _counters(stats):
+    summary = stats.summary()
+    counters = {key: summary[key] for key in COUNTERS}
+    for row in summary['stages']:
+        counters[f"{row['stage']}.tokens_in"] = row['tokens_in']
+        counters[f"{row['stage']}.tokens_out"] = row['tokens_out']
+    return counters
+
+
+@pytest.mark.parametrize('vocab_first', [False, True], ids=['per-baris', 'vocab-first'])
+def test_dedupe_counters_match_all_rows(vocab_first):
+    reference, deduped = pl.PipelineStats(), pl.PipelineStats()
+    pl.preprocess_series(_series(), _steps(), 'id', vocab_first=vocab_first, stats=reference)
+    pl.preprocess_series(_series(), _steps(), 'id', vocab_first=vocab_first, stats=deduped, dedupe=True)
+
+    assert deduped.summary()['kamus_replacements'] > 0
+    assert _counters(deduped) == _counters(reference)
+    assert deduped.duplicate_rows == len(_series()) - _series().nunique(dropna=False)
+
+
+def test_run_pipeline_dedupe_counters_match_all_rows():
+    reference, deduped = pl.PipelineStats(), pl.PipelineStats()
+    pe.run_pipeline(_series(), _steps(), 'id', workers=1, chunk_size=7, stats=reference, dedupe=False)
+    pe.run_pipeline(_series(), _steps(), 'id', workers=1, chunk_size=7, stats=deduped, dedupe=True)
+
+    assert _counters(deduped) == _counters(reference)
+
+
+def test_dedupe_seconds_saved_uses_stage_time_only():
+    stats = pl.PipelineStats()
+    series = _series()
+    pl.preprocess_series(series, _steps(), 'id', vocab_first=True, stats=stats, dedupe=True)
+
+    unique_rows = len(series) - stats.duplicate_rows
+    # Ekstrapolasi dari waktu tahap saja: warm-up resource tidak membuat hematnya melebihi ini
+    limit = stats.processing_seconds() / unique_rows * stats.duplicate_rows
+    assert 0 < stats.dedupe_seconds_saved <= limit + 1e-9
@@ -0,0 +1,123 @@
+"""Jalur vocab-first, dedupe dan StageCache harus identik per elemen dengan pipeline per baris."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import preprocessing_logic as pl
+from conftest import nltk_available
+
+CORPUS = {
+    'id': [
+        "Barangnya bagus banget kak, pengirimannya cepat!!",
+        "gak suka, jelek bgt 😡 https://t.co/abc @tokoresmi",
+        "Tidak bagus, kecewa... padahal harganya mahal",
+        "mantap sekali pengirimannya #puas",
+        "Barangnya bagus banget kak, pengirimannya cepat!!",
+        "",
+        "   ",
+        "sdh sampai, tp kemasannya penyok dan berantakan",
+        "Pelayanan ramah 👍👍 recommended seller",
+        "gak suka, jelek bgt 😡 https://t.co/abc @tokoresmi",
+        np.nan,
+        "Jam 5 sore baru dikirim, lama bgt!!!",
+    ],
+    'en': [
+        "The products were great, shipping was fast!!",
+        "I don't like it, it's terrible 😡 https://t.co/abc @store",
+        "Not good at all... and the prices are high",
+        "Amazing quality #happy",
+        "The products were great, shipping was fast!!",
+        "",
+        "   ",
+        "Packages arrived damaged; boxes were crushed",
+        "Friendly sellers 👍 would buy again",
+        "I don't like it, it's terrible 😡 https://t.co/abc @store",
+        np.nan,
+        "Delivered at 5pm, very slow!!!",
+    ],
+}
+
+
+def _steps(language, tokenizer, normalization):
+    if tokenizer == 'nltk' and not nltk_available('punkt', 'punkt_tab'):
+        pytest.skip("Data tokenizer NLTK tidak terpasang")
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer=tokenizer, normalization=normalization)
+    if language == 'en' and not nltk_available('wordnet'):
+        steps['lemmatization'] = False
+    return steps
+
+
+def _series(language):
+    # Diulang agar dedupe benar-benar menggabungkan baris dan index tidak berurutan
+    values = CORPUS[language] * 3
+    return pd.Series(values, index=np.arange(len(values))[::-1] * 7, dtype=object)
+
+
+@pytest.fixture(params=['id', 'en'])
+def language(request):
+    return request.param
+
+
+@pytest.fixture(params=[False, True], ids=['tanpa-normalisasi', 'normalisasi'])
+def normalization(request):
+    return request.param
+
+
+@pytest.fixture(params=['fast', 'nltk'])
+def tokenizer(request):
+    return request.param
+
+
+@pytest.fixture
+def case(language, tokenizer, normalization):
+    steps = _steps(language, tokenizer, normalization)
+    series = _series(language)
+    reference = pl.preprocess_series(series, steps, language)
+    return series, steps, language, reference
+
+
+@pytest.mark.parametrize('options', [
+    dict(vocab_first=True),
+    dict(dedupe=True),
+    dict(vocab_first=True, dedupe=True),
+], ids=['vocab_first', 'dedupe', 'vocab_first+dedupe'])
+def test_batch_modes_match_per_row(case, options):
+    series, steps, language, reference = case
+    result = pl.preprocess_series(series, steps, language, **options)
+    pd.testing.assert_frame_equal(result, reference)
+
+
+def test_per_row_results_match_preprocess_pipeline(case):
+    series, steps, language, reference = case
+    resources = pl.load_pipeline_resources(steps, language)
+    expected = [pl.preprocess_pipeline(str(text), steps, language, resources) for text in series]
+    assert [tuple(row) for row in reference.itertuples(index=False)] == expected
+
+
+@pytest.mark.parametrize('dedupe', [False, True])
+def test_stage_cache_matches_per_row(case, dedupe):
+    series, steps, language, reference = case
+    stage_cache = pl.StageCache()
+    cache_key = ('fingerprint', 'komentar', language)
+    cold = pl.preprocess_series(series, steps, language, stage_cache=stage_cache, cache_key=cache_key, dedupe=dedupe)
+    stats = pl.PipelineStats()
+    warm = pl.preprocess_series(
+        series, steps, language, stage_cache=stage_cache, cache_key=cache_key, dedupe=dedupe, stats=stats
+    )
+    pd.testing.assert_frame_equal(cold, reference)
+    pd.testing.assert_frame_equal(warm, reference)
+    assert stats.cached_stages == len(pl.STAGES)
+
+
+def test_stage_cache_reuses_prefix_after_config_change(case):
+    series, steps, language, _ = case
+    stage_cache = pl.StageCache()
+    cache_key = ('fingerprint', 'komentar', language)
+    without_stopwords = dict(steps, stopword_removal=False)
+    pl.preprocess_series(series, without_stopwords, language, stage_cache=stage_cache, cache_key=cache_key)
+
+    stats = pl.PipelineStats()
+    result = pl.preprocess_series(series, steps, language, stage_cache=stage_cache, cache_key=cache_key, stats=stats)
+    pd.testing.assert_frame_equal(result, pl.preprocess_series(series, steps, language))
+    # Token dan normalisasi dipakai ulang; stopword removal dan stemming dihitung ulang
+    assert stats.cached_stages == 2
@@ -0,0 +1,94 @@
+"""Regresi memori tab visualisasi: RSS harus tetap datar selama banyak rerun aplikasi.
+
+Aplikasi dijalankan ulang lewat streamlit.testing (AppTest) dengan dataset sintetis yang sudah
+diproses, sehingga cache gambar dan alur tab visualisasi ikut teruji. Tes gagal jika RSS pada
+paruh kedua run naik lebih dari MAX_GROWTH_MB atau masih ada figure pyplot yang terbuka.
+"""
+import os
+import sys
+import time
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+import preprocessing_logic as pl
+import visualization_logic as vl
+from benchmarks.corpus import generate_corpus
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+RERUNS = 1_000
+# Satu render tanpa cache ~0,8 detik (wordcloud + bar); 200 pasang sudah melewati banyak siklus GC
+UNCACHED_RENDERS = 200
+CORPUS_ROWS = 1_000
+# Pertumbuhan RSS paruh kedua yang masih dianggap noise allocator
+MAX_GROWTH_MB = 20.0
+JOB_TIMEOUT = 120
+
+
+def current_rss_mb():
+    # RSS saat ini (bukan puncak) dari /proc; fallback ke puncak getrusage di luar Linux
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _second_half_growth(samples):
+    return samples[-1] - samples[len(samples) // 2]
+
+
+@pytest.fixture
+def processed_app():
+    from streamlit.testing.v1 import AppTest
+
+    corpus = generate_corpus(CORPUS_ROWS)
+    dataset = pd.DataFrame({'user': [f'u{i % 50}' for i in range(len(corpus))], 'komentar': corpus})
+    pl.get_dataset_store().put('test-render', dataset)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=300)
+    at.run()
+    at.session_state.datasets = {'render.csv': 'test-render'}
+    at.run()
+    at.button[0].click().run()
+    at.radio[0].set_value("Cepat (regex)").run()
+    [b for b in at.button if 'Mulai' in b.label][0].click().run()
+    # Job berjalan di thread latar belakang; rerun sampai hasilnya dipasang
+    deadline = time.monotonic() + JOB_TIMEOUT
+    while not at.session_state.data_processed and time.monotonic() < deadline:
+        time.sleep(0.2)
+        at.run()
+    assert not at.exception
+    assert at.session_state.data_processed
+    return at
+
+
+def test_app_reruns_keep_rss_flat(processed_app):
+    samples = []
+    for _ in range(RERUNS):
+        processed_app.run()
+        samples.append(current_rss_mb())
+
+    assert not processed_app.exception
+    assert _second_half_growth(samples) <= MAX_GROWTH_MB
+    assert plt.get_fignums() == []
+
+
+def test_uncached_render_keeps_rss_flat():
+    # Tanpa cache gambar: figure dibuat dan dibuang setiap iterasi
+    df_freq = vl.raw_word_frequency.__wrapped__(generate_corpus(CORPUS_ROWS), 'test')
+    wordcloud = getattr(vl.render_wordcloud, '__wrapped__', vl.render_wordcloud)
+    bars = getattr(vl.render_word_frequency, '__wrapped__', vl.render_word_frequency)
+    samples = []
+    for _ in range(UNCACHED_RENDERS):
+        wordcloud(df_freq, 'test')
+        bars(df_freq, 'test')
+        samples.append(current_rss_mb())
+
+    assert _second_half_growth(samples) <= MAX_GROWTH_MB
+    assert plt.get_fignums() == []
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sentiment_logic as sl
+import token_store as ts
+
+WEIGHTS = {'bagus': 3.0, 'mantap': 4.0, 'kecewa': -4.0, 'buruk': -3.0}
+NEGATIONS = {'tidak', 'bukan', 'gak'}
+FILLER = ['produk', 'ini', 'sangat', 'kirim', 'cepat']
+
+
+def _column(rows, chunk_rows=1_000):
+    chunks = [ts.encode_chunk({'tokens': rows[i:i + chunk_rows]}) for i in range(0, len(rows), chunk_rows)]
+    return ts.TokenStore.from_chunks(chunks, range(len(rows))).column('tokens')
+
+
+def _scores(rows, window=sl.DEFAULT_NEGATION_WINDOW, chunk_size=1_000):
+    lexicon = sl.Lexicon(WEIGHTS, NEGATIONS, window)
+    return sl.score_column(_column(rows), lexicon, chunk_size=chunk_size).tolist()
+
+
+def _reference_score(row, window):
+    # Loop per token: negasi menunggu kata berbobot pertama dalam `window` token sesudahnya
+    score, pending = 0.0, None
+    for i, token in enumerate(row):
+        if token in NEGATIONS:
+            pending = i
+        elif token in WEIGHTS:
+            negated = pending is not None and i - pending <= window
+            score += -WEIGHTS[token] if negated else WEIGHTS[token]
+            pending = None
+    return score
+
+
+def test_negation_flips_only_the_first_lexicon_word():
+    assert _scores([['tidak', 'bagus', 'kecewa']]) == [-7.0]
+    assert _scores([['bagus', 'tidak', 'kecewa']]) == [7.0]
+    assert _scores([['tidak', 'tidak', 'mantap']]) == [-4.0]
+
+
+@pytest.mark.parametrize('gap, expected', [(0, -3.0), (2, -3.0), (3, 3.0)])
+def test_negation_window(gap, expected):
+    # window 3: kata berbobot paling jauh 3 token sesudah negasi
+    assert _scores([['gak'] + FILLER[:gap] + ['bagus']]) == [expected]
+
+
+def test_negation_does_not_cross_rows():
+    rows = [['tidak'], ['bagus'], ['produk', 'bukan'], [], ['buruk', 'tidak']]
+    assert _scores(rows) == [0.0, 3.0, 0.0, 0.0, -3.0]
+
+
+def test_scores_match_reference_loop_across_chunks():
+    rng = np.random.default_rng(0)
+    words = list(WEIGHTS) + sorted(NEGATIONS) + FILLER
+    rows = [list(rng.choice(words, size=rng.integers(0, 10))) for _ in range(3_000)]
+    expected = [_reference_score(row, sl.DEFAULT_NEGATION_WINDOW) for row in rows]
+
+    # Ukuran chunk 997 tidak membagi 3.000 baris: batas chunk jatuh di tengah data
+    assert _scores(rows, chunk_size=997) == expected
+    assert _scores(rows, chunk_size=len(rows)) == expected
+
+
+def test_add_sentiment_columns_labels_rows():
+    rows = [['bagus'], ['tidak', 'bagus'], ['produk']]
+    df = sl.add_sentiment_columns(pd.DataFrame(index=range(3)), _column(rows), sl.Lexicon(WEIGHTS, NEGATIONS))
+
+    assert df[sl.SCORE_COLUMN].tolist() == [3.0, -3.0, 0.0]
+    assert df[sl.LABEL_COLUMN].tolist() == ['positif', 'negatif', 'netral']
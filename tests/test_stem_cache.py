@@ -0,0 +1,100 @@
+import csv
+import sqlite3
+import time
+
+import stem_cache
+
+
+def _seed(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['language', 'version', 'token', 'result'])
+        writer.writerows(rows)
+
+
+def _fail(token):
+    raise AssertionError(f"{token!r} seharusnya diambil dari cache")
+
+
+def test_empty_cache_is_warmed_from_seed(tmp_path):
+    seed = tmp_path / 'seed.csv'
+    version = stem_cache.backend_version('id')
+    _seed(seed, [('id', version, 'pengirimannya', 'kirim'), ('id', 'sastrawi-0.0', 'bagus', 'usang')])
+    cache = stem_cache.StemCache(str(tmp_path / 'cache.sqlite3'), seed_path=str(seed))
+
+    assert cache.lookup('id', ['pengirimannya'], _fail) == ['kirim']
+    # Baris seed dari versi stemmer lain diabaikan
+    assert cache.lookup('id', ['bagus'], str.upper) == ['BAGUS']
+
+
+def test_shipped_seed_matches_pinned_sastrawi():
+    with open(stem_cache.DEFAULT_SEED_PATH, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) > 1000
+    assert {row['version'] for row in rows} == {'sastrawi-1.0.1'}
+    assert {row['language'] for row in rows} == {'id'}
+
+
+def test_lookup_does_not_write_while_another_process_holds_the_lock(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    stem_cache.StemCache(path, seed_path=None).lookup('id', ['makanan', 'minuman'], lambda t: t[:4])
+
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        reader = stem_cache.StemCache(path, seed_path=None)
+        start = time.perf_counter()
+        assert reader.lookup('id', ['makanan', 'minuman'], _fail) == ['maka', 'minu']
+        assert time.perf_counter() - start < 1.0
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+def test_stale_recency_is_flushed_with_next_store(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = stem_cache.StemCache(path, seed_path=None)
+    cache.lookup('id', ['lama'], str.upper)
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE stems SET last_used = 0")
+
+    fresh = stem_cache.StemCache(path, seed_path=None)
+    fresh.lookup('id', ['lama'], _fail)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT last_used FROM stems WHERE token = 'lama'").fetchone()[0] == 0
+
+    fresh.lookup('id', ['baru'], str.upper)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT last_used FROM stems WHERE token = 'lama'").fetchone()[0] > 0
+
+
+def test_eviction_keeps_cache_within_capacity(tmp_path):
+    cache = stem_cache.StemCache(str(tmp_path / 'cache.sqlite3'), max_entries=100, seed_path=None)
+    for start in range(0, 500, 50):
+        cache.lookup('id', [f"kata{i}" for i in range(start, start + 50)], str.upper)
+    assert cache.stats()['entries'] <= 100
+
+
+def test_counters_are_consistent_under_concurrent_lookups(tmp_path):
+    import threading
+
+    cache = stem_cache.StemCache(str(tmp_path / 'cache.sqlite3'), seed_path=None)
+    words = [f"kata{i}" for i in range(200)]
+    per_thread = {}
+
+    def run(name):
+        for _ in range(20):
+            assert cache.lookup('id', words + words[:10], str.upper)[-1] == 'KATA9'
+        per_thread[name] = cache.thread_counts()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Counter per thread hanya memuat lookup thread itu sendiri; totalnya sama dengan counter proses
+    assert all(sum(counts) == 20 * 210 for counts in per_thread.values())
+    assert cache.hits + cache.misses == 4 * 20 * 210
+    assert sum(misses for _, misses in per_thread.values()) == cache.misses
+    assert len(words) <= cache.misses
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+import preprocessing_logic as pl
+from conftest import nltk_available
+
+
+def test_indonesian_list_keeps_formal_negations_by_default():
+    colloquial = {'ga', 'gak', 'nggak', 'enggak'}
+    assert pl.get_stopword_list('id') & pl.NEGATION_WORDS['id'] == colloquial
+    assert not pl.get_stopword_list('id', keep_negations=True) & pl.NEGATION_WORDS['id']
+    assert pl.get_stopword_list('id') - pl.get_stopword_list('id', keep_negations=True) == colloquial
+
+
+def test_english_negations_are_kept_only_for_sentiment(monkeypatch):
+    monkeypatch.setattr(pl, '_base_stopword_list', lambda language: {'the', 'a', 'not', 'no'})
+
+    assert pl.get_stopword_list('en') == {'the', 'a', 'not', 'no'}
+    assert pl.get_stopword_list('en', keep_negations=True) == {'the', 'a'}
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, lemmatization=False)
+    assert 'not' in pl.load_pipeline_resources(steps, 'en')['stopwords']
+    assert 'not' not in pl.load_pipeline_resources(dict(steps, sentiment=True), 'en')['stopwords']
+
+
+def test_sentiment_changes_stopword_stage_signature():
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS)
+    plain = pl.stage_signature(steps, 'en')
+    scored = pl.stage_signature(dict(steps, sentiment=True), 'en')
+
+    assert plain[:2] == scored[:2]
+    assert plain[2] != scored[2]
+    # Tanpa stopword removal hasilnya sama, jadi cache tetap bisa dipakai bersama
+    no_stopwords = dict(steps, stopword_removal=False)
+    assert pl.stage_signature(no_stopwords, 'en') == pl.stage_signature(dict(no_stopwords, sentiment=True), 'en')
+
+
+@pytest.mark.skipif(not nltk_available('stopwords'), reason="Data stopwords NLTK tidak terpasang")
+def test_default_english_filtering_drops_negations():
+    steps = dict(pl.DEFAULT_PIPELINE_STEPS, tokenizer='fast', lemmatization=False)
+    texts = pd.Series(["this is not good"])
+
+    assert pl.preprocess_series(texts, steps, 'en')['Tokens_Filtered'][0] == ['good']
+    scored = pl.preprocess_series(texts, dict(steps, sentiment=True), 'en')
+    assert scored['Tokens_Filtered'][0] == ['not', 'good']
@@ -0,0 +1,171 @@
+"""Penyimpanan token ringkas untuk hasil preprocessing.
+
+Alih-alih kolom object berisi list Python (satu objek list + satu pointer + sering satu objek
+string per token), setiap kolom token disimpan sebagai array ID int32 datar plus array offset
+baris int64, dengan satu kosakata bersama untuk semua kolom. Baris `i` adalah
+`ids[offsets[i]:offsets[i + 1]]`. List dan string gabungan hanya dibentuk saat diminta
+(tampilan per halaman, ekspor).
+"""
+import sys
+
+import numpy as np
+
+
+class EncodedChunk:
+    """Satu chunk kolom token yang sudah di-encode dengan kosakata lokal (dikirim dari worker)."""
+
+    __slots__ = ('vocab', 'columns', 'n_rows')
+
+    def __init__(self, vocab, columns, n_rows):
+        self.vocab = vocab
+        self.columns = columns
+        self.n_rows = n_rows
+
+
+def _offsets_from_lengths(lengths):
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def encode_chunk(columns):
+    """Meng-encode dict nama_kolom -> list token per baris menjadi EncodedChunk."""
+    vocab = {}
+    encoded = {}
+    n_rows = 0
+    for name, rows in columns.items():
+        n_rows = len(rows)
+        offsets = _offsets_from_lengths(np.fromiter(map(len, rows), dtype=np.int64, count=n_rows))
+        ids = np.fromiter(
+            (vocab.setdefault(token, len(vocab)) for tokens in rows for token in tokens),
+            dtype=np.int32,
+            count=int(offsets[-1])
+        )
+        encoded[name] = (ids, offsets)
+    return EncodedChunk(list(vocab), encoded, n_rows)
+
+
+class TokenColumn:
+    """Tampilan satu kolom token di dalam TokenStore."""
+
+    def __init__(self, store, ids, offsets):
+        self.store = store
+        self.ids = ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def row(self, position):
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return self.store.tokens[self.ids[start:end]].tolist()
+
+    def rows(self, positions=None):
+        """Materialisasi list token untuk posisi baris tertentu (default: semua baris)."""
+        positions = range(len(self)) if positions is None else positions
+        return [self.row(p) for p in positions]
+
+    def joined(self, positions=None, sep=' '):
+        positions = range(len(self)) if positions is None else positions
+        tokens, ids, offsets = self.store.tokens, self.ids, self.offsets
+        return [sep.join(tokens[ids[offsets[p]:offsets[p + 1]]]) for p in positions]
+
+    def row_ids(self):
+        """Nomor baris (0..n-1) untuk setiap token di `ids`, untuk operasi vektor per baris."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.lengths())
+
+    def nbytes(self):
+        return self.ids.nbytes + self.offsets.nbytes
+
+
+class TokenStore:
+    """Kosakata bersama + kolom token ringkas, selaras dengan `index` DataFrame hasil."""
+
+    def __init__(self, tokens, columns, index):
+        self.tokens = np.array(tokens, dtype=object)
+        self.columns = {name: TokenColumn(self, ids, offsets) for name, (ids, offsets) in columns.items()}
+        self.index = index
+        self._token_to_id = None
+
+    @classmethod
+    def from_chunks(cls, chunks, index):
+        """Menggabungkan EncodedChunk (berurutan) ke satu kosakata global lewat remap ID secara vektor."""
+        vocab = {}
+        parts = {}
+        for chunk in chunks:
+            remap = np.fromiter(
+                (vocab.setdefault(token, len(vocab)) for token in chunk.vocab),
+                dtype=np.int32,
+                count=len(chunk.vocab)
+            )
+            for name, (ids, offsets) in chunk.columns.items():
+                parts.setdefault(name, []).append((remap[ids] if len(ids) else ids, offsets))
+
+        columns = {}
+        for name, pieces in parts.items():
+            ids = np.concatenate([p[0] for p in pieces]) if pieces else np.empty(0, dtype=np.int32)
+            lengths = np.concatenate([np.diff(p[1]) for p in pieces]) if pieces else np.empty(0, dtype=np.int64)
+            columns[name] = (ids.astype(np.int32, copy=False), _offsets_from_lengths(lengths))
+        return cls(list(vocab), columns, index)
+
+    @classmethod
+    def from_frame(cls, df, column_names):
+        chunk = encode_chunk({name: df[name].tolist() for name in column_names})
+        return cls.from_chunks([chunk], df.index)
+
+    def take(self, positions, index):
+        """Store baru berisi baris `positions` (boleh berulang), mis. untuk menyebar hasil teks unik ke semua baris."""
+        positions = np.asarray(positions)
+        columns = {}
+        for name, column in self.columns.items():
+            lengths = column.lengths()[positions]
+            offsets = _offsets_from_lengths(lengths)
+            starts = column.offsets[:-1][positions]
+            gather = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+            columns[name] = (column.ids[gather], offsets)
+        return TokenStore(self.tokens, columns, index)
+
+    def column(self, name):
+        return self.columns[name]
+
+    def save(self, path):
+        """Menulis kosakata dan array ID/offset ke file .npz (tanpa pickle); index tidak ikut disimpan."""
+        encoded = [token.encode('utf-8') for token in self.tokens]
+        arrays = {
+            'vocab': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'vocab_offsets': _offsets_from_lengths([len(token) for token in encoded]),
+        }
+        for i, (name, column) in enumerate(self.columns.items()):
+            arrays[f'ids_{i}'] = column.ids
+            arrays[f'offsets_{i}'] = column.offsets
+        arrays['names'] = np.array(list(self.columns), dtype=str)
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path, index):
+        """Kebalikan save(); `index` adalah index DataFrame hasil yang sejajar dengan baris store."""
+        with np.load(path, allow_pickle=False) as data:
+            blob = data['vocab'].tobytes()
+            offsets = data['vocab_offsets']
+            tokens = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+            columns = {
+                str(name): (data[f'ids_{i}'], data[f'offsets_{i}']) for i, name in enumerate(data['names'])
+            }
+        return cls(tokens, columns, index)
+
+    def token_id(self, token):
+        if self._token_to_id is None:
+            self._token_to_id = {token: i for i, token in enumerate(self.tokens)}
+        return self._token_to_id.get(token)
+
+    def __len__(self):
+        return len(self.index)
+
+    def nbytes(self):
+        """Memori array ID/offset plus kosakata (string unik + array pointer)."""
+        vocab_bytes = self.tokens.nbytes + sum(sys.getsizeof(t) for t in self.tokens)
+        return vocab_bytes + sum(col.nbytes() for col in self.columns.values())
@@ -1,12 +1,16 @@
+import hashlib
+import io
 import itertools
 import re
 from collections import Counter
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import seaborn as sns
 import streamlit as st
-from wordcloud import WordCloud
+
+import aggregate_logic as al
+import sentiment_logic as sl
+import token_store as ts
 
 
 # --- Statistik Dasar ---
@@ -23,9 +27,20 @@ def calculate_basic_stats(series_before, series_after):
 
 # --- Perhitungan Frekuensi ---
 
-@st.cache_data(hash_funcs={pd.Series: lambda s: "".join(s.astype(str))})
-def calculate_word_frequency(data_series, is_tokenized):
+# Argumen berawalan '_' tidak di-hash oleh st.cache_data; kunci cache cukup `fingerprint`
+# dari preprocessing_logic.dataset_fingerprint / derive_fingerprint, sehingga rerun biayanya O(1).
+
+@st.cache_data
+def calculate_word_frequency(_data_series, is_tokenized, fingerprint):
+    data_series = _data_series
     try:
+        if isinstance(data_series, ts.TokenColumn):
+            # Kolom token ringkas: hitung langsung dari array ID tanpa membentuk list
+            counts = np.bincount(data_series.ids, minlength=len(data_series.store.tokens))
+            nonzero = np.flatnonzero(counts)
+            df_freq = pd.DataFrame({'Kata': data_series.store.tokens[nonzero], 'Frekuensi': counts[nonzero]})
+            return df_freq.sort_values(by='Frekuensi', ascending=False, kind='stable').reset_index(drop=True)
+
         all_tokens = []
         if is_tokenized:
             # Untuk data sesudah preprocessing (List of strings)
@@ -48,34 +63,83 @@ def calculate_word_frequency(data_series, is_tokenized):
         return pd.DataFrame(columns=['Kata', 'Frekuensi'])
 
 
-# --- Visualisasi (Return Figure Object) ---
-
 @st.cache_data
-def create_wordcloud(freq_dict):
-    if not freq_dict:
-        return WordCloud(width=800, height=400, background_color='white').generate("No Data")
+def raw_word_frequency(_data_series, fingerprint, top_n=200, chunk_size=50_000):
+    """Frekuensi kata mentah per chunk (tanpa menggabung seluruh kolom jadi satu string)."""
+    aggregates = al.CorpusAggregates()
+    for start in range(0, len(_data_series), chunk_size):
+        aggregates.update_raw(_data_series.iloc[start:start + chunk_size])
+    return aggregates.top_frame('raw', top_n)
+
+
+# --- Visualisasi (Return PNG Bytes) ---
+
+# matplotlib, seaborn dan wordcloud diimpor saat dipakai agar tidak memperlambat start aplikasi.
+# Gambar dirender sekali menjadi PNG lalu figure langsung dibuang; yang di-cache hanya bytes PNG,
+# dikunci dengan fingerprint isi top-N frekuensi (frekuensi sama -> gambar sama, dari dataset mana pun).
+
+WORDCLOUD_MAX_WORDS = 150
+BAR_TOP_N = 20
+
+
+def frequency_fingerprint(df_freq, top_n):
+    """Hash isi `top_n` baris teratas DataFrame frekuensi (Kata, Frekuensi)."""
+    top = df_freq.head(top_n)
+    digest = hashlib.sha1()
+    for word, count in zip(top['Kata'], top['Frekuensi']):
+        digest.update(f"{word}\t{count}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _to_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_wordcloud(_df_freq, fingerprint):
+    """Word cloud sebagai PNG bytes; `fingerprint` dari frequency_fingerprint(df, WORDCLOUD_MAX_WORDS)."""
+    from wordcloud import WordCloud
 
+    top = _df_freq.head(WORDCLOUD_MAX_WORDS)
+    freq_dict = dict(zip(top['Kata'], top['Frekuensi']))
     wc = WordCloud(
         width=800, height=400,
         background_color='white',
         colormap='viridis',
-        max_words=150,
+        max_words=WORDCLOUD_MAX_WORDS,
         random_state=42
     )
-    wc.generate_from_frequencies(freq_dict)
-    return wc
-
-
-@st.cache_data
-def plot_word_frequency_seaborn(df_freq, top_n=20):
-    """Membuat bar plot menggunakan Seaborn dengan Object Oriented Interface."""
+    if freq_dict:
+        wc.generate_from_frequencies(freq_dict)
+    else:
+        wc.generate("No Data")
+    return _to_png(wc.to_image())
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_word_frequency(_df_freq, fingerprint, top_n=BAR_TOP_N):
+    """Bar plot Seaborn sebagai PNG bytes; `fingerprint` dari frequency_fingerprint(df, top_n)."""
+    # Figure dibuat langsung (bukan lewat pyplot) sehingga tidak terdaftar di state global
+    # pyplot dan aman dirender paralel di thread lain; _figure_png memutus siklus figure/canvas
+    # agar buffer Agg dibebaskan begitu fungsi selesai, tanpa menunggu GC.
+    import seaborn as sns
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    df_freq = _df_freq
     if df_freq.empty:
-        fig, ax = plt.subplots()
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
         ax.text(0.5, 0.5, "Tidak ada data", ha='center', va='center')
-        return fig
+        return _figure_png(fig)
 
     # Setup Figure dan Axes
-    fig, ax = plt.subplots(figsize=(10, 7))
+    fig = Figure(figsize=(10, 7))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
 
     df_top_n = df_freq.head(top_n)
 
@@ -105,5 +169,85 @@ def plot_word_frequency_seaborn(df_freq, top_n=20):
             fontsize=10
         )
 
-    plt.tight_layout()
-    return fig
+    fig.tight_layout()
+    return _figure_png(fig)
+
+
+SENTIMENT_COLORS = {'negatif': '#d62728', 'netral': '#7f7f7f', 'positif': '#2ca02c'}
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_sentiment_distribution(_summary, fingerprint):
+    """Jumlah baris per label + histogram skor (sentiment_logic.SentimentSummary) sebagai PNG bytes.
+
+    `fingerprint` dari processed_fp.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    counts = _summary.label_counts()
+    fig = Figure(figsize=(12, 4.5))
+    FigureCanvasAgg(fig)
+    ax_count, ax_hist = fig.subplots(1, 2, gridspec_kw={'width_ratios': [1, 2]})
+
+    ax_count.bar(counts.index, counts.to_numpy(), color=[SENTIMENT_COLORS[label] for label in counts.index])
+    ax_count.set_title('Jumlah Komentar per Label', fontsize=13)
+    ax_count.grid(axis='y', linestyle='--', alpha=0.6)
+    total = max(int(counts.sum()), 1)
+    for i, count in enumerate(counts.to_numpy()):
+        ax_count.text(i, count, f'{count:,}\n({count / total:.1%})', ha='center', va='bottom', fontsize=9)
+    ax_count.margins(y=0.2)
+
+    # Skor ekstrem sudah digabung ke bin tepi oleh SentimentSummary
+    hist = _summary.histogram_frame()
+    colors = [SENTIMENT_COLORS['negatif' if c < 0 else 'positif' if c > 0 else 'netral'] for c in hist['Skor']]
+    ax_hist.bar(hist['Skor'], hist['Jumlah'], width=0.9, color=colors)
+    ax_hist.set_title('Distribusi Skor Sentimen', fontsize=13)
+    ax_hist.set_xlabel(f'Skor (dipotong ke ±{sl.SCORE_CLIP})', fontsize=11)
+    ax_hist.set_ylabel('Jumlah', fontsize=11)
+    ax_hist.grid(axis='y', linestyle='--', alpha=0.6)
+
+    fig.tight_layout()
+    return _figure_png(fig)
+
+
+def _figure_png(fig):
+    buffer = io.BytesIO()
+    canvas = fig.canvas
+    try:
+        fig.savefig(buffer, format='png')
+    finally:
+        # Figure dan canvas saling merujuk (siklus): tanpa diputus, buffer Agg (~2,7 MB per render)
+        # baru dibebaskan saat GC generasi 2 berjalan. Renderer dibuang dan siklusnya diputus di sini.
+        fig.clear()
+        canvas.__dict__.pop('renderer', None)
+        canvas.figure = None
+    return buffer.getvalue()
+
+
+def render_panels(panels, max_workers=4):
+    """Merender beberapa panel sekaligus di thread pool.
+
+    `panels` adalah dict nama -> DataFrame frekuensi; hasilnya dict nama -> (wordcloud_png, bar_png).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+
+    def run(func, df_freq, top_n):
+        # Konteks sesi diteruskan agar st.cache_data bisa dipakai dari thread ini
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+        return func(df_freq, frequency_fingerprint(df_freq, top_n))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: (
+                pool.submit(run, render_wordcloud, df_freq, WORDCLOUD_MAX_WORDS),
+                pool.submit(run, render_word_frequency, df_freq, BAR_TOP_N),
+            )
+            for name, df_freq in panels.items()
+        }
+        return {name: (wc.result(), bar.result()) for name, (wc, bar) in futures.items()}